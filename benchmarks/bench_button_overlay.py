@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from PIL import ImageDraw
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from headless import HeadlessGUI
+
+# Compares the per-event cost of DualSenseGUI.update_button_state, which
+# toggles one retained canvas oval, against the PIL recomposition it
+# replaced. Runs on the offscreen backend, no display needed; Tk's own
+# redraw of the changed region isn't part of either number.
+#
+#   python benchmarks/bench_button_overlay.py [events]
+
+
+def recompose(gui, held):
+    # The pre-overlay path: copy the resized image, draw every held button
+    # onto it and swap in a new full-size photo, once per event
+    working_image = gui.base_resized.copy()
+    draw = ImageDraw.Draw(working_image)
+    scale_x = working_image.size[0] / 1200
+    scale_y = working_image.size[1] / 1200
+    circle_radius = int(10 * min(scale_x, scale_y))
+    for btn in held:
+        orig_x, orig_y = gui.button_positions[btn]
+        x = int(orig_x * scale_x)
+        y = int(orig_y * scale_y)
+        draw.ellipse([x - circle_radius, y - circle_radius, x + circle_radius, y + circle_radius], fill='red')
+    gui.controller_image = gui.photo_image(working_image)
+    gui.canvas.itemconfig(gui.image_on_canvas, image=gui.controller_image)
+
+
+def run(gui, step, events):
+    gui.root.update()
+    start = time.perf_counter()
+    for i in range(events):
+        step(i)
+        gui.root.update()
+    return (time.perf_counter() - start) / events
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    # ps5_controller.png is looked up relative to the working directory
+    os.chdir(ROOT_DIR)
+
+    print(f"{'held':>5} {'legacy ms/event':>16} {'overlay ms/event':>17} {'speedup':>8}")
+    for held in (0, 4, 8, 17):
+        gui = HeadlessGUI()
+        buttons = list(gui.button_positions)
+        # Hold the first `held` buttons down, then mash the last one
+        for btn in buttons[:held]:
+            gui.update_button_state(btn, True)
+        mashed = buttons[-1]
+
+        def legacy(i):
+            recompose(gui, buttons[:held] + ([mashed] if i % 2 == 0 else []))
+
+        def overlay(i):
+            gui.update_button_state(mashed, i % 2 == 0)
+
+        legacy_s = run(gui, legacy, events)
+        overlay_s = run(gui, overlay, events)
+        print(f"{held:>5} {legacy_s * 1000:>16.3f} {overlay_s * 1000:>17.4f} {legacy_s / overlay_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from headless import HeadlessGUI
+from latency import percentile
+from replay import ReplayController, ReplayDeviceInfo, button_mash, stick_circles
+from sessions import ControllerSession
+
+# Benchmarks the GUI's render hot paths on the offscreen backend, no display
+# or controller needed.
+#
+#   python benchmarks/bench_render.py [--events N] [--json results.json]
+#                                     [--compare baseline.json] [--threshold 20]
+#
+# Scenarios:
+#   button_mash     - update_button_state, every button pressed and released in turn
+#   stick_circles   - update_stick_indicator for both sticks tracing full circles
+#   input_status    - update_input_status with buttons held and both sticks moved
+#   resize_storm    - resize_image while the window is dragged between sizes
+#   resize_toggle   - resize_image flipping between two sizes seen before
+#   frame_storm     - whole pipeline: input reports through the controller
+#                     callbacks, dispatcher and render_frame, 8 reports per frame
+#
+# For each one it reports events/s, per-event latency percentiles and the
+# memory allocated per event. --compare exits with status 1 when a scenario's
+# events/s dropped by more than --threshold percent against a saved run.
+
+
+def add_bench_session(gui):
+    session = ControllerSession(ReplayDeviceInfo('bench'), gui.dispatcher, gui.latency)
+    session.controller = ReplayController([])
+    gui.setup_controller_callbacks(session)
+    gui.on_device_event('connected', session)
+    gui.pump()
+    return session
+
+
+def run_scenario(step, events):
+    # Timing pass
+    latencies = []
+    start = time.perf_counter()
+    for i in range(events):
+        t0 = time.perf_counter_ns()
+        step(i)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+
+    # Allocation pass, separate since tracing slows everything down
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(events):
+        step(i)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    latencies.sort()
+    return {
+        'events': events,
+        'events_per_s': events / elapsed if elapsed else 0.0,
+        'p50_us': percentile(latencies, 50) / 1000,
+        'p99_us': percentile(latencies, 99) / 1000,
+        'max_us': latencies[-1] / 1000,
+        'retained_bytes_per_event': allocated / events,
+        'retained_blocks_per_event': blocks / events,
+        'peak_kb': peak / 1024,
+    }
+
+
+def bench_button_mash(events):
+    gui = HeadlessGUI()
+    buttons = list(gui.button_positions)
+
+    def step(i):
+        gui.update_button_state(buttons[i % len(buttons)], (i // len(buttons)) % 2 == 0)
+    return run_scenario(step, events)
+
+
+def bench_stick_circles(events):
+    gui = HeadlessGUI()
+    controller = add_bench_session(gui).controller
+
+    def step(i):
+        angle = 2 * math.pi * i / 250
+        controller.left_stick_x.emit(math.cos(angle))
+        controller.left_stick_y.emit(math.sin(angle))
+        controller.right_stick_x.emit(-math.cos(angle))
+        controller.right_stick_y.emit(math.sin(angle))
+        gui.update_stick_indicator()
+        gui.update_right_stick_indicator()
+    return run_scenario(step, events)
+
+
+def bench_input_status(events):
+    gui = HeadlessGUI()
+    controller = add_bench_session(gui).controller
+    for button in ('Cross', 'L1', 'R2', 'D-Pad Up'):
+        gui.update_button_state(button, True)
+
+    def step(i):
+        angle = 2 * math.pi * i / 250
+        controller.left_stick_x.emit(math.cos(angle))
+        controller.right_stick_y.emit(math.sin(angle))
+        gui.update_input_status()
+    return run_scenario(step, events)
+
+
+def bench_resize_storm(events):
+    gui = HeadlessGUI()
+    sizes = [(900 + 20 * i, 520 + 12 * i) for i in range(20)]
+
+    def step(i):
+        gui.resize(*sizes[i % len(sizes)])
+        gui.root.update()
+    return run_scenario(step, events)
+
+
+def bench_resize_toggle(events):
+    gui = HeadlessGUI()
+    sizes = [(900, 420), (1100, 560)]
+    for size in sizes:
+        gui.resize(*size)
+        gui.settle_resize()
+
+    def step(i):
+        gui.resize(*sizes[i % 2])
+        gui.root.update()
+    return run_scenario(step, events)
+
+
+def bench_frame_storm(events, reports_per_frame=8):
+    gui = HeadlessGUI()
+    session = add_bench_session(gui)
+    controller = session.controller
+    controller.events = button_mash(10) + stick_circles(10)
+    reports = [report for _, report in controller._reports()]
+
+    def step(i):
+        for n in range(reports_per_frame):
+            controller.deliver(reports[(i * reports_per_frame + n) % len(reports)])
+        gui.pump()
+    result = run_scenario(step, events // reports_per_frame)
+
+    # Report per input report rather than per frame
+    result['events'] *= reports_per_frame
+    result['events_per_s'] *= reports_per_frame
+    return result
+
+
+SCENARIOS = {
+    'button_mash': (bench_button_mash, 1.0),
+    'stick_circles': (bench_stick_circles, 1.0),
+    'input_status': (bench_input_status, 1.0),
+    'resize_storm': (bench_resize_storm, 0.01),
+    'resize_toggle': (bench_resize_toggle, 0.1),
+    'frame_storm': (bench_frame_storm, 1.0),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GUI render paths offscreen")
+    parser.add_argument('--events', type=int, default=20000, help="events per scenario (resize_storm runs fewer)")
+    parser.add_argument('--only', action='append', choices=sorted(SCENARIOS), help="run just these scenarios")
+    parser.add_argument('--json', metavar='PATH', help="save the results")
+    parser.add_argument('--compare', metavar='PATH', help="saved results to check for regressions")
+    parser.add_argument('--threshold', type=float, default=20.0, help="allowed events/s drop in percent")
+    args = parser.parse_args()
+
+    # ps5_controller.png is looked up relative to the working directory
+    os.chdir(ROOT_DIR)
+
+    results = {}
+    print(f"{'scenario':<14} {'events':>7} {'events/s':>11} {'p50 us':>8} {'p99 us':>8} "
+          f"{'max us':>9} {'B/event':>8} {'peak KB':>8}")
+    for name, (bench, scale) in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        result = bench(max(10, int(args.events * scale)))
+        results[name] = result
+        print(f"{name:<14} {result['events']:>7} {result['events_per_s']:>11.0f} {result['p50_us']:>8.1f} "
+              f"{result['p99_us']:>8.1f} {result['max_us']:>9.1f} {result['retained_bytes_per_event']:>8.1f} "
+              f"{result['peak_kb']:>8.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = False
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            change = (result['events_per_s'] / baseline[name]['events_per_s'] - 1) * 100
+            flag = ""
+            if change < -args.threshold:
+                flag = "  REGRESSION"
+                regressed = True
+            print(f"{name:<14} {change:+7.1f}% events/s vs baseline{flag}")
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
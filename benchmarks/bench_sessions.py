@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from headless import HeadlessGUI
+from recorder import BUTTON_CODES, AXIS_CODES, KIND_BUTTON, KIND_AXIS
+from replay import ReplayController, ReplayDeviceInfo
+from sessions import ControllerSession
+
+# Measures how the shared render loop scales with the number of connected
+# controllers, on the offscreen backend with replay controllers instead of
+# real hardware. No display needed.
+#
+#   python benchmarks/bench_sessions.py [frames]
+#
+# Three scenarios per controller count:
+#   idle      - N controllers connected, every one sending unchanged reports
+#   fixed     - 8 button edges per frame in total, spread across controllers
+#   streaming - every controller moves its sticks every frame
+#
+# Every controller sends 4 reports per frame, a 250 Hz controller at 60 fps.
+REPORTS_PER_FRAME = 4
+BUTTONS = ('Cross', 'Circle', 'Square', 'Triangle')
+
+
+def add_bench_session(gui, index):
+    session = ControllerSession(ReplayDeviceInfo(f"bench-{index}", f"BENCH{index:04d}"), gui.dispatcher, gui.latency)
+    session.controller = ReplayController([])
+    gui.setup_controller_callbacks(session)
+    gui.on_device_event('connected', session)
+    return session
+
+
+def button_report(button, pressed):
+    return [(0, 0, KIND_BUTTON, BUTTON_CODES[button], 1.0 if pressed else 0.0)]
+
+
+def stick_report(value):
+    return [(0, 0, KIND_AXIS, AXIS_CODES['left_stick_x'], value),
+            (0, 0, KIND_AXIS, AXIS_CODES['right_stick_y'], -value)]
+
+
+def time_frames(gui, frames, feed):
+    gui.pump()
+    start = time.perf_counter()
+    for frame in range(frames):
+        feed(frame)
+        gui.pump()
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    # ps5_controller.png is looked up relative to the working directory
+    os.chdir(ROOT_DIR)
+
+    print(f"{'controllers':>11} {'idle ms':>9} {'fixed ms':>9} {'streaming ms':>13}")
+    for count in (1, 2, 4, 8):
+        gui = HeadlessGUI()
+        controllers = [add_bench_session(gui, i).controller for i in range(count)]
+
+        def idle(frame):
+            for controller in controllers:
+                for _ in range(REPORTS_PER_FRAME):
+                    controller.deliver([])
+
+        def fixed(frame):
+            for i in range(8):
+                controllers[i % count].deliver(button_report(BUTTONS[i % 4], frame % 2 == 0))
+            idle(frame)
+
+        def streaming(frame):
+            for controller in controllers:
+                for n in range(REPORTS_PER_FRAME):
+                    controller.deliver(stick_report(((frame * REPORTS_PER_FRAME + n) % 100) / 100))
+
+        idle_ms = time_frames(gui, frames, idle) * 1000
+        fixed_ms = time_frames(gui, frames, fixed) * 1000
+        streaming_ms = time_frames(gui, frames, streaming) * 1000
+        print(f"{count:>11} {idle_ms:>9.3f} {fixed_ms:>9.3f} {streaming_ms:>13.3f}")
+
+        gui.is_running = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import numpy as np
+from input_state import BUTTON_BINDINGS
+from sample_ring import SampleRing
+
+# Press edges closer together than a finger can make them. A press
+# shorter than BOUNCE_SECONDS is contact bounce, a release followed by a
+# press within CHATTER_SECONDS is chatter, and two clean presses starting
+# within DOUBLE_SECONDS are one press registered twice.
+BOUNCE_SECONDS = 0.025
+CHATTER_SECONDS = 0.03
+DOUBLE_SECONDS = 0.1
+
+# Flagged edges per press above which a button counts as worn
+WORN_RATE = 0.05
+
+
+class ButtonEdgeLog:
+    # Every press and release of every button, one ring of (time, pressed)
+    # rows per bit of the button mask. The reader thread appends from the
+    # button callbacks, so the time is when the report was parsed, not when
+    # the Tk thread got to it.
+    def __init__(self, capacity=512):
+        self.rings = [SampleRing(1, capacity) for _ in BUTTON_BINDINGS]
+
+    def append(self, bit, pressed):
+        self.rings[bit].append(1.0 if pressed else 0.0)
+
+    def count(self, bit):
+        return self.rings[bit].count
+
+    def reset(self):
+        for ring in self.rings:
+            ring.reset()
+
+
+def edge_stats(rows):
+    # Press durations and glitches from one button's edges, oldest first
+    stats = {'presses': 0, 'shortest_ms': None, 'median_ms': None, 'bounce': 0, 'chatter': 0, 'double': 0}
+    if not len(rows):
+        return stats
+    times = rows[:, 0]
+    pressed = rows[:, 1] > 0.5
+    stats['presses'] = int(pressed.sum())
+
+    # A press followed by a release is a complete press, a release followed
+    # by a press is the gap between two
+    held = pressed[:-1] & ~pressed[1:]
+    durations = times[1:][held] - times[:-1][held]
+    opened = ~pressed[:-1] & pressed[1:]
+    gaps = times[1:][opened] - times[:-1][opened]
+    if len(durations):
+        stats['shortest_ms'] = float(durations.min() * 1000)
+        stats['median_ms'] = float(np.median(durations) * 1000)
+    stats['bounce'] = int((durations < BOUNCE_SECONDS).sum())
+    stats['chatter'] = int((gaps < CHATTER_SECONDS).sum())
+
+    # Presses too close to the one before, when neither the press before
+    # nor the gap was a glitch already. A press straight after another with
+    # no release between counts too.
+    press_index = np.flatnonzero(pressed)
+    if len(press_index) > 1:
+        before, after = press_index[:-1], press_index[1:]
+        release = times[before + 1]
+        clean = (release - times[before] >= BOUNCE_SECONDS) & (times[after] - release >= CHATTER_SECONDS)
+        close = times[after] - times[before] < DOUBLE_SECONDS
+        stats['double'] = int(((close & clean) | (after == before + 1)).sum())
+    return stats
+
+
+def health_status(stats):
+    flagged = stats['bounce'] + stats['chatter'] + stats['double']
+    if not flagged:
+        return 'OK'
+    if flagged >= 3 and flagged > stats['presses'] * WORN_RATE:
+        return 'Worn'
+    return 'Suspect'
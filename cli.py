@@ -0,0 +1,290 @@
+import json
+import sys
+import time
+from dispatcher import UpdateDispatcher
+from device_monitor import DeviceMonitor
+from sessions import ControllerSession, connect_callbacks
+from input_state import pressed_names, LEFT_X, LEFT_Y, RIGHT_X, RIGHT_Y, LEFT_TRIGGER, RIGHT_TRIGGER
+
+# Command line tester: the same sessions and controller wiring as the GUI,
+# without Tk, PIL or the controller image. Input state goes to stdout as a
+# live status line or as JSON lines.
+
+# Exit codes for scripted checks
+EXIT_OK = 0
+EXIT_CHECK_FAILED = 1
+EXIT_NO_CONTROLLER = 2
+EXIT_DISCONNECTED = 3
+EXIT_INTERRUPTED = 130
+
+
+def live_line(session, elapsed):
+    # One compact status line, fits an 80 column terminal
+    axes = session.axes
+    battery = session.battery
+    stats = session.report_stats
+    pressed = " ".join(pressed_names(session.buttons)) or "-"
+    return (
+        f"{elapsed:7.1f}s  L {axes[LEFT_X]:+.2f} {-axes[LEFT_Y]:+.2f}  R {axes[RIGHT_X]:+.2f} {-axes[RIGHT_Y]:+.2f}  "
+        f"L2 {axes[LEFT_TRIGGER] * 100:3.0f}% R2 {axes[RIGHT_TRIGGER] * 100:3.0f}%  "
+        f"bat {'--' if battery is None else battery.level_percentage}%  "
+        f"{0 if stats is None else stats['rate_hz']:.0f} Hz  {pressed}"
+    )
+
+
+def state_record(session, elapsed):
+    # The same state as a JSON line. Sticks are in controller orientation,
+    # up is positive.
+    axes = session.axes
+    battery = session.battery
+    return {
+        't': round(elapsed, 3),
+        'buttons': list(pressed_names(session.buttons)),
+        'left_stick': [round(axes[LEFT_X], 3), round(-axes[LEFT_Y], 3)],
+        'right_stick': [round(axes[RIGHT_X], 3), round(-axes[RIGHT_Y], 3)],
+        'triggers': [round(axes[LEFT_TRIGGER], 3), round(axes[RIGHT_TRIGGER], 3)],
+        'battery': None if battery is None else battery.level_percentage,
+    }
+
+
+class CliTester:
+    # Follows the first controller that connects. Updates from the reader
+    # and monitor threads go through the GUI's dispatcher and are drained
+    # rate_hz times a second on the main thread, which also writes the
+    # output; nothing is printed per report.
+    def __init__(self, out=sys.stdout, json_lines=False, rate_hz=20, duration=None, wait=10.0,
+                 check=False, check_timeout=60.0):
+        self.out = out
+        self.json_lines = json_lines
+        self.interval = 1.0 / rate_hz
+        self.duration = duration
+        self.wait = wait
+        self.check = check
+        self.check_timeout = check_timeout
+
+        self.dispatcher = UpdateDispatcher(ordered_types=('button', 'device'))
+        self.device_monitor = None
+        self.replay_sessions = []
+        self.session = None
+        self.connected_at = None
+        self.run = None
+        self.exit_code = None
+        self.input_ended = False
+        self.last_output = None
+        self.started = time.perf_counter()
+        self.stats_time = self.started
+
+    # ---- controller threads ----
+
+    def queue_update(self, update_type, data, *args):
+        self.dispatcher.post(update_type, data, args)
+
+    def open_controller(self, device_info):
+        # Runs on the device monitor thread, like the GUI's
+        from dualsense_controller import DualSenseController
+        session = ControllerSession(device_info, self.dispatcher)
+        session.controller = DualSenseController(device_info)
+        connect_callbacks(session, lambda e: self.on_controller_error(session, e))
+        session.controller.activate()
+        return session
+
+    def on_controller_error(self, session, error):
+        session.post('error', error)
+        if self.device_monitor is not None:
+            self.device_monitor.notify_lost(session.device_path)
+
+    def start_device_monitor(self):
+        self.device_monitor = DeviceMonitor(self.open_controller, self.queue_update, max_devices=1)
+        self.device_monitor.start()
+
+    def start_replay(self, events, speed=1.0):
+        from replay import ReplayController, ReplayDeviceInfo
+        session = ControllerSession(ReplayDeviceInfo('replay'), self.dispatcher)
+        session.controller = ReplayController(
+            events, speed=speed, on_finished=lambda controller: self.queue_update('input_ended', None)
+        )
+        connect_callbacks(session, lambda e: session.post('error', e))
+        self.replay_sessions.append(session)
+        self.queue_update('device', ('connected', session))
+        session.controller.activate()
+
+    # ---- main thread ----
+
+    def handle_update(self, update_type, data, args):
+        if update_type == 'device':
+            event, session = data
+            if event == 'connected' and self.session is None:
+                self.on_connected(session)
+            elif event == 'disconnected' and session is self.session:
+                self.emit_event('disconnected')
+                if self.run is not None:
+                    self.run.abort('disconnected')
+                    self.report_check()
+                self.exit_code = EXIT_DISCONNECTED
+        elif update_type == 'status':
+            self.emit_event('status', message=data)
+        elif update_type == 'input_ended':
+            self.input_ended = True
+        else:
+            session, data = data
+            if session is not self.session:
+                return
+            if update_type == 'button':
+                session.apply_button(*data)
+            elif update_type == 'battery':
+                session.battery = data
+            elif update_type == 'error':
+                self.emit_event('error', message=str(data))
+
+    def on_connected(self, session):
+        import station
+        self.session = session
+        self.connected_at = time.perf_counter()
+        # The library's connection type value is a tuple with the name first
+        connection = session.controller.connection_type.value
+        connection = connection[0] if isinstance(connection, tuple) else connection
+        self.emit_event('connected', serial_number=session.serial_number, connection=connection)
+        if self.check:
+            self.run = station.StationRun(session, self.check_timeout)
+
+    def emit_event(self, event, **fields):
+        if self.json_lines:
+            self.write_line(json.dumps({'event': event, **fields}))
+        else:
+            details = " ".join(str(value) for value in fields.values())
+            self.write_line(f"{event} {details}".rstrip())
+
+    def write_line(self, line):
+        if not self.json_lines and self.last_output is not None:
+            # Move off the live line before a permanent one
+            self.out.write("\n")
+            self.last_output = None
+        self.out.write(line + "\n")
+        self.out.flush()
+
+    def show_state(self):
+        session = self.session
+        now = time.perf_counter()
+        if now - self.stats_time >= 1.0:
+            # Report rate over the last second
+            session.report_stats = session.report_meter.snapshot()
+            self.stats_time = now
+        elapsed = now - self.connected_at
+        if self.json_lines:
+            record = state_record(session, elapsed)
+            key = {name: value for name, value in record.items() if name != 't'}
+            if key != self.last_output:
+                self.last_output = key
+                self.out.write(json.dumps(record) + "\n")
+                self.out.flush()
+        else:
+            line = live_line(session, elapsed)
+            self.out.write("\r" + line.ljust(len(self.last_output or "")))
+            self.out.flush()
+            self.last_output = line
+
+    def report_check(self):
+        result = self.run.result()
+        if self.json_lines:
+            self.write_line(json.dumps({'event': 'result', **result}))
+        else:
+            self.write_line(f"{result['serial_number']}: {'PASS' if result['passed'] else 'FAIL'} "
+                            f"in {result['duration_s']:.1f} s")
+            for name, (passed, measurement) in result['checks'].items():
+                self.write_line(f"  {'ok  ' if passed else 'FAIL'} {name:<12} {json.dumps(measurement)}")
+        self.exit_code = EXIT_OK if result['passed'] else EXIT_CHECK_FAILED
+
+    def step(self):
+        # One tick of the main loop, returns the exit code once done
+        self.dispatcher.drain(self.handle_update)
+        if self.exit_code is not None:
+            return self.exit_code
+        now = time.perf_counter()
+        if self.session is None:
+            if self.wait is not None and now - self.started >= self.wait:
+                self.emit_event('no_controller')
+                return EXIT_NO_CONTROLLER
+            return None
+
+        self.show_state()
+        if self.run is not None:
+            if self.input_ended:
+                self.run.finish()
+            if self.run.update():
+                self.report_check()
+                return self.exit_code
+        elif self.input_ended or (self.duration is not None and now - self.connected_at >= self.duration):
+            return EXIT_OK
+        return None
+
+    def loop(self):
+        try:
+            while True:
+                tick = time.perf_counter()
+                code = self.step()
+                if code is not None:
+                    return code
+                time.sleep(max(0.0, self.interval - (time.perf_counter() - tick)))
+        except KeyboardInterrupt:
+            return EXIT_INTERRUPTED
+        except BrokenPipeError:
+            # The reader went away (head, a closed pipe), nothing left to do
+            self.last_output = None
+            return EXIT_OK
+        finally:
+            if not self.json_lines and self.last_output is not None:
+                self.out.write("\n")
+            self.shutdown()
+
+    def shutdown(self):
+        # The monitor deactivates the controllers it opened
+        if self.device_monitor is not None:
+            self.device_monitor.stop()
+        for session in self.replay_sessions:
+            session.deactivate()
+
+
+def parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="DualSense Controller Tester, command line")
+    parser.add_argument('--json', action='store_true', help="write JSON lines instead of a live status line")
+    parser.add_argument('--rate', type=float, default=20, help="output updates per second (default 20)")
+    parser.add_argument('--duration', type=float, metavar='SECONDS', help="exit after this long connected")
+    parser.add_argument('--wait', type=float, default=10.0, metavar='SECONDS',
+                        help="give up when no controller connects within this long (default 10, 0 waits forever)")
+    parser.add_argument('--check', action='store_true',
+                        help="run the test station checklist, exit 0 on pass and 1 on fail")
+    parser.add_argument('--check-timeout', type=float, default=60.0, metavar='SECONDS',
+                        help="how long the checklist may take (default 60)")
+    parser.add_argument('--replay', metavar='FILE', help="play back a .dsrec recording instead of a controller")
+    parser.add_argument('--demo', action='store_true', help="play back a synthetic input stream")
+    parser.add_argument('--speed', default='1', help="playback speed multiplier, or 'max'")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    tester = CliTester(json_lines=args.json, rate_hz=args.rate, duration=args.duration,
+                       wait=args.wait or None, check=args.check, check_timeout=args.check_timeout)
+    if args.replay or args.demo:
+        from replay import load_sessions, button_mash, stick_circles, trigger_pulls, battery_drain
+        speed = None if args.speed == 'max' else float(args.speed)
+        if args.replay:
+            events = next(iter(load_sessions(args.replay).values()), [])
+        else:
+            events = button_mash(10) + stick_circles(10) + trigger_pulls(10) + battery_drain(10)
+        tester.start_replay(events, speed=speed)
+    else:
+        tester.start_device_monitor()
+    return tester.loop()
+
+
+if __name__ == "__main__":
+    code = main(sys.argv[1:])
+    try:
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Keep the interpreter's own flush at exit from failing again
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(code)
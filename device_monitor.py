@@ -0,0 +1,122 @@
+import threading
+import time
+
+
+class DeviceMonitor(threading.Thread):
+    # Watches for DualSense controllers on a background thread so the Tk thread
+    # never blocks on HID enumeration or device open.
+    #
+    # open_device(device_info) is called on this thread for every newly seen
+    # controller and must return an activated handle with a deactivate()
+    # method. post(update_type, data, *args) is how connect/disconnect and
+    # status events reach the GUI.
+    #
+    # The controller library itself is imported on this thread, so it never
+    # delays the window. on_library_loaded(began) is called once it is in.
+    def __init__(self, open_device, post, min_interval=1.0, max_interval=5.0, backoff=1.5, max_devices=8,
+                 on_library_loaded=None):
+        super().__init__(name="DeviceMonitor", daemon=True)
+        self.open_device = open_device
+        self.post = post
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_devices = max_devices
+        self.on_library_loaded = on_library_loaded
+
+        # Device path -> handle returned by open_device
+        self.devices = {}
+
+        self._lost = set()
+        self._lost_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def notify_lost(self, device_path):
+        # Called from a controller's reader thread when it fails, which is
+        # usually the first sign of an unplug. Tear it down without waiting
+        # for the next scan.
+        with self._lost_lock:
+            self._lost.add(device_path)
+        self._wake.set()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        began = time.perf_counter()
+        try:
+            from dualsense_controller import DualSenseController
+        except Exception as e:
+            self.post('status', f"Error loading controller library: {e}", 'red')
+            return
+        if self.on_library_loaded is not None:
+            self.on_library_loaded(began)
+
+        interval = self.min_interval
+        announced_empty = False
+
+        while not self._stop_event.is_set():
+            try:
+                device_infos = DualSenseController.enumerate_devices()
+            except Exception as e:
+                # Enumeration itself failed, back off before retrying
+                self.post('status', f"Error scanning for controllers: {e}", 'red')
+                interval = min(interval * self.backoff, self.max_interval)
+                self.sleep(interval)
+                continue
+
+            present = {info.path for info in device_infos}
+            with self._lost_lock:
+                lost = self._lost
+                self._lost = set()
+
+            for path in list(self.devices):
+                if path in lost or path not in present:
+                    self.disconnect(path)
+
+            failed = False
+            for device_info in device_infos:
+                if device_info.path in self.devices or len(self.devices) >= self.max_devices:
+                    continue
+                try:
+                    handle = self.open_device(device_info)
+                except Exception as e:
+                    self.post('status', f"Error connecting to controller: {e}", 'red')
+                    failed = True
+                    continue
+                self.devices[device_info.path] = handle
+                self.post('device', ('connected', handle))
+
+            if not self.devices and not device_infos:
+                if not announced_empty:
+                    self.post('status', "No DualSense Controller available!", 'red')
+                    announced_empty = True
+            else:
+                announced_empty = False
+
+            if failed:
+                # Back off, the device may still be settling after plug-in
+                interval = min(interval * self.backoff, self.max_interval)
+            else:
+                interval = self.min_interval
+            self.sleep(interval)
+
+        for path in list(self.devices):
+            self.disconnect(path)
+
+    def sleep(self, interval):
+        self._wake.wait(interval)
+        self._wake.clear()
+
+    def disconnect(self, device_path):
+        handle = self.devices.pop(device_path)
+        try:
+            handle.deactivate()
+        except Exception:
+            # The device is usually already gone
+            pass
+        self.post('device', ('disconnected', handle))
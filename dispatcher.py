@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+
+class UpdateDispatcher:
+    # Collects GUI updates posted from controller threads and hands them to the
+    # Tk thread once per frame. Ordered update types (button edges) are kept in
+    # arrival order so press/release pairs are never reordered; every other
+    # update is coalesced per key so only the latest value gets rendered. Only
+    # an overflowing queue merges edges, dropped counts the ones merged away.
+    def __init__(self, ordered_types=('button',), frame_budget_ms=8.0, max_ordered=1024):
+        self.ordered_types = frozenset(ordered_types)
+        self.frame_budget = frame_budget_ms / 1000
+        self.max_ordered = max_ordered
+
+        self._lock = threading.Lock()
+        self._ordered = deque()
+        self._latest = {}
+
+        # Counters, read by the stats views
+        self.posted = 0
+        self.handled = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.deferred = 0
+        self.errors = 0
+        self.frames = 0
+        self.last_frame_time = 0.0
+        self.max_frame_time = 0.0
+        self.total_frame_time = 0.0
+
+    def post(self, update_type, data, args=(), key=None):
+        # Called from any thread
+        with self._lock:
+            self.posted += 1
+            if update_type in self.ordered_types:
+                if len(self._ordered) >= self.max_ordered:
+                    # The GUI is hopelessly behind
+                    self._collapse_buttons()
+                self._ordered.append((update_type, data, args))
+            else:
+                if key is None:
+                    key = update_type
+                if key in self._latest:
+                    self.coalesced += 1
+                self._latest[key] = (update_type, data, args)
+
+    def _collapse_buttons(self):
+        # Keeps only the newest queued edge per session and button, so every
+        # button still ends up in its latest state. Device events are never
+        # shed. Button data is (session, (bit, pressed)).
+        seen = set()
+        kept = deque()
+        for update in reversed(self._ordered):
+            update_type, data, _ = update
+            if update_type == 'button':
+                session, (bit, _) = data
+                if (id(session), bit) in seen:
+                    self.dropped += 1
+                    continue
+                seen.add((id(session), bit))
+            kept.appendleft(update)
+        self._ordered = kept
+
+    @property
+    def depth(self):
+        return len(self._ordered) + len(self._latest)
+
+    def drain(self, handler):
+        # Called on the Tk thread once per frame. Runs handler(update_type, data, args)
+        # for pending updates until the frame budget is spent; anything left over
+        # is kept for the next frame instead of stalling the event loop.
+        start = time.perf_counter()
+        deadline = start + self.frame_budget
+
+        with self._lock:
+            ordered = self._ordered
+            latest = self._latest
+            self._ordered = deque()
+            self._latest = {}
+
+        handled = 0
+        while ordered and time.perf_counter() < deadline:
+            handled += self._call(handler, ordered.popleft())
+
+        while latest and time.perf_counter() < deadline:
+            key = next(iter(latest))
+            handled += self._call(handler, latest.pop(key))
+
+        if ordered or latest:
+            # Put leftovers back in front of anything posted while we were busy
+            with self._lock:
+                self.deferred += len(ordered) + len(latest)
+                ordered.extend(self._ordered)
+                self._ordered = ordered
+                for key, update in self._latest.items():
+                    if key in latest:
+                        self.coalesced += 1
+                    latest[key] = update
+                self._latest = latest
+
+        elapsed = time.perf_counter() - start
+        self.handled += handled
+        self.frames += 1
+        self.last_frame_time = elapsed
+        self.total_frame_time += elapsed
+        if elapsed > self.max_frame_time:
+            self.max_frame_time = elapsed
+        return handled
+
+    def _call(self, handler, update):
+        try:
+            handler(*update)
+        except Exception:
+            self.errors += 1
+        return 1
+
+    def stats(self):
+        frames = self.frames or 1
+        return {
+            'depth': self.depth,
+            'posted': self.posted,
+            'handled': self.handled,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'deferred': self.deferred,
+            'errors': self.errors,
+            'frames': self.frames,
+            'last_frame_ms': self.last_frame_time * 1000,
+            'avg_frame_ms': self.total_frame_time / frames * 1000,
+            'max_frame_ms': self.max_frame_time * 1000,
+        }
@@ -0,0 +1,236 @@
+import itertools
+import time
+from PIL import Image, ImageDraw
+from main import DualSenseGUI
+
+
+class OffscreenWidget:
+    # Accepts the geometry and event calls Tk widgets get and keeps the
+    # configured options, so labels can be read back
+    def __init__(self, parent=None, **options):
+        self.parent = parent
+        self.options = options
+        self.bindings = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, option):
+        return self.options.get(option, '')
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+    def pack(self, **options):
+        pass
+
+    def pack_forget(self):
+        pass
+
+    def destroy(self):
+        pass
+
+
+class OffscreenFrame(OffscreenWidget):
+    pass
+
+
+class OffscreenLabel(OffscreenWidget):
+    def __init__(self, parent=None, **options):
+        options.setdefault('fg', 'black')
+        super().__init__(parent, **options)
+
+
+class OffscreenCanvas(OffscreenWidget):
+    # The subset of tk.Canvas the GUI uses. Items are kept as plain records,
+    # changing one costs the same dict updates Tk's own bookkeeping does, and
+    # render() draws the scene into a PIL image on demand.
+    def __init__(self, parent=None, width=0, height=0, **options):
+        super().__init__(parent, **options)
+        self.width = width
+        self.height = height
+        self._ids = itertools.count(1)
+
+        # Item id -> [kind, coords, options], in stacking order
+        self.items = {}
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def set_size(self, width, height):
+        # What a window resize does, returns the <Configure> event
+        self.width = width
+        self.height = height
+        return OffscreenEvent(width, height)
+
+    def _create(self, kind, coords, options):
+        item = next(self._ids)
+        options.setdefault('state', 'normal')
+        self.items[item] = [kind, list(coords), options]
+        return item
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create('polygon', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def coords(self, item, *coords):
+        if coords:
+            self.items[item][1] = list(coords)
+        return self.items[item][1]
+
+    def itemconfig(self, item, **options):
+        self.items[item][2].update(options)
+
+    itemconfigure = itemconfig
+
+    def tag_raise(self, item):
+        self.items[item] = self.items.pop(item)
+
+    def delete(self, item):
+        self.items.pop(item, None)
+
+    def render(self, background='white'):
+        image = Image.new('RGB', (max(self.width, 1), max(self.height, 1)), background)
+        draw = ImageDraw.Draw(image)
+        for kind, coords, options in self.items.values():
+            if options['state'] == 'hidden':
+                continue
+            if kind == 'image':
+                source = options['image'].image
+                x, y = coords
+                mask = source if source.mode == 'RGBA' else None
+                image.paste(source, (int(x - source.width / 2), int(y - source.height / 2)), mask)
+            elif kind == 'oval':
+                draw.ellipse(coords, fill=options.get('fill') or None, outline=options.get('outline') or None)
+            elif kind == 'line':
+                draw.line(coords, fill=options.get('fill'), width=options.get('width', 1))
+            elif kind == 'polygon':
+                draw.polygon(coords, fill=options.get('fill') or None)
+            elif kind == 'rectangle':
+                draw.rectangle(coords, fill=options.get('fill') or None, outline=options.get('outline') or None)
+            elif kind == 'text':
+                draw.text(coords, options.get('text', ''), fill=options.get('fill', 'black'))
+        return image
+
+
+class OffscreenEvent:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+class OffscreenPhoto:
+    # Holds the PIL image where Tk would hold a PhotoImage
+    def __init__(self, image):
+        self.image = image
+
+    def width(self):
+        return self.image.width
+
+    def height(self):
+        return self.image.height
+
+
+class OffscreenRoot:
+    # Keeps after() callbacks and runs the ones that are due when asked,
+    # instead of from a Tk event loop
+    def __init__(self):
+        self.pending = {}
+        self._ids = itertools.count(1)
+
+    def after(self, ms, callback, *args):
+        job = f"after#{next(self._ids)}"
+        self.pending[job] = (time.perf_counter() + ms / 1000, callback, args)
+        return job
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, job):
+        self.pending.pop(job, None)
+
+    def update(self):
+        now = time.perf_counter()
+        for job in [job for job, (due, _, _) in self.pending.items() if due <= now]:
+            _, callback, args = self.pending.pop(job)
+            callback(*args)
+
+    update_idletasks = update
+
+    def bell(self):
+        pass
+
+    def destroy(self):
+        self.pending = {}
+
+
+class OffscreenWidgets:
+    Frame = OffscreenFrame
+    Label = OffscreenLabel
+    Canvas = OffscreenCanvas
+
+
+class HeadlessGUI(DualSenseGUI):
+    # The GUI's render paths without a window: update_button_state,
+    # update_stick_indicator, update_input_status, resize_image and the frame
+    # loop all run unchanged against offscreen widgets. Needs no display, so
+    # it can run in CI and in benchmarks.
+    widgets = OffscreenWidgets
+    photo_image = OffscreenPhoto
+
+    def __init__(self, width=900, height=420, frame_rate=60, frame_budget_ms=8, record_dir='recordings'):
+        self.root = OffscreenRoot()
+        self.init_state(frame_rate, frame_budget_ms, record_dir)
+
+        self.status_label = OffscreenLabel(text="Controller Status")
+        self.battery_value = OffscreenLabel(text="--")
+        self.connection_value = OffscreenLabel(text="--")
+        self.rate_value = OffscreenLabel(text="--")
+        self.default_fg = self.connection_value.cget('fg')
+        self.sessions_frame = OffscreenFrame()
+        self.sessions_strip_visible = False
+        self.input_status = OffscreenLabel(text="No inputs active")
+        self.record_btn = OffscreenLabel(text="Record")
+        self.record_label = OffscreenLabel(text="")
+        self.rumble_active = False
+
+        self.load_controller_image()
+        self.canvas = OffscreenCanvas(width=width, height=height)
+        self.create_stick_trails()
+        self.create_stick_arrows()
+        self.trigger_canvas = OffscreenCanvas(width=400, height=24)
+        self.create_trigger_bars()
+        self.resize_image(None)
+
+    def resize(self, width, height):
+        # Same path as a <Configure> event on the real canvas, the resample
+        # happens on the next update()
+        self.resize_image(self.canvas.set_size(width, height))
+
+    def pump(self):
+        # One display frame: drain and render, then run the idle callbacks
+        # Tk would run once the frame is on screen
+        self.render_frame()
+        self.root.update()
+
+    def snapshot(self):
+        return self.canvas.render()
@@ -0,0 +1,84 @@
+import numpy as np
+from sample_ring import SampleRing
+
+# Gyro changes less than this (standard deviation, raw counts) while the
+# controller is lying still
+REST_GYRO_NOISE = 30.0
+
+CHANNELS = ('gyro_x', 'gyro_y', 'gyro_z', 'accel_x', 'accel_y', 'accel_z')
+
+
+class ImuSampleBuffer(SampleRing):
+    # Gyroscope and accelerometer readings, one row per input report:
+    # time, gyro x/y/z, accel x/y/z
+    def __init__(self, capacity=16384):
+        super().__init__(len(CHANNELS), capacity)
+
+
+class MinMaxPlot:
+    # Scrolling plot data reduced to a min and max per pixel column. New
+    # samples are folded into their column as they arrive, so drawing always
+    # costs one point pair per column however fast the sensor reports.
+    def __init__(self, width, seconds, channels):
+        self.width = width
+        self.column_seconds = seconds / width
+        self.column_ids = np.full(width, -1, dtype=np.int64)
+        self.mins = np.zeros((width, channels))
+        self.maxs = np.zeros((width, channels))
+
+    def add(self, rows):
+        # rows: time followed by one value per channel, oldest first
+        if not len(rows):
+            return
+        columns = (rows[:, 0] / self.column_seconds).astype(np.int64)
+
+        # Only the newest width columns can still be shown
+        keep = columns > columns[-1] - self.width
+        rows, columns = rows[keep], columns[keep]
+
+        # Min and max of each run of samples that share a column
+        starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+        ids = columns[starts]
+        mins = np.minimum.reduceat(rows[:, 1:], starts, axis=0)
+        maxs = np.maximum.reduceat(rows[:, 1:], starts, axis=0)
+
+        # Merge into columns already started, overwrite the ones scrolled out
+        slots = ids % self.width
+        same = self.column_ids[slots] == ids
+        mins[same] = np.minimum(mins[same], self.mins[slots[same]])
+        maxs[same] = np.maximum(maxs[same], self.maxs[slots[same]])
+        self.mins[slots] = mins
+        self.maxs[slots] = maxs
+        self.column_ids[slots] = ids
+
+    def columns(self, now):
+        # (x, mins, maxs) of the columns inside the window ending at now,
+        # x counted in pixels from the left edge
+        last = int(now / self.column_seconds)
+        first = last - self.width + 1
+        ids = np.arange(first, last + 1)
+        slots = ids % self.width
+        valid = self.column_ids[slots] == ids
+        return ids[valid] - first, self.mins[slots[valid]], self.maxs[slots[valid]]
+
+    def reset(self):
+        self.column_ids[:] = -1
+
+
+def column_strokes(x, top, bottom):
+    # Canvas line points drawing each column as a vertical stroke from top
+    # to bottom. Strokes alternate direction so one line item draws them all.
+    even = np.arange(len(x)) % 2 == 0
+    first = np.where(even, top, bottom)
+    second = np.where(even, bottom, top)
+    return np.column_stack((x, first, x, second)).ravel().tolist()
+
+
+def rest_stats(rows):
+    # Bias (mean) and noise (standard deviation) per channel over the rows,
+    # and whether the controller was still the whole time
+    values = rows[:, 1:]
+    bias = values.mean(axis=0)
+    noise = values.std(axis=0)
+    at_rest = bool(len(rows) > 1 and noise[:3].max() < REST_GYRO_NOISE)
+    return bias, noise, at_rest
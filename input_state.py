@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+# Button bindings: display name and controller property. A button's bit in
+# the pressed mask is its index here, the same as its code in recordings.
+BUTTON_BINDINGS = (
+    ('L2', 'btn_l2'), ('L1', 'btn_l1'), ('R2', 'btn_r2'), ('R1', 'btn_r1'),
+    ('Triangle', 'btn_triangle'), ('Circle', 'btn_circle'), ('Cross', 'btn_cross'), ('Square', 'btn_square'),
+    ('D-Pad Up', 'btn_up'), ('D-Pad Right', 'btn_right'), ('D-Pad Down', 'btn_down'), ('D-Pad Left', 'btn_left'),
+    ('Create', 'btn_create'), ('Options', 'btn_options'), ('PS', 'btn_ps'), ('Touchpad', 'btn_touchpad'),
+    ('L3', 'btn_l3'), ('R3', 'btn_r3'),
+)
+BUTTON_BITS = {name: 1 << bit for bit, (name, _) in enumerate(BUTTON_BINDINGS)}
+ALL_BUTTONS = (1 << len(BUTTON_BINDINGS)) - 1
+
+# Axis bindings: controller property and the sign applied on the way in,
+# stick Y is flipped so up is negative like canvas coordinates. An axis's
+# slot in a session's axes array is its index here.
+AXIS_BINDINGS = (
+    ('left_stick_x', 1), ('left_stick_y', -1),
+    ('right_stick_x', 1), ('right_stick_y', -1),
+    ('left_trigger', 1), ('right_trigger', 1),
+)
+LEFT_X, LEFT_Y, RIGHT_X, RIGHT_Y, LEFT_TRIGGER, RIGHT_TRIGGER = range(len(AXIS_BINDINGS))
+STICK_AXES = (LEFT_X, LEFT_Y, RIGHT_X, RIGHT_Y)
+
+# Sticks closer to center than this don't show up in the status line
+STATUS_STICK_THRESHOLD = 0.1
+
+
+def set_bits(mask):
+    # Bit indexes set in mask, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@lru_cache(maxsize=256)
+def pressed_names(mask):
+    return tuple(BUTTON_BINDINGS[bit][0] for bit in set_bits(mask))
+
+
+def stick_key(x, y):
+    # What the status line shows for one stick, in hundredths, or None
+    if abs(x) <= STATUS_STICK_THRESHOLD and abs(y) <= STATUS_STICK_THRESHOLD:
+        return None
+    return (round(x * 100), round(y * 100))
+
+
+class StatusText:
+    # The "Active Inputs" line. The text is only rebuilt when something it
+    # shows changed: the pressed mask or a stick's value at two decimals.
+    def __init__(self):
+        self.key = None
+        self.text = "No inputs active"
+
+    def update(self, buttons, axes):
+        # Returns True when the text changed
+        if axes is None:
+            key = (buttons, None, None)
+        else:
+            key = (buttons, stick_key(axes[LEFT_X], axes[LEFT_Y]), stick_key(axes[RIGHT_X], axes[RIGHT_Y]))
+        if key == self.key:
+            return False
+        self.key = key
+
+        inputs = list(pressed_names(buttons))
+        for name, stick in (("Left Stick", key[1]), ("Right Stick", key[2])):
+            if stick is not None:
+                inputs.append(f"{name} (x: {stick[0] / 100:.2f}, y: {stick[1] / 100:.2f})")
+        text = "Active Inputs: " + " | ".join(inputs) if inputs else "No inputs active"
+        if text == self.text:
+            return False
+        self.text = text
+        return True
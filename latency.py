@@ -0,0 +1,116 @@
+import csv
+import itertools
+import json
+import time
+from array import array
+
+
+class LatencyTracker:
+    # Records when an input event passes each stage of the pipeline:
+    #
+    #   receipt  - the input report arrived on the reader thread
+    #   enqueue  - the update was handed to the dispatcher
+    #   dequeue  - the frame loop picked it up on the Tk thread
+    #   render   - Tk finished redrawing the frame that showed it
+    #
+    # Records live in a fixed-size ring buffer of preallocated arrays, so
+    # tracking never allocates per event and old records simply get overwritten.
+    STAGES = ('receipt', 'enqueue', 'dequeue', 'render')
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._counter = itertools.count()
+        self.sequence = array('q', [-1]) * capacity
+        self.event_types = [None] * capacity
+        self.receipt = array('d', [0.0]) * capacity
+        self.enqueue = array('d', [0.0]) * capacity
+        self.dequeue = array('d', [0.0]) * capacity
+        self.render = array('d', [0.0]) * capacity
+
+    def start(self, event_type, receipt=None):
+        # Called on the reader thread. Returns a ticket for the later stages.
+        # next() on itertools.count is atomic, so reader threads never share a slot.
+        ticket = next(self._counter)
+        index = ticket % self.capacity
+        self.sequence[index] = -1
+        self.event_types[index] = event_type
+        self.receipt[index] = receipt if receipt is not None else time.perf_counter()
+        self.enqueue[index] = 0.0
+        self.dequeue[index] = 0.0
+        self.render[index] = 0.0
+        self.sequence[index] = ticket
+        return ticket
+
+    def stamp(self, ticket, stage, timestamp=None):
+        index = ticket % self.capacity
+        # The ring may have wrapped around since the ticket was issued
+        if self.sequence[index] != ticket:
+            return
+        getattr(self, stage)[index] = timestamp if timestamp is not None else time.perf_counter()
+
+    def complete(self, tickets, timestamp=None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        for ticket in tickets:
+            self.stamp(ticket, 'render', timestamp)
+
+    def records(self):
+        # Completed records, oldest first
+        rows = []
+        for index in range(self.capacity):
+            if self.sequence[index] < 0 or not self.render[index]:
+                continue
+            rows.append((
+                self.sequence[index],
+                self.event_types[index],
+                self.receipt[index],
+                self.enqueue[index],
+                self.dequeue[index],
+                self.render[index],
+            ))
+        rows.sort()
+        return rows
+
+    def summary(self):
+        # p50/p95/p99 in milliseconds per event type, for the whole path and
+        # for each hop, so lag can be pinned on the callback, queue or renderer
+        spans = {}
+        for _, event_type, receipt, enqueue, dequeue, render in self.records():
+            per_type = spans.setdefault(event_type, {'total': [], 'callback': [], 'queue': [], 'render': []})
+            per_type['total'].append(render - receipt)
+            per_type['callback'].append(enqueue - receipt)
+            per_type['queue'].append(dequeue - enqueue)
+            per_type['render'].append(render - dequeue)
+
+        summary = {}
+        for event_type, per_type in spans.items():
+            summary[event_type] = {'count': len(per_type['total'])}
+            for span, values in per_type.items():
+                values.sort()
+                summary[event_type][span] = {
+                    'p50': percentile(values, 50) * 1000,
+                    'p95': percentile(values, 95) * 1000,
+                    'p99': percentile(values, 99) * 1000,
+                }
+        return summary
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('sequence', 'event_type') + self.STAGES)
+            writer.writerows(self.records())
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({
+                'summary_ms': self.summary(),
+                'records': [dict(zip(('sequence', 'event_type') + self.STAGES, row)) for row in self.records()],
+            }, f, indent=2)
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
@@ -0,0 +1,92 @@
+import numpy as np
+from timing import FixedRateLoop
+
+# Lightbar animations. Every frame's color is worked out up front into a
+# table of (r, g, b) tuples; playback only indexes it by time.
+ANIMATIONS = ('Breathing', 'Rainbow', 'Gradient Sweep', 'Battery Level')
+
+FRAME_RATE = 30
+
+
+def hsv_colors(hue, saturation=1.0, value=1.0):
+    # hue in [0, 1) as an array, returns uint8 RGB rows
+    hue = np.asarray(hue, dtype=float) % 1.0
+    sector = (hue * 6).astype(int) % 6
+    fraction = hue * 6 - np.floor(hue * 6)
+    p = value * (1 - saturation)
+    q = value * (1 - saturation * fraction)
+    t = value * (1 - saturation * (1 - fraction))
+    v = np.full_like(hue, value)
+    p = np.full_like(hue, p)
+    red = np.choose(sector, (v, q, p, p, t, v))
+    green = np.choose(sector, (t, v, v, q, p, p))
+    blue = np.choose(sector, (p, p, t, v, v, q))
+    return np.round(np.column_stack((red, green, blue)) * 255).astype(np.uint8)
+
+
+def to_table(colors):
+    return [tuple(row) for row in colors.tolist()]
+
+
+def breathing_table(color, period=3.0, rate=FRAME_RATE, floor=0.05):
+    # The color fading down to floor and back up, eased so it lingers at
+    # both ends like a breath
+    phase = np.arange(int(period * rate)) / (period * rate)
+    level = floor + (1 - floor) * (0.5 - 0.5 * np.cos(2 * np.pi * phase))
+    return to_table(np.round(np.outer(level, color)).astype(np.uint8))
+
+
+def rainbow_table(period=6.0, rate=FRAME_RATE):
+    # Full hue circle at full saturation and brightness
+    return to_table(hsv_colors(np.arange(int(period * rate)) / (period * rate)))
+
+
+def gradient_table(start, end, period=4.0, rate=FRAME_RATE):
+    # From start to end and back, linear in each channel
+    phase = np.arange(int(period * rate)) / (period * rate)
+    mix = 1 - np.abs(2 * phase - 1)
+    colors = np.outer(1 - mix, start) + np.outer(mix, end)
+    return to_table(np.round(colors).astype(np.uint8))
+
+
+def battery_table(level):
+    # One color for the charge level: red when empty, through yellow, to
+    # green when full
+    hue = min(max(level, 0), 100) / 100 / 3
+    return to_table(hsv_colors([hue]))
+
+
+class LightbarAnimator:
+    # Plays a color table on a FixedRateLoop. send(r, g, b) is called from
+    # the loop's thread, and only when the color differs from the last one
+    # sent, so a static table costs one write.
+    def __init__(self, send, rate_hz=FRAME_RATE):
+        self.send = send
+        self.rate_hz = rate_hz
+        self.table = None
+        self.last_color = None
+        self.loop = FixedRateLoop(rate_hz, self.tick, name="LightbarAnimator")
+
+    @property
+    def is_running(self):
+        return self.loop.is_running
+
+    def play(self, table):
+        # Swaps the table in, playback keeps its timing
+        self.table = table
+        self.last_color = None
+        if not self.loop.is_running:
+            self.loop.start()
+
+    def stop(self):
+        self.loop.stop()
+        self.table = None
+
+    def tick(self, frame, lateness):
+        table = self.table
+        if not table:
+            return
+        color = table[frame % len(table)]
+        if color != self.last_color:
+            self.last_color = color
+            self.send(*color)
@@ -1,16 +1,1528 @@
+import time
+from startup_profile import StartupProfile
+
+# Cold start timing, started before anything heavy is imported
+startup_profile = StartupProfile()
+
 import tkinter as tk
-from PIL import Image, ImageTk, ImageDraw
-from queue import Queue
-from dualsense_controller import DualSenseController
+from PIL import Image, ImageTk
+import itertools
 import math
 from tkinter import ttk
-from tkinter import messagebox
-from tkinter import colorchooser
 import os
 import sys
+from collections import OrderedDict, deque
+from dispatcher import UpdateDispatcher
+from device_monitor import DeviceMonitor
+from sessions import ControllerSession, SessionManager, connect_callbacks
+from latency import LatencyTracker
+from input_state import (
+    BUTTON_BINDINGS, BUTTON_BITS, ALL_BUTTONS, StatusText, set_bits,
+    LEFT_X, LEFT_Y, RIGHT_X, RIGHT_Y, LEFT_TRIGGER, RIGHT_TRIGGER
+)
+from recorder import InputRecorder
+from output_scheduler import OutputScheduler, rumble
+from replay import (
+    ReplayController, ReplayDeviceInfo, load_sessions, button_mash, stick_circles, trigger_pulls, battery_drain
+)
+
+startup_profile.mark('imports')
+
+class StickTrail:
+    # The last few seconds of one stick's motion. Line items come from a
+    # fixed pool: each frame's new motion takes the oldest one and moves it,
+    # so nothing already drawn is touched again and the item count never grows.
+    MAX_POINTS = 8
+    
+    def __init__(self, canvas, pool_size, color='#e67e22'):
+        self.canvas = canvas
+        self.free = deque(
+            canvas.create_line(0, 0, 0, 0, fill=color, width=2, state='hidden') for _ in range(pool_size)
+        )
+        self.shown = deque()  # (item, timestamp), oldest first
+        self.last_point = None
+    
+    def add(self, points, timestamp):
+        # Join up with where the previous frame ended
+        if self.last_point is not None:
+            points = list(self.last_point) + points
+        self.last_point = points[-2:]
+        if len(points) < 4:
+            return
+        
+        if self.free:
+            item = self.free.popleft()
+        else:
+            item, _ = self.shown.popleft()
+        self.canvas.coords(item, *points)
+        self.canvas.itemconfig(item, state='normal')
+        self.shown.append((item, timestamp))
+    
+    def expire(self, cutoff):
+        while self.shown and self.shown[0][1] < cutoff:
+            item, _ = self.shown.popleft()
+            self.canvas.itemconfig(item, state='hidden')
+            self.free.append(item)
+    
+    def clear(self):
+        self.expire(float('inf'))
+        self.last_point = None
+    
+    def raise_items(self):
+        for item in self.free:
+            self.canvas.tag_raise(item)
+        for item, _ in self.shown:
+            self.canvas.tag_raise(item)
+
+
+
+class FadingTrail(StickTrail):
+    # A StickTrail whose segments lighten as they age. A segment is only
+    # recolored when it crosses into the next shade, so an idle trail costs
+    # no canvas calls.
+    SHADES = 6
+    
+    def __init__(self, canvas, pool_size, color, seconds):
+        super().__init__(canvas, pool_size, color)
+        self.seconds = seconds
+        red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+        self.colors = []
+        for shade in range(self.SHADES):
+            # Blend toward the white background
+            mix = shade / self.SHADES
+            self.colors.append('#%02x%02x%02x' % tuple(
+                round(channel + (255 - channel) * mix) for channel in (red, green, blue)
+            ))
+        self.shades = {}
+    
+    def add(self, points, timestamp):
+        newest = self.shown[-1] if self.shown else None
+        super().add(points, timestamp)
+        if self.shown and self.shown[-1] is not newest:
+            item = self.shown[-1][0]
+            if self.shades.get(item) != 0:
+                self.canvas.itemconfig(item, fill=self.colors[0])
+                self.shades[item] = 0
+    
+    def break_line(self):
+        # The finger lifted, the next point starts a new line
+        self.last_point = None
+    
+    def fade(self, now):
+        self.expire(now - self.seconds)
+        for item, timestamp in self.shown:
+            shade = min(int((now - timestamp) / self.seconds * self.SHADES), self.SHADES - 1)
+            if shade != self.shades.get(item):
+                self.canvas.itemconfig(item, fill=self.colors[shade])
+                self.shades[item] = shade
+
+
+class SessionPanel:
+    # Compact view of one controller, shown in the session strip. Items are
+    # created once and only recolored or moved when their input changes.
+    WIDTH = 104
+    HEIGHT = 62
+    
+    # Part of the 1200x1200 controller image the panel shows
+    REGION_LEFT = 230
+    REGION_TOP = 280
+    SCALE = 104 / 790
+    
+    def __init__(self, parent, session, button_positions, stick_positions, on_select, widgets=tk):
+        self.session = session
+        self.frame = widgets.Frame(parent, relief='groove', borderwidth=2)
+        self.frame.pack(side='left', padx=2)
+        
+        self.title = widgets.Label(self.frame, text=f"#{session.session_id}", font=('Arial', 8))
+        self.title.pack()
+        self.connection = ""
+        self.battery = ""
+        self.report_rate = ""
+        
+        self.canvas = widgets.Canvas(self.frame, width=self.WIDTH, height=self.HEIGHT, highlightthickness=0)
+        self.canvas.pack()
+        
+        # Stick rings with a dot that follows the stick
+        self.stick_centers = {}
+        self.stick_rings = {}
+        self.stick_dots = {}
+        for stick, position in stick_positions.items():
+            x, y = self.to_panel(position)
+            self.stick_centers[stick] = (x, y)
+            self.stick_rings[stick] = self.canvas.create_oval(x - 6, y - 6, x + 6, y + 6, outline='gray')
+            self.stick_dots[stick] = self.canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill='red', outline='')
+        
+        # One dot per button
+        self.buttons = {}
+        for btn, position in button_positions.items():
+            if btn in stick_positions:
+                continue  # L3/R3 light up the stick ring instead
+            x, y = self.to_panel(position)
+            self.buttons[btn] = self.canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill='#cccccc', outline='')
+        
+        # Clicking anywhere on the panel selects the controller
+        for widget in (self.frame, self.title, self.canvas):
+            widget.bind('<Button-1>', lambda e: on_select(self.session))
+    
+    def to_panel(self, position):
+        x, y = position
+        return (int((x - self.REGION_LEFT) * self.SCALE), int((y - self.REGION_TOP) * self.SCALE))
+    
+    def set_buttons(self, buttons, changed):
+        for bit in set_bits(changed):
+            button = BUTTON_BINDINGS[bit][0]
+            is_pressed = buttons >> bit & 1
+            if button in self.buttons:
+                self.canvas.itemconfig(self.buttons[button], fill='red' if is_pressed else '#cccccc')
+            elif button in self.stick_rings:
+                self.canvas.itemconfig(self.stick_rings[button], outline='red' if is_pressed else 'gray')
+    
+    def set_sticks(self, session):
+        axes = session.axes
+        for stick, (value_x, value_y) in (('L3', (axes[LEFT_X], axes[LEFT_Y])),
+                                          ('R3', (axes[RIGHT_X], axes[RIGHT_Y]))):
+            x, y = self.stick_centers[stick]
+            x += int(value_x * 5)
+            y += int(value_y * 5)
+            self.canvas.coords(self.stick_dots[stick], x - 2, y - 2, x + 2, y + 2)
+    
+    def set_connection(self, connection_type):
+        conn_type = connection_type[0] if isinstance(connection_type, tuple) else connection_type
+        self.connection = "BT" if str(conn_type).startswith('Bluetooth') else str(conn_type)
+        self.update_title()
+    
+    def set_battery(self, battery_data):
+        try:
+            self.battery = f"{battery_data.level_percentage}%"
+        except Exception:
+            self.battery = ""
+        self.update_title()
+    
+    def set_report_rate(self, rate_hz):
+        self.report_rate = f"{rate_hz:.0f}Hz"
+        self.update_title()
+    
+    def update_title(self):
+        parts = [f"#{self.session.session_id}", self.connection, self.battery, self.report_rate]
+        text = " ".join(part for part in parts if part)
+        if self.title.cget('text') != text:
+            self.title.config(text=text)
+    
+    def set_selected(self, selected):
+        self.frame.config(relief='solid' if selected else 'groove')
+    
+    def destroy(self):
+        self.frame.destroy()
+
+
+class StatsWindow:
+    # Live p50/p95/p99 latency per event type, refreshed while open
+    SPANS = (
+        ('total', "Total"),
+        ('callback', "Callback"),
+        ('queue', "Queue"),
+        ('render', "Render"),
+    )
+    HISTOGRAM_WIDTH = 400
+    HISTOGRAM_HEIGHT = 80
+    
+    def __init__(self, parent, latency, dispatcher, get_session, output=None, get_render_errors=None,
+                 refresh_ms=500):
+        self.latency = latency
+        self.dispatcher = dispatcher
+        self.output = output
+        self.get_render_errors = get_render_errors
+        self.get_session = get_session
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Input Latency")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        columns = ('count', 'p50', 'p95', 'p99')
+        self.table = ttk.Treeview(self.window, columns=columns, height=16)
+        self.table.heading('#0', text="Event / stage")
+        self.table.column('#0', width=160)
+        for column in columns:
+            self.table.heading(column, text=column if column == 'count' else f"{column} (ms)")
+            self.table.column(column, width=80, anchor='e')
+        self.table.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        self.counters = tk.Label(self.window, font=('Arial', 9), justify='left')
+        self.counters.pack(fill='x', padx=5)
+        
+        # Report inter-arrival histogram for the selected controller
+        self.histogram_label = tk.Label(self.window, font=('Arial', 9), justify='left')
+        self.histogram_label.pack(fill='x', padx=5, pady=(5, 0))
+        self.histogram = tk.Canvas(self.window, width=self.HISTOGRAM_WIDTH, height=self.HISTOGRAM_HEIGHT, bg='white')
+        self.histogram.pack(padx=5)
+        self.histogram_bars = []
+        
+        buttons = tk.Frame(self.window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Export CSV", command=self.export_csv, width=10).pack(side='left', padx=2)
+        tk.Button(buttons, text="Export JSON", command=self.export_json, width=10).pack(side='left', padx=2)
+        
+        self.refresh()
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        self.table.delete(*self.table.get_children())
+        for event_type, stats in sorted(self.latency.summary().items()):
+            parent = self.table.insert('', 'end', text=event_type, values=(stats['count'], '', '', ''), open=True)
+            for span, label in self.SPANS:
+                values = stats[span]
+                self.table.insert(parent, 'end', text=label, values=(
+                    '', f"{values['p50']:.2f}", f"{values['p95']:.2f}", f"{values['p99']:.2f}"
+                ))
+        
+        counters = self.dispatcher.stats()
+        self.counters.config(text=(
+            f"Queue depth: {counters['depth']}   Coalesced: {counters['coalesced']}   "
+            f"Dropped: {counters['dropped']}   Deferred: {counters['deferred']}   "
+            f"Handler errors: {counters['errors']}" + self.render_error_counters() + "\n"
+            f"Frame handler time: last {counters['last_frame_ms']:.2f} ms, "
+            f"avg {counters['avg_frame_ms']:.2f} ms, max {counters['max_frame_ms']:.2f} ms"
+            + self.output_counters()
+        ))
+        
+        self.draw_histogram()
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def render_error_counters(self):
+        if self.get_render_errors is None:
+            return ""
+        count, last = self.get_render_errors()
+        return f"   Render errors: {count}" + (f" ({last})" if last else "")
+    
+    def output_counters(self):
+        if self.output is None:
+            return ""
+        output = self.output.stats()
+        return (
+            f"\nOutput writes: {output['submitted']} changes, {output['coalesced']} coalesced, "
+            f"{output['ticks']} ticks, slowest {output['max_apply_ms']:.2f} ms"
+        )
+    
+    def draw_histogram(self):
+        session = self.get_session()
+        stats = session.report_stats if session is not None else None
+        if stats is None:
+            self.histogram_label.config(text="Report intervals: no controller")
+            return
+        
+        counts = stats['window_histogram']
+        meter = session.report_meter
+        self.histogram_label.config(text=(
+            f"Report intervals ({meter.bin_width_ns / 1e6:.1f} ms bins, last bar = overflow): "
+            f"mean {stats['mean_interval_ms']:.2f} ms, p99 {stats['p99_interval_ms']:.1f} ms, "
+            f"dropouts {stats['dropouts']}, longest gap {stats['longest_gap_ms']:.1f} ms"
+        ))
+        
+        # Bars are created once and resized in place
+        if len(self.histogram_bars) != len(counts):
+            self.histogram.delete('all')
+            bar_width = self.HISTOGRAM_WIDTH / len(counts)
+            self.histogram_bars = [
+                self.histogram.create_rectangle(
+                    i * bar_width, self.HISTOGRAM_HEIGHT, (i + 1) * bar_width - 1, self.HISTOGRAM_HEIGHT,
+                    fill='#e74c3c' if i == len(counts) - 1 else '#3498db', outline=''
+                )
+                for i in range(len(counts))
+            ]
+        
+        tallest = max(counts) or 1
+        bar_width = self.HISTOGRAM_WIDTH / len(counts)
+        for i, (bar, count) in enumerate(zip(self.histogram_bars, counts)):
+            height = int(count / tallest * (self.HISTOGRAM_HEIGHT - 2))
+            self.histogram.coords(
+                bar, i * bar_width, self.HISTOGRAM_HEIGHT - height, (i + 1) * bar_width - 1, self.HISTOGRAM_HEIGHT
+            )
+    
+    def export_csv(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=self.window, defaultextension='.csv', filetypes=[("CSV", "*.csv")]
+        )
+        if path:
+            self.latency.export_csv(path)
+    
+    def export_json(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=self.window, defaultextension='.json', filetypes=[("JSON", "*.json")]
+        )
+        if path:
+            self.latency.export_json(path)
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.is_open = False
+        self.window.destroy()
+
+
+class StickTestWindow:
+    # Pass/fail drift, deadzone, circularity and range report for the
+    # selected controller's sticks, computed from every sample it sent
+    ROWS = (
+        ('drift', "Resting drift", 'max_drift', '<='),
+        ('rest_noise', "Resting noise", 'max_rest_noise', '<='),
+        ('deadzone', "Deadzone", 'max_deadzone', '<='),
+        ('circularity', "Circularity error", 'max_circularity_error', '<='),
+        ('coverage', "Range coverage", 'min_coverage', '>='),
+    )
+    VALUES = {
+        'drift': 'drift',
+        'rest_noise': 'rest_noise',
+        'deadzone': 'deadzone',
+        'circularity': 'mean_circularity_error',
+        'coverage': 'coverage',
+    }
+    PLOT_SIZE = 150
+    
+    def __init__(self, parent, get_session, refresh_ms=500):
+        from stick_analysis import DEFAULT_LIMITS, LIBRARY_DEADZONE
+        self.limits = DEFAULT_LIMITS
+        self.get_session = get_session
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Stick Test")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        tk.Label(
+            self.window,
+            text="Let go of both sticks for a second, then roll each one around its full range a few times.",
+            font=('Arial', 9)
+        ).pack(padx=5, pady=(5, 0))
+        
+        tk.Label(
+            self.window,
+            text=f"Values come after the controller library's {LIBRARY_DEADZONE:.2f} stick deadzone: "
+                 f"drift below it reads as 0, and the deadzone can't measure under it.",
+            font=('Arial', 8),
+            fg='gray'
+        ).pack(padx=5)
+        
+        self.result_label = tk.Label(self.window, text="--", font=('Arial', 14, 'bold'))
+        self.result_label.pack(pady=5)
+        
+        columns = ('value', 'limit', 'result')
+        self.table = ttk.Treeview(self.window, columns=columns, height=12)
+        self.table.heading('#0', text="Stick / check")
+        self.table.column('#0', width=160)
+        for column in columns:
+            self.table.heading(column, text=column.capitalize())
+            self.table.column(column, width=80, anchor='e')
+        self.table.tag_configure('fail', foreground='#e74c3c')
+        self.table.tag_configure('pass', foreground='#2ecc71')
+        self.table.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        # Furthest point reached per angle against the ideal outer circle, and
+        # a heatmap of everywhere the stick has been
+        plots = tk.Frame(self.window)
+        plots.pack(pady=5)
+        self.plots = {}
+        self.heatmaps = []
+        self.heatmap_version = None
+        for name in ("Left Stick", "Right Stick"):
+            frame = tk.Frame(plots)
+            frame.pack(side='left', padx=10)
+            tk.Label(frame, text=name, font=('Arial', 9)).pack()
+            canvas = tk.Canvas(frame, width=self.PLOT_SIZE, height=self.PLOT_SIZE, bg='white')
+            canvas.pack()
+            center = self.PLOT_SIZE / 2
+            radius = center - 10
+            canvas.create_oval(center - radius, center - radius, center + radius, center + radius, outline='gray')
+            outline = canvas.create_polygon(center, center, center, center, center, center,
+                                            fill='', outline='#3498db', width=2)
+            self.plots[name] = (canvas, outline)
+            
+            heatmap = ImageTk.PhotoImage(Image.new('RGB', (self.PLOT_SIZE, self.PLOT_SIZE), 'white'))
+            tk.Label(frame, image=heatmap, borderwidth=1, relief='solid').pack(pady=(5, 0))
+            self.heatmaps.append(heatmap)
+        
+        tk.Button(self.window, text="Reset samples", command=self.reset, width=12).pack(pady=5)
+        
+        self.refresh()
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        session = self.get_session()
+        self.table.delete(*self.table.get_children())
+        if session is None:
+            self.result_label.config(text="No controller", fg='gray')
+        else:
+            from stick_analysis import analyse_samples
+            report = analyse_samples(session.stick_samples.snapshot(), self.limits)
+            self.show_report(report)
+            # Resting samples the main window hasn't folded in yet
+            session.take_stick_samples()
+            self.show_heatmaps(session.stick_heatmap)
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def show_report(self, report):
+        passed = all(stick['passed'] for stick in report.values())
+        self.result_label.config(text="PASS" if passed else "FAIL", fg='#2ecc71' if passed else '#e74c3c')
+        
+        for name, stick in report.items():
+            tag = 'pass' if stick['passed'] else 'fail'
+            parent = self.table.insert(
+                '', 'end', text=f"{name} ({stick['samples']} samples)",
+                values=('', '', "PASS" if stick['passed'] else "FAIL"), open=True, tags=(tag,)
+            )
+            for check, label, limit, comparison in self.ROWS:
+                value = stick[self.VALUES[check]]
+                ok = stick['checks'][check]
+                if check == 'coverage':
+                    shown = f"{value * 100:.0f}%"
+                    limit_text = f"{comparison} {self.limits[limit] * 100:.0f}%"
+                else:
+                    shown = "--" if value != value else f"{value:.3f}"  # NaN before any data
+                    limit_text = f"{comparison} {self.limits[limit]:.3f}"
+                self.table.insert(parent, 'end', text=label, values=(
+                    shown, limit_text, "PASS" if ok else "FAIL"
+                ), tags=('pass' if ok else 'fail',))
+            self.draw_outline(name, stick['max_radius'])
+    
+    def show_heatmaps(self, heatmap):
+        # Paste into the existing images, and only when samples came in
+        if heatmap.version == self.heatmap_version:
+            return
+        self.heatmap_version = heatmap.version
+        for photo, pixels in zip(self.heatmaps, heatmap.pixels):
+            image = Image.fromarray(pixels).resize((self.PLOT_SIZE, self.PLOT_SIZE), Image.Resampling.NEAREST)
+            photo.paste(image)
+
+    def draw_outline(self, name, max_radius):
+        canvas, outline = self.plots[name]
+        center = self.PLOT_SIZE / 2
+        scale = center - 10
+        points = []
+        bins = len(max_radius)
+        for i, radius in enumerate(max_radius):
+            # Bin centers, matching the angle binning in stick_analysis
+            angle = (i + 0.5) / bins * 2 * math.pi - math.pi
+            points.append(center + math.cos(angle) * radius * scale)
+            points.append(center + math.sin(angle) * radius * scale)
+        canvas.coords(outline, *points)
+    
+    def reset(self):
+        session = self.get_session()
+        if session is not None:
+            session.stick_samples.reset()
+            session.stick_heatmap.reset()
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.is_open = False
+        self.window.destroy()
+
+
+class MotionWindow:
+    # Scrolling gyroscope and accelerometer plots with a bias and noise
+    # readout. Runs on its own timer and only reads the session's sample
+    # ring, so the main render loop never waits on it.
+    PLOTS = (
+        ("Gyroscope", 0),
+        ("Accelerometer", 3),
+    )
+    AXIS_COLORS = ('#e74c3c', '#2ecc71', '#3498db')
+    PLOT_WIDTH = 480
+    PLOT_HEIGHT = 120
+    SECONDS = 10
+    
+    def __init__(self, parent, get_session, refresh_ms=33):
+        self.get_session = get_session
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        self.session = None
+        self.consumed = 0
+        
+        from imu import MinMaxPlot
+        self.plot = MinMaxPlot(self.PLOT_WIDTH, self.SECONDS, 6)
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Motion Sensors")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.canvases = []
+        self.lines = []
+        self.readouts = []
+        for title, _ in self.PLOTS:
+            tk.Label(self.window, text=f"{title} (x red, y green, z blue)", font=('Arial', 9)).pack(pady=(5, 0))
+            canvas = tk.Canvas(self.window, width=self.PLOT_WIDTH, height=self.PLOT_HEIGHT, bg='white')
+            canvas.pack(padx=5)
+            canvas.create_line(0, self.PLOT_HEIGHT / 2, self.PLOT_WIDTH, self.PLOT_HEIGHT / 2, fill='#dddddd')
+            self.canvases.append(canvas)
+            self.lines.append([
+                canvas.create_line(0, 0, 0, 0, fill=color, state='hidden') for color in self.AXIS_COLORS
+            ])
+            readout = tk.Label(self.window, font=('Courier', 9), justify='left')
+            readout.pack(fill='x', padx=5)
+            self.readouts.append(readout)
+        
+        self.rest_label = tk.Label(self.window, text="--", font=('Arial', 10, 'bold'))
+        self.rest_label.pack(pady=5)
+        
+        self.refresh()
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        session = self.get_session()
+        if session is not self.session:
+            # Start over for another controller
+            self.session = session
+            self.consumed = 0
+            self.plot.reset()
+        
+        if session is not None:
+            from imu import rest_stats
+            rows, self.consumed = session.imu_samples.since(self.consumed)
+            self.plot.add(rows)
+            self.draw(time.perf_counter())
+            
+            # Bias and noise over the last second or so of reports
+            recent = session.imu_samples.recent(1000)
+            recent = recent[recent[:, 0] > time.perf_counter() - 1.0]
+            if len(recent) > 1:
+                bias, noise, at_rest = rest_stats(recent)
+                self.show_readout(bias, noise, at_rest)
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def draw(self, now):
+        from imu import column_strokes
+        x, mins, maxs = self.plot.columns(now)
+        for (_, first_channel), canvas, lines in zip(self.PLOTS, self.canvases, self.lines):
+            if not len(x):
+                for line in lines:
+                    canvas.itemconfig(line, state='hidden')
+                continue
+            
+            # Symmetric scale around zero that fits everything on screen
+            low = mins[:, first_channel:first_channel + 3]
+            high = maxs[:, first_channel:first_channel + 3]
+            scale = (self.PLOT_HEIGHT / 2 - 2) / max(abs(low).max(), abs(high).max(), 1.0)
+            for axis, line in enumerate(lines):
+                top = self.PLOT_HEIGHT / 2 - high[:, axis] * scale
+                bottom = self.PLOT_HEIGHT / 2 - low[:, axis] * scale
+                canvas.coords(line, *column_strokes(x, top, bottom))
+                canvas.itemconfig(line, state='normal')
+    
+    def show_readout(self, bias, noise, at_rest):
+        for (title, first_channel), readout in zip(self.PLOTS, self.readouts):
+            axes = range(first_channel, first_channel + 3)
+            readout.config(text=(
+                "bias  " + "  ".join(f"{name} {bias[i]:>8.1f}" for name, i in zip("xyz", axes)) + "\n"
+                "noise " + "  ".join(f"{name} {noise[i]:>8.2f}" for name, i in zip("xyz", axes))
+            ))
+        if at_rest:
+            self.rest_label.config(text="At rest: bias and noise are valid", fg='#2ecc71')
+        else:
+            self.rest_label.config(text="Moving: lay the controller flat and still to measure", fg='#f1c40f')
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.is_open = False
+        self.window.destroy()
+
+
+class TouchpadWindow:
+    # The touchpad surface: both finger contacts with their ids, fading
+    # traces of where they went and a coverage grid that fills in as the
+    # surface is swiped. Cells still gray after a full sweep never reported
+    # a contact.
+    SCALE = 0.25
+    FINGER_COLORS = ('#3498db', '#e67e22')
+    UNCOVERED = '#e0e0e0'
+    COVERED = '#abebc6'
+    TRAIL_SECONDS = 3.0
+    
+    def __init__(self, parent, get_session, refresh_ms=33):
+        from touchpad import TouchCoverage, TOUCHPAD_WIDTH, TOUCHPAD_HEIGHT
+        self.get_session = get_session
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        self.session = None
+        self.consumed = 0
+        self.coverage = TouchCoverage()
+        self.last_ids = [None, None]
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Touchpad")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        tk.Label(
+            self.window,
+            text="Swipe over the whole touchpad, gray cells never reported a touch.",
+            font=('Arial', 9)
+        ).pack(padx=5, pady=(5, 0))
+        
+        width = round(TOUCHPAD_WIDTH * self.SCALE)
+        height = round(TOUCHPAD_HEIGHT * self.SCALE)
+        self.canvas = tk.Canvas(self.window, width=width, height=height, bg='white', highlightthickness=0)
+        self.canvas.pack(padx=5, pady=5)
+        
+        # Coverage grid, one block of pixels per cell, painted cell by cell
+        self.cell_pixels = round(self.coverage.cell * self.SCALE)
+        self.grid_image = tk.PhotoImage(
+            width=self.coverage.columns * self.cell_pixels, height=self.coverage.rows * self.cell_pixels
+        )
+        self.grid_image.put(self.UNCOVERED, to=(0, 0, self.grid_image.width(), self.grid_image.height()))
+        self.canvas.create_image(0, 0, image=self.grid_image, anchor='nw')
+        
+        pool_size = int(self.TRAIL_SECONDS * 1000 / refresh_ms) + 1
+        self.trails = [
+            FadingTrail(self.canvas, pool_size, color, self.TRAIL_SECONDS) for color in self.FINGER_COLORS
+        ]
+        self.contacts = []
+        for color in self.FINGER_COLORS:
+            dot = self.canvas.create_oval(0, 0, 0, 0, fill=color, outline='', state='hidden')
+            label = self.canvas.create_text(0, 0, text="", font=('Arial', 9, 'bold'), state='hidden')
+            self.contacts.append((dot, label))
+        
+        self.coverage_label = tk.Label(self.window, text="--", font=('Arial', 10))
+        self.coverage_label.pack()
+        tk.Button(self.window, text="Reset", command=self.reset, width=8).pack(pady=5)
+        
+        self.refresh()
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        session = self.get_session()
+        if session is not self.session:
+            self.session = session
+            self.reset()
+        
+        now = time.perf_counter()
+        if session is not None:
+            rows, self.consumed = session.touch_samples.since(self.consumed)
+            if len(rows):
+                self.add_rows(rows, now)
+        for trail in self.trails:
+            trail.fade(now)
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def add_rows(self, rows, now):
+        from touchpad import contact_strokes, finger_columns
+        for finger, trail in enumerate(self.trails):
+            active, finger_id, x, y = finger_columns(finger)
+            down = rows[:, active] > 0
+            self.paint_cells(self.coverage.add(rows[down, x], rows[down, y]))
+            
+            for contact_id, xs, ys, ended in contact_strokes(rows, finger):
+                if contact_id != self.last_ids[finger]:
+                    trail.break_line()
+                    self.last_ids[finger] = contact_id
+                points = [0.0] * (2 * len(xs))
+                points[0::2] = (xs * self.SCALE).tolist()
+                points[1::2] = (ys * self.SCALE).tolist()
+                trail.add(points, now)
+                if ended:
+                    trail.break_line()
+                    self.last_ids[finger] = None
+            
+            # Contact marker from the latest report
+            last = rows[-1]
+            self.show_contact(finger, last[active] > 0, int(last[finger_id]), last[x], last[y])
+        
+        self.coverage_label.config(text=(
+            f"Coverage: {self.coverage.fraction() * 100:.1f}% "
+            f"({self.coverage.covered} of {self.coverage.cells} cells)"
+        ))
+    
+    def paint_cells(self, cells):
+        size = self.cell_pixels
+        for cell in cells.tolist():
+            row, column = divmod(cell, self.coverage.columns)
+            self.grid_image.put(self.COVERED, to=(column * size, row * size, (column + 1) * size, (row + 1) * size))
+    
+    def show_contact(self, finger, active, contact_id, x, y):
+        dot, label = self.contacts[finger]
+        if not active:
+            self.canvas.itemconfig(dot, state='hidden')
+            self.canvas.itemconfig(label, state='hidden')
+            return
+        x *= self.SCALE
+        y *= self.SCALE
+        self.canvas.coords(dot, x - 8, y - 8, x + 8, y + 8)
+        self.canvas.coords(label, x, y - 16)
+        self.canvas.itemconfig(dot, state='normal')
+        self.canvas.itemconfig(label, text=f"#{contact_id}", state='normal')
+        self.canvas.tag_raise(dot)
+        self.canvas.tag_raise(label)
+    
+    def reset(self):
+        self.consumed = self.session.touch_samples.count if self.session is not None else 0
+        self.coverage.reset()
+        self.grid_image.put(self.UNCOVERED, to=(0, 0, self.grid_image.width(), self.grid_image.height()))
+        self.coverage_label.config(text="Coverage: 0.0%")
+        for finger, trail in enumerate(self.trails):
+            trail.clear()
+            self.show_contact(finger, False, 0, 0, 0)
+        self.last_ids = [None, None]
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.is_open = False
+        self.window.destroy()
+
+
+class TriggerCaptureWindow:
+    # Pressure against time for one trigger under every adaptive trigger
+    # preset in turn. The curves can be saved and loaded back as a
+    # reference, so one unit's resistance profile can be checked against
+    # another's.
+    PLOT_WIDTH = 480
+    PLOT_HEIGHT = 200
+    SETTLE_SECONDS = 0.3
+    CURVE_COLORS = ('#7f8c8d', '#e74c3c', '#2ecc71', '#3498db', '#9b59b6', '#e67e22', '#1abc9c', '#34495e')
+    
+    def __init__(self, parent, get_session, presets, set_effect, refresh_ms=100):
+        self.get_session = get_session
+        self.presets = presets
+        self.set_effect = set_effect
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        
+        # Capture in progress: presets still to run, the current one and its window
+        self.queue = []
+        self.preset = None
+        self.session = None
+        self.started_at = 0.0
+        self.ends_at = 0.0
+        self.first_row = 0
+        self.seconds = 4.0
+        self.trigger = 'R2'
+        self.curves = {}
+        self.reference = None
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Trigger Capture")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        controls = tk.Frame(self.window)
+        controls.pack(pady=5)
+        self.trigger_var = tk.StringVar(value=self.trigger)
+        for trigger in ('L2', 'R2'):
+            tk.Radiobutton(controls, text=trigger, variable=self.trigger_var, value=trigger).pack(side='left')
+        tk.Label(controls, text="Seconds per preset:").pack(side='left', padx=(10, 2))
+        self.seconds_var = tk.StringVar(value="4")
+        ttk.Combobox(
+            controls, textvariable=self.seconds_var, values=["2", "4", "6", "10"], state='readonly', width=4
+        ).pack(side='left')
+        self.start_btn = tk.Button(controls, text="Start", command=self.start, width=8)
+        self.start_btn.pack(side='left', padx=10)
+        
+        self.prompt = tk.Label(self.window, text="Press Start, then pull the trigger fully and let go during each preset.",
+                               font=('Arial', 10))
+        self.prompt.pack(padx=5)
+        
+        self.canvas = tk.Canvas(self.window, width=self.PLOT_WIDTH, height=self.PLOT_HEIGHT, bg='white')
+        self.canvas.pack(padx=5, pady=5)
+        self.lines = {}
+        self.reference_lines = {}
+        for preset, color in zip(self.presets, itertools.cycle(self.CURVE_COLORS)):
+            self.reference_lines[preset] = self.canvas.create_line(0, 0, 0, 0, fill=color, dash=(3, 3), state='hidden')
+            self.lines[preset] = self.canvas.create_line(0, 0, 0, 0, fill=color, width=2, state='hidden')
+        
+        columns = ('peak', 'rise', 'mean', 'reference')
+        self.table = ttk.Treeview(self.window, columns=columns, height=len(self.presets))
+        self.table.heading('#0', text="Preset")
+        self.table.column('#0', width=170)
+        for column, title in zip(columns, ("Peak", "Rise s", "Mean", "RMS vs ref")):
+            self.table.heading(column, text=title)
+            self.table.column(column, width=75, anchor='e')
+        for preset, color in zip(self.presets, itertools.cycle(self.CURVE_COLORS)):
+            self.table.tag_configure(preset, foreground=color)
+        self.table.pack(fill='x', padx=5)
+        
+        buttons = tk.Frame(self.window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Save...", command=self.save, width=10).pack(side='left', padx=2)
+        tk.Button(buttons, text="Load reference...", command=self.load_reference, width=14).pack(side='left', padx=2)
+        
+        self.refresh()
+    
+    def start(self):
+        session = self.get_session()
+        if session is None:
+            self.prompt.config(text="No controller")
+            return
+        self.session = session
+        self.trigger = self.trigger_var.get()
+        self.seconds = float(self.seconds_var.get())
+        self.curves = {}
+        for preset in self.presets:
+            self.canvas.itemconfig(self.lines[preset], state='hidden')
+        self.queue = list(self.presets)
+        self.start_btn.config(state='disabled')
+        self.next_preset()
+    
+    def next_preset(self):
+        if not self.queue:
+            # Done, leave the trigger without resistance
+            self.preset = None
+            self.set_effect(self.session, self.trigger, 'Off')
+            self.start_btn.config(state='normal')
+            self.prompt.config(text="Capture finished")
+            self.show_results()
+            return
+        self.preset = self.queue.pop(0)
+        self.set_effect(self.session, self.trigger, self.preset)
+        # Give the effect a moment to take hold before timing starts
+        self.started_at = time.perf_counter() + self.SETTLE_SECONDS
+        self.ends_at = self.started_at + self.seconds
+        self.first_row = self.session.trigger_samples.count
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        if self.preset is not None:
+            now = time.perf_counter()
+            if self.session is not self.get_session():
+                # Controller went away or another one was selected
+                self.queue = []
+                self.preset = None
+                self.start_btn.config(state='normal')
+                self.prompt.config(text="Capture stopped, the controller changed")
+            elif now >= self.ends_at:
+                from triggers import capture_curve, resample_curve
+                rows, _ = self.session.trigger_samples.since(self.first_row)
+                times, pressure = capture_curve(rows, self.trigger, self.started_at, self.ends_at)
+                self.curves[self.preset] = resample_curve(times, pressure, self.seconds)
+                self.draw_curve(self.lines[self.preset], self.curves[self.preset])
+                self.next_preset()
+            else:
+                left = max(self.ends_at - now, 0.0)
+                self.prompt.config(text=f"Pull and release {self.trigger} with '{self.preset}' active: {left:.1f} s left")
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def draw_curve(self, line, curve):
+        step = self.PLOT_WIDTH / (len(curve) - 1)
+        points = []
+        for i, value in enumerate(curve.tolist()):
+            points.append(i * step)
+            points.append(self.PLOT_HEIGHT - 4 - value * (self.PLOT_HEIGHT - 8))
+        self.canvas.coords(line, *points)
+        self.canvas.itemconfig(line, state='normal')
+    
+    def show_results(self):
+        from triggers import curve_summary, curve_difference
+        self.table.delete(*self.table.get_children())
+        for preset in self.presets:
+            curve = self.curves.get(preset)
+            if curve is None:
+                continue
+            summary = curve_summary(curve, self.seconds)
+            difference = "--"
+            if self.reference is not None and self.reference['seconds'] == self.seconds:
+                reference = self.reference['curves'].get(preset)
+                if reference is not None and len(reference) == len(curve):
+                    difference = f"{curve_difference(curve, reference):.3f}"
+            rise = "--" if summary['rise_s'] != summary['rise_s'] else f"{summary['rise_s']:.2f}"
+            self.table.insert('', 'end', text=preset, values=(
+                f"{summary['peak'] * 100:.0f}%", rise, f"{summary['mean'] * 100:.0f}%", difference
+            ), tags=(preset,))
+    
+    def save(self):
+        if not self.curves:
+            return
+        from tkinter import filedialog
+        from triggers import save_profiles
+        path = filedialog.asksaveasfilename(
+            parent=self.window, defaultextension='.json', filetypes=[("JSON", "*.json")],
+            initialfile=f"trigger-{self.trigger}-{self.session.serial_number}.json"
+        )
+        if path:
+            save_profiles(path, self.session.serial_number, self.trigger, self.seconds, self.curves)
+    
+    def load_reference(self):
+        from tkinter import filedialog
+        from triggers import load_profiles
+        path = filedialog.askopenfilename(parent=self.window, filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        self.reference = load_profiles(path)
+        for preset, line in self.reference_lines.items():
+            curve = self.reference['curves'].get(preset)
+            if curve is None:
+                self.canvas.itemconfig(line, state='hidden')
+            else:
+                self.draw_curve(line, curve)
+        self.prompt.config(text=(
+            f"Reference: {self.reference['trigger']} of {self.reference['serial_number']}, dashed"
+        ))
+        self.show_results()
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        if self.preset is not None:
+            self.set_effect(self.session, self.trigger, 'Off')
+        self.is_open = False
+        self.window.destroy()
+
+
+class RumbleWindow:
+    # Plays rumble envelopes to both motors at a fixed update rate and shows
+    # how closely the writes kept to the schedule. The same envelope run on
+    # several units shows up weak or unbalanced motors.
+    PLOT_WIDTH = 480
+    PLOT_HEIGHT = 100
+    MOTORS = {'Both': (1.0, 1.0), 'Left only': (1.0, 0.0), 'Right only': (0.0, 1.0)}
+    
+    def __init__(self, parent, get_session, stop_motors, refresh_ms=100):
+        self.get_session = get_session
+        self.stop_motors = stop_motors
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        self.player = None
+        self.player_controller = None
+        self.loaded = None
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Rumble Waveforms")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        controls = tk.Frame(self.window)
+        controls.pack(pady=5)
+        self.shape_var = tk.StringVar(value='Sine')
+        self.frequency_var = tk.StringVar(value="1")
+        self.seconds_var = tk.StringVar(value="5")
+        self.motors_var = tk.StringVar(value='Both')
+        for label, variable, values, width in (
+            ("Shape:", self.shape_var, ['Sine', 'Pulse', 'Ramp', 'File'], 6),
+            ("Hz:", self.frequency_var, ["0.5", "1", "2", "5", "10", "20"], 4),
+            ("Seconds:", self.seconds_var, ["2", "5", "10", "30"], 4),
+            ("Motors:", self.motors_var, list(self.MOTORS), 9),
+        ):
+            tk.Label(controls, text=label).pack(side='left', padx=(6, 1))
+            combo = ttk.Combobox(controls, textvariable=variable, values=values, state='readonly', width=width)
+            combo.pack(side='left')
+            combo.bind('<<ComboboxSelected>>', lambda e: self.draw_envelope())
+        self.loop_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(controls, text="Loop", variable=self.loop_var).pack(side='left', padx=6)
+        
+        self.canvas = tk.Canvas(self.window, width=self.PLOT_WIDTH, height=self.PLOT_HEIGHT, bg='white')
+        self.canvas.pack(padx=5, pady=5)
+        self.left_line = self.canvas.create_line(0, 0, 0, 0, fill='#e74c3c')
+        self.right_line = self.canvas.create_line(0, 0, 0, 0, fill='#3498db', dash=(4, 2))
+        self.playhead = self.canvas.create_line(0, 0, 0, self.PLOT_HEIGHT, fill='gray', state='hidden')
+        
+        self.stats_label = tk.Label(self.window, text="Left motor red, right motor blue", font=('Courier', 9))
+        self.stats_label.pack(padx=5)
+        
+        buttons = tk.Frame(self.window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Play", command=self.play, width=8).pack(side='left', padx=2)
+        tk.Button(buttons, text="Stop", command=self.stop, width=8).pack(side='left', padx=2)
+        tk.Button(buttons, text="Load CSV...", command=self.load, width=10).pack(side='left', padx=2)
+        
+        self.draw_envelope()
+        self.refresh()
+    
+    def envelope(self):
+        import rumble
+        if self.shape_var.get() == 'File':
+            return self.loaded
+        left, right = self.MOTORS[self.motors_var.get()]
+        frequency = float(self.frequency_var.get())
+        seconds = float(self.seconds_var.get())
+        if self.shape_var.get() == 'Sine':
+            return rumble.sine_envelope(frequency, seconds, left, right)
+        if self.shape_var.get() == 'Pulse':
+            return rumble.pulse_envelope(frequency, seconds, left_gain=left, right_gain=right)
+        return rumble.ramp_envelope(seconds, left, right)
+    
+    def draw_envelope(self):
+        envelope = self.envelope()
+        if envelope is None or not len(envelope):
+            return
+        # At most one point per pixel column, the envelope can be long
+        step = max(1, len(envelope) // self.PLOT_WIDTH)
+        shown = envelope[::step]
+        x_scale = self.PLOT_WIDTH / max(len(shown) - 1, 1)
+        for line, column in ((self.left_line, 0), (self.right_line, 1)):
+            points = []
+            for i, value in enumerate(shown[:, column].tolist()):
+                points.append(i * x_scale)
+                points.append(self.PLOT_HEIGHT - 4 - value / 255 * (self.PLOT_HEIGHT - 8))
+            if len(points) < 4:
+                points += points
+            self.canvas.coords(line, *points)
+    
+    def play(self):
+        session = self.get_session()
+        envelope = self.envelope()
+        if session is None or envelope is None:
+            self.stats_label.config(text="No controller" if session is None else "Load a CSV first")
+            return
+        self.stop()
+        import rumble
+        controller = session.controller
+        
+        def write(left, right):
+            controller.left_rumble.set(left)
+            controller.right_rumble.set(right)
+        
+        self.draw_envelope()
+        self.player = rumble.RumblePlayer(
+            envelope, write, loop=self.loop_var.get(), on_finished=lambda player: self.stop_motors(controller)
+        )
+        self.player_controller = controller
+        self.player.start()
+    
+    def stop(self):
+        if self.player is not None and self.player.is_running:
+            self.player.stop()
+            self.stop_motors(self.player_controller)
+    
+    def load(self):
+        from tkinter import filedialog, messagebox
+        import rumble
+        path = filedialog.askopenfilename(parent=self.window, filetypes=[("CSV", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.loaded = rumble.load_envelope(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Rumble Waveforms", str(error), parent=self.window)
+            return
+        self.shape_var.set('File')
+        self.draw_envelope()
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        player = self.player
+        if player is not None:
+            x = player.position / max(len(player.envelope) - 1, 1) * self.PLOT_WIDTH
+            self.canvas.coords(self.playhead, x, 0, x, self.PLOT_HEIGHT)
+            self.canvas.itemconfig(self.playhead, state='normal' if player.is_running else 'hidden')
+            stats = player.stats()
+            self.stats_label.config(text=(
+                f"{'playing' if player.is_running else 'stopped'}  {stats['writes']} writes  "
+                f"late p50 {stats['p50_ms']:.2f}  p99 {stats['p99_ms']:.2f}  max {stats['max_ms']:.2f} ms  "
+                f"skipped {stats['skipped']}"
+            ))
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.stop()
+        self.is_open = False
+        self.window.destroy()
+
+
+class TriggerSweepWindow:
+    # Runs every trigger effect through a grid of its parameters, L2 then
+    # R2, one step at a fixed interval, and logs when each step went out.
+    # The sweep runs unattended; pulling the triggers while it plays shows
+    # up effects that don't engage.
+    def __init__(self, parent, get_session, stop_effects, refresh_ms=100):
+        self.get_session = get_session
+        self.stop_effects = stop_effects
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        self.sweep = None
+        # Encoded on the first Start, encoding loads the controller library
+        # and that only happens on the device monitor thread until then
+        self.steps = None
+        
+        import trigger_sweep
+        self.window = tk.Toplevel(parent)
+        self.window.title("Trigger Sweep")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        controls = tk.Frame(self.window)
+        controls.pack(pady=5)
+        tk.Label(controls, text="Seconds per step:").pack(side='left', padx=(6, 1))
+        self.step_var = tk.StringVar(value=str(trigger_sweep.STEP_SECONDS))
+        ttk.Combobox(
+            controls, textvariable=self.step_var, values=["0.1", "0.25", "0.5", "1"], state='readonly', width=5
+        ).pack(side='left')
+        
+        self.progress = ttk.Progressbar(self.window, length=420)
+        self.progress.pack(padx=5, pady=5)
+        self.step_label = tk.Label(self.window, text="Press Start to sweep L2, then R2", font=('Courier', 9))
+        self.step_label.pack(padx=5)
+        self.stats_label = tk.Label(self.window, text="", font=('Courier', 9))
+        self.stats_label.pack(padx=5)
+        
+        buttons = tk.Frame(self.window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Start", command=self.start, width=8).pack(side='left', padx=2)
+        tk.Button(buttons, text="Stop", command=self.stop, width=8).pack(side='left', padx=2)
+        tk.Button(buttons, text="Save Log...", command=self.save, width=10).pack(side='left', padx=2)
+        
+        self.refresh()
+    
+    def start(self):
+        session = self.get_session()
+        if session is None:
+            self.step_label.config(text="No controller")
+            return
+        self.stop()
+        import trigger_sweep
+        if self.steps is None:
+            try:
+                self.steps = trigger_sweep.sweep_steps()
+            except Exception as e:
+                self.step_label.config(text=f"Error loading controller library: {e}")
+                return
+            self.progress.config(maximum=len(self.steps))
+        controller = session.controller
+        self.sweep = trigger_sweep.TriggerSweep(
+            controller, self.steps, float(self.step_var.get()),
+            on_finished=lambda sweep: self.stop_effects(controller)
+        )
+        self.sweep.start()
+    
+    def stop(self):
+        if self.sweep is not None and self.sweep.is_running:
+            self.sweep.stop()
+            self.stop_effects(self.sweep.controller)
+    
+    def save(self):
+        from tkinter import filedialog
+        if self.sweep is None:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.window, defaultextension=".csv", filetypes=[("CSV", "*.csv")]
+        )
+        if path:
+            self.sweep.save_log(path)
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        sweep = self.sweep
+        if sweep is not None:
+            import trigger_sweep
+            self.progress.config(value=sweep.position + 1)
+            if sweep.position >= 0:
+                trigger, _, effect, params, _ = sweep.steps[sweep.position]
+                state = "finished" if sweep.finished else "running" if sweep.is_running else "stopped"
+                self.step_label.config(text=(
+                    f"{state}  step {sweep.position + 1}/{len(sweep.steps)}  "
+                    f"{trigger} {effect} {trigger_sweep.describe(params)}"
+                ))
+            stats = sweep.stats()
+            self.stats_label.config(text=(
+                f"late p50 {stats['p50_ms']:.2f}  p99 {stats['p99_ms']:.2f}  max {stats['max_ms']:.2f} ms  "
+                f"skipped {stats['skipped']}  total {sweep.duration:.0f} s"
+            ))
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.stop()
+        self.is_open = False
+        self.window.destroy()
+
+
+class ButtonHealthWindow:
+    # Press timing of every button from its recorded edges: press count,
+    # shortest and median press, and the bounce, chatter and double presses
+    # too quick to see on the overlay. Worn face buttons and D-pads show up
+    # here first.
+    STATUS_COLORS = {'OK': '#27ae60', 'Suspect': '#e67e22', 'Worn': '#e74c3c'}
+    
+    def __init__(self, parent, get_session, refresh_ms=250):
+        self.get_session = get_session
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        self.session = None
+        # Edge count per button when its row was last filled
+        self.shown_counts = [None] * len(BUTTON_BINDINGS)
+        
+        import button_health
+        self.window = tk.Toplevel(parent)
+        self.window.title("Button Health")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        tk.Label(self.window, text=(
+            f"Bounce: press under {button_health.BOUNCE_SECONDS * 1000:.0f} ms   "
+            f"Chatter: re-press under {button_health.CHATTER_SECONDS * 1000:.0f} ms   "
+            f"Double: presses under {button_health.DOUBLE_SECONDS * 1000:.0f} ms apart"
+        ), font=('Arial', 9)).pack(padx=5, pady=5)
+        
+        columns = ('presses', 'shortest', 'median', 'bounce', 'chatter', 'double', 'status')
+        self.table = ttk.Treeview(self.window, columns=columns, height=len(BUTTON_BINDINGS))
+        self.table.heading('#0', text="Button")
+        self.table.column('#0', width=110)
+        for column, title in zip(columns, ("Presses", "Shortest ms", "Median ms", "Bounce", "Chatter", "Double",
+                                           "Status")):
+            self.table.heading(column, text=title)
+            self.table.column(column, width=80, anchor='e')
+        for status, color in self.STATUS_COLORS.items():
+            self.table.tag_configure(status, foreground=color)
+        for bit, (name, _) in enumerate(BUTTON_BINDINGS):
+            self.table.insert('', 'end', iid=str(bit), text=name, values=('0',) + ('--',) * 5 + ('',))
+        self.table.pack(fill='x', padx=5)
+        
+        buttons = tk.Frame(self.window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Reset", command=self.reset, width=8).pack(side='left', padx=2)
+        
+        self.refresh()
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        session = self.get_session()
+        if session is not self.session:
+            self.session = session
+            self.shown_counts = [None] * len(BUTTON_BINDINGS)
+        if session is not None:
+            self.update_rows(session.button_edges)
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def update_rows(self, edges):
+        # Only buttons with new edges are worked out again
+        from button_health import edge_stats, health_status
+        for bit in range(len(BUTTON_BINDINGS)):
+            count = edges.count(bit)
+            if count == self.shown_counts[bit]:
+                continue
+            self.shown_counts[bit] = count
+            stats = edge_stats(edges.rings[bit].snapshot())
+            if not stats['presses']:
+                self.table.item(str(bit), values=('0',) + ('--',) * 5 + ('',), tags=())
+                continue
+            status = health_status(stats)
+            self.table.item(str(bit), values=(
+                stats['presses'],
+                "--" if stats['shortest_ms'] is None else f"{stats['shortest_ms']:.1f}",
+                "--" if stats['median_ms'] is None else f"{stats['median_ms']:.1f}",
+                stats['bounce'], stats['chatter'], stats['double'], status
+            ), tags=(status,))
+    
+    def reset(self):
+        if self.session is not None:
+            self.session.button_edges.reset()
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        self.is_open = False
+        self.window.destroy()
+
+
+class StationWindow:
+    # Production test station. Every controller that connects runs the
+    # checklist from station.py in turn; the result goes to SQLite by serial
+    # number and the next unit starts as soon as it is plugged in.
+    CHECK_TITLES = {
+        'buttons': "All buttons",
+        'left_stick': "Left stick range",
+        'right_stick': "Right stick range",
+        'triggers': "L2 / R2 travel",
+        'battery': "Battery",
+    }
+    
+    def __init__(self, parent, get_sessions, select_session, database, refresh_ms=200):
+        import station
+        self.get_sessions = get_sessions
+        self.select_session = select_session
+        self.refresh_ms = refresh_ms
+        self.is_open = True
+        self.run = None
+        self.last_session = None
+        # Sessions that already ran the checklist, a unit is tested once per plug-in
+        self.tested = set()
+        self.station_started = time.perf_counter()
+        self.units = 0
+        self.passed = 0
+        self.store = station.ResultStore(database)
+        self.store.start()
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Test Station")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.unit_label = tk.Label(self.window, text="Waiting for a controller...", font=('Arial', 14, 'bold'))
+        self.unit_label.pack(padx=10, pady=(10, 5))
+        
+        checklist = tk.Frame(self.window)
+        checklist.pack(padx=10, pady=5)
+        self.check_marks = {}
+        self.check_details = {}
+        for row, name in enumerate(station.CHECKS):
+            mark = tk.Label(checklist, text="-", font=('Arial', 12, 'bold'), width=2)
+            mark.grid(row=row, column=0)
+            tk.Label(checklist, text=self.CHECK_TITLES[name], font=('Arial', 11), anchor='w', width=16).grid(
+                row=row, column=1, sticky='w')
+            detail = tk.Label(checklist, text="", font=('Courier', 9), anchor='w', width=48)
+            detail.grid(row=row, column=2, sticky='w')
+            self.check_marks[name] = mark
+            self.check_details[name] = detail
+        
+        self.counters = tk.Label(self.window, text="", font=('Courier', 9))
+        self.counters.pack(padx=10)
+        
+        columns = ('result', 'seconds')
+        self.table = ttk.Treeview(self.window, columns=columns, height=8)
+        self.table.heading('#0', text="Serial")
+        self.table.column('#0', width=200)
+        for column, title in zip(columns, ("Result", "Seconds")):
+            self.table.heading(column, text=title)
+            self.table.column(column, width=90, anchor='e')
+        self.table.tag_configure('pass', foreground='#27ae60')
+        self.table.tag_configure('fail', foreground='#e74c3c')
+        self.table.pack(fill='x', padx=10, pady=5)
+        
+        buttons = tk.Frame(self.window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Fail Unit", command=self.fail_unit, width=10).pack(side='left', padx=2)
+        tk.Button(buttons, text="Retest", command=self.retest, width=10).pack(side='left', padx=2)
+        tk.Label(buttons, text=database, font=('Arial', 8), fg='gray').pack(side='left', padx=10)
+        
+        self.refresh()
+    
+    def on_connected(self, session):
+        if self.run is None:
+            self.start_run(session)
+    
+    def on_disconnected(self, session):
+        if self.run is not None and self.run.session is session:
+            self.run.abort('disconnected')
+            self.finish_run()
+        self.tested.discard(session.session_id)
+    
+    def start_run(self, session):
+        import station
+        self.tested.add(session.session_id)
+        self.last_session = session
+        self.run = station.StationRun(session)
+        self.select_session(session)
+        self.unit_label.config(text=f"Testing {self.run.serial_number}", fg='black')
+    
+    def next_unit(self):
+        # The first connected controller that hasn't been tested yet
+        for session in self.get_sessions():
+            if session.session_id not in self.tested:
+                self.start_run(session)
+                return
+    
+    def finish_run(self):
+        run = self.run
+        self.run = None
+        self.show_checks(run)
+        result = run.result()
+        self.store.add(result)
+        self.units += 1
+        self.passed += result['passed']
+        outcome = "PASS" if result['passed'] else "FAIL" if run.aborted is None else f"FAIL ({run.aborted})"
+        self.unit_label.config(text=f"{run.serial_number}: {outcome}", fg='#27ae60' if result['passed'] else '#e74c3c')
+        self.table.insert('', 0, text=run.serial_number, values=(outcome, f"{result['duration_s']:.1f}"),
+                          tags=('pass' if result['passed'] else 'fail',))
+        self.next_unit()
+    
+    def fail_unit(self):
+        if self.run is not None:
+            self.run.abort('failed by operator')
+            self.finish_run()
+    
+    def retest(self):
+        # Starts the last unit over. A run still in progress is the same
+        # unit's, it is dropped rather than stored or counted.
+        session = self.last_session
+        if session is not None and session in self.get_sessions():
+            self.run = None
+            self.start_run(session)
+    
+    def show_checks(self, run):
+        for name, (passed, measurement) in run.checks().items():
+            self.check_marks[name].config(text="\u2713" if passed else "-", fg='#27ae60' if passed else 'gray')
+            if name == 'buttons':
+                detail = "Press: " + ", ".join(measurement['missing']) if measurement['missing'] else ""
+            elif name == 'triggers':
+                detail = f"L2 {measurement['L2'] * 100:.0f}%  R2 {measurement['R2'] * 100:.0f}%"
+            elif name == 'battery':
+                detail = "--" if measurement['level'] is None else f"{measurement['level']}%"
+            else:
+                detail = f"x {measurement['x'][0]:+.2f} {measurement['x'][1]:+.2f}  y {measurement['y'][0]:+.2f} {measurement['y'][1]:+.2f}"
+            self.check_details[name].config(text=detail)
+    
+    def refresh(self):
+        if not self.is_open:
+            return
+        
+        if self.run is None:
+            self.next_unit()
+        if self.run is not None:
+            finished = self.run.update()
+            if finished:
+                self.finish_run()
+            else:
+                self.show_checks(self.run)
+        
+        hours = (time.perf_counter() - self.station_started) / 3600
+        self.counters.config(text=(
+            f"{self.units} units  {self.passed} passed  {self.units - self.passed} failed  "
+            f"{self.units / hours if hours > 0 else 0:.0f} units/h  "
+            f"saved {self.store.written}" + (f"  DB error: {self.store.last_error}" if self.store.errors else "")
+        ))
+        
+        self.window.after(self.refresh_ms, self.refresh)
+    
+    def lift(self):
+        self.window.lift()
+    
+    def close(self):
+        # A unit still under test is left out, its checklist isn't complete
+        self.is_open = False
+        self.store.stop()
+        self.window.destroy()
+
 
 class DualSenseGUI:
-    def __init__(self):
+    # Widget and image classes used outside the main window setup, the
+    # offscreen backend in headless.py swaps in its own
+    widgets = tk
+    photo_image = ImageTk.PhotoImage
+    
+    def __init__(self, frame_rate=60, frame_budget_ms=8, monitor_interval=1.0, monitor_max_interval=5.0,
+                 max_controllers=8, autoconnect=True, record_dir='recordings', profile_startup=None,
+                 output_rate_hz=60, station_db='station_results.db'):
         try:
             from ctypes import windll  # Only exists on Windows.
 
@@ -21,6 +1533,7 @@ class DualSenseGUI:
         self.root = tk.Tk()
         self.root.title("DualSense Controller Tester By AneesKhan47 (Version v1.0.0)")
         self.root.geometry("900x600")
+        startup_profile.mark('window')
         
         # Disable resizing and maximize button
         self.root.resizable(0, 0)
@@ -37,34 +1550,8 @@ class DualSenseGUI:
         # Set the position of the window to the center of the screen
         self.root.geometry(f"900x600+{x}+{y}")
         
-        # Create update queue
-        self.update_queue = Queue()
-        
-        # Controller status
-        self.controller = None
-        self.is_running = True
-        
-        # Initialize image attributes
-        self.base_resized = None
-        self.working_image = None
-        self.controller_image = None
-        self.image_on_canvas = None
-        
-        # Add stick position tracking with previous values
-        self.left_stick_x = 0
-        self.left_stick_y = 0
-        self.prev_stick_x = 0
-        self.prev_stick_y = 0
-        self.right_stick_x = 0
-        self.right_stick_y = 0
-        self.prev_right_x = 0
-        self.prev_right_y = 0
-        
-        # Update stick positions
-        self.stick_positions = {
-            'L3': (452, 688),  # Left analog stick position
-            'R3': (755, 688)   # Right analog stick position
-        }
+        self.init_state(frame_rate, frame_budget_ms, record_dir, output_rate_hz)
+        self.station_db = station_db
         
         # Create main frame
         self.main_frame = tk.Frame(self.root)
@@ -108,6 +1595,24 @@ class DualSenseGUI:
         )
         self.connection_value.pack(side='left', padx=(0, 5))
         
+        # Input report rate and jitter indicator
+        self.rate_label = tk.Label(
+            self.status_frame,
+            text="Reports: ",
+            font=('Arial', 12)
+        )
+        self.rate_label.pack(side='left', padx=5)
+        
+        self.rate_value = tk.Label(
+            self.status_frame,
+            text="--",
+            font=('Arial', 12, 'bold')
+        )
+        self.rate_value.pack(side='left', padx=(0, 5))
+        
+        # Remember the theme's text color for resetting the indicators
+        self.default_fg = self.connection_value.cget('fg')
+        
         # Create frame for top controls (Haptic, Lightbar, and Player LEDs)
         self.top_controls_frame = tk.Frame(self.main_frame)
         self.top_controls_frame.pack(pady=5)
@@ -213,8 +1718,43 @@ class DualSenseGUI:
         )
         self.led_btn.pack(side='left', padx=2)
         
+        # Second row of output controls, the top row is full at the window's width
+        self.effects_frame = tk.Frame(self.main_frame)
+        self.effects_frame.pack(pady=(0, 5))
+        
+        # Lightbar animations, for checking the LEDs light evenly
+        tk.Label(
+            self.effects_frame,
+            text="Lightbar Animation:",
+            font=('Arial', 12)
+        ).pack(side='left', padx=2)
+        
+        self.lightbar_var = tk.StringVar(value='Static')
+        self.lightbar_combo = ttk.Combobox(
+            self.effects_frame,
+            textvariable=self.lightbar_var,
+            values=['Static', 'Breathing', 'Rainbow', 'Gradient Sweep', 'Battery Level'],
+            state='readonly',
+            width=13
+        )
+        self.lightbar_combo.pack(side='left', padx=2)
+        self.lightbar_combo.bind('<<ComboboxSelected>>', lambda e: self.select_lightbar_animation())
+        self.lightbar_drift = tk.Label(self.effects_frame, text="", font=('Arial', 8), fg='gray')
+        self.lightbar_drift.pack(side='left', padx=2)
+        
+        # Rumble waveform player
+        self.waveforms_btn = tk.Button(
+            self.effects_frame,
+            text="Rumble Waveforms",
+            command=self.open_rumble,
+            width=16
+        )
+        self.waveforms_btn.pack(side='left', padx=(15, 2))
+        
         # Load and display controller image
+        startup_profile.mark('widgets')
         self.setup_controller_image()
+        startup_profile.mark('controller image')
         
         # Create frame for Adaptive Triggers (centered)
         self.triggers_frame = tk.Frame(self.main_frame)
@@ -261,6 +1801,32 @@ class DualSenseGUI:
         )
         self.right_trigger_btn.pack(side='left', padx=2)
         
+        self.trigger_capture_btn = tk.Button(
+            self.triggers_frame,
+            text="Capture",
+            command=self.open_trigger_capture,
+            width=8
+        )
+        self.trigger_capture_btn.pack(side='left', padx=2)
+        
+        self.trigger_sweep_btn = tk.Button(
+            self.triggers_frame,
+            text="Sweep",
+            command=self.open_trigger_sweep,
+            width=8
+        )
+        self.trigger_sweep_btn.pack(side='left', padx=2)
+        
+        # Analog pressure of both triggers
+        self.trigger_canvas = tk.Canvas(self.main_frame, width=400, height=24, highlightthickness=0)
+        self.trigger_canvas.pack()
+        self.create_trigger_bars()
+        
+        # Compact panels for every connected controller, shown once there
+        # is more than one
+        self.sessions_frame = tk.Frame(self.main_frame)
+        self.sessions_strip_visible = False
+        
         # Input status label (centered)
         self.input_status = tk.Label(self.main_frame, text="No inputs active", font=('Arial', 12))
         self.input_status.pack(pady=10)
@@ -280,6 +1846,184 @@ class DualSenseGUI:
         self.credit_label.pack(side='right', padx=10)
         self.credit_label.bind('<Button-1>', lambda e: self.open_github())
         
+        # Latency and dispatcher statistics (left aligned)
+        self.stats_btn = tk.Button(
+            self.bottom_frame,
+            text="Stats",
+            command=self.open_stats,
+            width=6
+        )
+        self.stats_btn.pack(side='left', padx=10)
+        
+        # Stick drift and circularity test
+        self.stick_test_btn = tk.Button(
+            self.bottom_frame,
+            text="Stick Test",
+            command=self.open_stick_test,
+            width=9
+        )
+        self.stick_test_btn.pack(side='left', padx=2)
+        
+        # Gyro and accelerometer plots
+        self.motion_btn = tk.Button(
+            self.bottom_frame,
+            text="Motion",
+            command=self.open_motion,
+            width=7
+        )
+        self.motion_btn.pack(side='left', padx=2)
+        
+        # Touchpad contacts and coverage
+        self.touchpad_btn = tk.Button(
+            self.bottom_frame,
+            text="Touchpad",
+            command=self.open_touchpad,
+            width=9
+        )
+        self.touchpad_btn.pack(side='left', padx=2)
+        
+        # Press timing, bounce and chatter per button
+        self.button_health_btn = tk.Button(
+            self.bottom_frame,
+            text="Buttons",
+            command=self.open_button_health,
+            width=8
+        )
+        self.button_health_btn.pack(side='left', padx=2)
+        
+        # Production test station: checklist per unit, results to SQLite
+        self.station_btn = tk.Button(
+            self.bottom_frame,
+            text="Station",
+            command=self.open_station,
+            width=7
+        )
+        self.station_btn.pack(side='left', padx=2)
+        
+        self.trail_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            self.bottom_frame,
+            text="Trail",
+            variable=self.trail_var,
+            command=self.toggle_trail
+        ).pack(side='left', padx=2)
+        
+        # Input recording toggle and progress
+        self.record_btn = tk.Button(
+            self.bottom_frame,
+            text="Record",
+            command=self.toggle_recording,
+            width=8
+        )
+        self.record_btn.pack(side='left', padx=2)
+        
+        self.record_label = tk.Label(self.bottom_frame, text="", font=('Arial', 9))
+        self.record_label.pack(side='left', padx=5)
+        
+        self.rumble_active = False  # Add this to track rumble state
+        
+        # Start watching for controllers in the background
+        if autoconnect:
+            self.start_device_monitor(monitor_interval, monitor_max_interval, max_controllers)
+        
+        # Start processing GUI updates
+        self.process_updates()
+        
+        # Report rate readout, twice a second
+        self.update_report_rates()
+        startup_profile.mark('remaining widgets')
+        
+        # Time to first paint, the canvas is exposed once the window maps
+        self.first_painted = False
+        self.canvas.bind('<Expose>', self.on_first_expose)
+        
+        # With --profile-startup, report the timings and quit once started
+        self.profile_startup = profile_startup
+        if profile_startup:
+            self.root.after(50, self.check_startup_profile)
+
+    def init_state(self, frame_rate, frame_budget_ms, record_dir, output_rate_hz=60):
+        # Everything the render paths need apart from the widgets themselves,
+        # shared with the offscreen backend in headless.py
+        
+        # Create update dispatcher, drained once per display frame
+        self.dispatcher = UpdateDispatcher(ordered_types=('button', 'device'), frame_budget_ms=frame_budget_ms)
+        self.frame_interval_ms = max(1, int(1000 / frame_rate))
+        self.input_status_dirty = False
+        self.render_errors = 0
+        self.last_render_error = None
+        
+        # Stage timestamps for every input event, and the tickets of the
+        # events shown by the frame currently being rendered
+        self.latency = LatencyTracker()
+        self.frame_tickets = []
+        self.stats_window = None
+        self.stick_test_window = None
+        self.motion_window = None
+        self.trigger_capture_window = None
+        self.touchpad_window = None
+        self.rumble_window = None
+        self.trigger_sweep_window = None
+        self.button_health_window = None
+        self.station_window = None
+        
+        # Input recording, started from the Record button
+        self.record_dir = record_dir
+        self.recorder = None
+        
+        # Rumble, lightbar, LED and trigger changes, applied from the reader threads
+        self.output = OutputScheduler(output_rate_hz)
+        
+        # Lightbar color and animation, the animator starts on first use
+        self.lightbar_color = (0, 0, 255)
+        self.lightbar_animation = 'Static'
+        self.lightbar_animator = None
+        
+        # Controller status
+        self.controller = None
+        self.is_running = True
+        self.device_monitor = None
+        self.replay_sessions = []
+        
+        # Connected controllers, one session each. The main view shows the
+        # selected session, every session also gets a compact panel.
+        self.sessions = SessionManager()
+        self.session = None
+        self.session_panels = {}
+        
+        # Initialize image attributes
+        self.base_resized = None
+        self.controller_image = None
+        self.image_on_canvas = None
+        self.image_center = (0, 0)
+        
+        # Full quality resizes by size, most recently used last
+        self.resize_cache = OrderedDict()
+        self.resize_cache_size = 4
+        self.resize_settle_ms = 150
+        self.resize_pending = False
+        self.resize_settle_job = None
+        
+        # Optional trail behind the stick arrows
+        self.show_trail = False
+        self.trail_seconds = 2.0
+        
+        # Retained press indicators, one canvas item per button
+        self.button_overlays = {}
+        self.overlay_geometry = None
+        
+        # Last stick values drawn by the main view
+        self.prev_stick_x = 0
+        self.prev_stick_y = 0
+        self.prev_right_x = 0
+        self.prev_right_y = 0
+        
+        # Update stick positions
+        self.stick_positions = {
+            'L3': (452, 688),  # Left analog stick position
+            'R3': (755, 688)   # Right analog stick position
+        }
+        
         # Button press coordinates (x, y) relative to image
         self.button_positions = {
             'L2': (298, 313),
@@ -302,26 +2046,9 @@ class DualSenseGUI:
             'R3': (755, 688)
         }
         
-        # Add button state tracking
-        self.button_states = {
-            'L2': False, 'L1': False,
-            'R2': False, 'R1': False,
-            'Triangle': False, 'Circle': False,
-            'Cross': False, 'Square': False,
-            'D-Pad Up': False, 'D-Pad Right': False,
-            'D-Pad Down': False, 'D-Pad Left': False,
-            'Create': False, 'Options': False,
-            'PS': False, 'Touchpad': False,
-            'L3': False, 'R3': False
-        }
-        
-        # Start checking for controller
-        self.check_controller()
-        
-        # Start processing GUI updates
-        self.process_updates()
-        
-        self.rumble_active = False  # Add this to track rumble state
+        # Pressed mask of the selected session, as drawn
+        self.buttons = 0
+        self.status_text = StatusText()
 
     def resource_path(self, relative_path):
         try:
@@ -331,14 +2058,32 @@ class DualSenseGUI:
 
         return os.path.join(base_path, relative_path)
 
+    def load_controller_image(self):
+        # Opening only reads the header, the full image is decoded the first
+        # time a size needs resampling from it
+        self.original_image = Image.open(self.resource_path("ps5_controller.png"))
+        
+        # Bundled copy already resized for the default 900x600 window, so a
+        # normal start never decodes or resamples the full image
+        try:
+            prescaled = Image.open(self.resource_path("ps5_controller_prescaled.png"))
+            prescaled.load()
+            self.resize_cache[prescaled.size] = (prescaled, self.photo_image(prescaled))
+        except OSError:
+            pass
+
     def setup_controller_image(self):
         # Load the controller image
-        self.original_image = Image.open(self.resource_path("ps5_controller.png"))
+        self.load_controller_image()
         
         # Create canvas that fills the window
         self.canvas = tk.Canvas(self.main_frame)
         self.canvas.pack(expand=True, fill='both', pady=20)
         
+        # Stick trails and arrows live on the canvas for the whole session
+        self.create_stick_trails()
+        self.create_stick_arrows()
+        
         # Bind resize event
         self.canvas.bind('<Configure>', self.resize_image)
         
@@ -346,6 +2091,31 @@ class DualSenseGUI:
         self.resize_image(None)
 
     def resize_image(self, event):
+        # Runs on every <Configure>. The initial layout is drawn at full
+        # quality straight away, while resizing the events are collapsed
+        # into one quick resample per idle and LANCZOS waits until the size
+        # has stopped changing.
+        if event is None:
+            self.layout_image(final=True)
+            return
+        
+        if not self.resize_pending:
+            self.resize_pending = True
+            self.root.after_idle(self.live_resize)
+        
+        if self.resize_settle_job is not None:
+            self.root.after_cancel(self.resize_settle_job)
+        self.resize_settle_job = self.root.after(self.resize_settle_ms, self.settle_resize)
+
+    def live_resize(self):
+        self.resize_pending = False
+        self.layout_image(final=False)
+
+    def settle_resize(self):
+        self.resize_settle_job = None
+        self.layout_image(final=True)
+
+    def layout_image(self, final=True):
         # Get current canvas size
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
@@ -355,10 +2125,8 @@ class DualSenseGUI:
             min_width = 800  # Minimum width
             min_height = 500  # Minimum height
             
-            # Resize image to fit canvas while maintaining aspect ratio
-            resized_image = self.original_image.copy()
             # Calculate scaling factor while maintaining aspect ratio
-            img_ratio = resized_image.size[0] / resized_image.size[1]
+            img_ratio = self.original_image.size[0] / self.original_image.size[1]
             canvas_ratio = canvas_width / canvas_height
             
             if canvas_ratio > img_ratio:
@@ -367,391 +2135,578 @@ class DualSenseGUI:
             else:
                 new_width = max(canvas_width, min_width)
                 new_height = int(new_width / img_ratio)
-                
-            # Store the base resized image
-            self.base_resized = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
             
-            # Update the working image and display
-            self.working_image = self.base_resized.copy()
-            self.controller_image = ImageTk.PhotoImage(self.working_image)
+            # Sizes already resampled at full quality come from the cache, the
+            # controller image is only converted to a PhotoImage once per size
+            size = (new_width, new_height)
+            cached = self.resize_cache.get(size)
+            if cached is not None:
+                self.resize_cache.move_to_end(size)
+                base_resized, controller_image = cached
+            elif final:
+                base_resized = self.original_image.resize(size, Image.Resampling.LANCZOS)
+                controller_image = self.photo_image(base_resized)
+                self.resize_cache[size] = (base_resized, controller_image)
+                if len(self.resize_cache) > self.resize_cache_size:
+                    self.resize_cache.popitem(last=False)
+            else:
+                # Quick, rough resample while the size is still changing
+                base_resized = self.original_image.resize(size, Image.Resampling.NEAREST)
+                controller_image = self.photo_image(base_resized)
             
             # Center the image on canvas
             x = canvas_width // 2
             y = canvas_height // 2
             
+            # Nothing to do if this exact image is already shown there
+            if controller_image is self.controller_image and (x, y) == self.image_center:
+                return
+            self.base_resized = base_resized
+            self.controller_image = controller_image
+            self.image_center = (x, y)
+            
             # Create or update image on canvas
             if hasattr(self, 'image_on_canvas') and self.image_on_canvas:
                 self.canvas.coords(self.image_on_canvas, x, y)
                 self.canvas.itemconfig(self.image_on_canvas, image=self.controller_image)
             else:
                 self.image_on_canvas = self.canvas.create_image(x, y, image=self.controller_image)
-
-    def update_button_state(self, button, is_pressed):
-        if button in self.button_positions:
-            # Update button state
-            self.button_states[button] = is_pressed
             
-            # Reset to the base resized image first
-            self.working_image = self.base_resized.copy()
+            # Rebuild the press indicators for the new image geometry
+            self.create_button_overlays(x - new_width // 2, y - new_height // 2, new_width, new_height)
             
-            # Draw indicators for all pressed buttons
-            for btn, state in self.button_states.items():
-                if state and btn in self.button_positions:
-                    # Get current image size
-                    current_width = self.working_image.size[0]
-                    current_height = self.working_image.size[1]
-                    
-                    # Scale the button positions according to current image size
-                    orig_x, orig_y = self.button_positions[btn]
-                    scale_x = current_width / 1200
-                    scale_y = current_height / 1200
-                    x = int(orig_x * scale_x)
-                    y = int(orig_y * scale_y)
-                    
-                    self.draw = ImageDraw.Draw(self.working_image)
-                    
-                    # Draw indicator for pressed button
-                    circle_radius = int(10 * min(scale_x, scale_y))
-                    self.draw.ellipse([x-circle_radius, y-circle_radius, x+circle_radius, y+circle_radius], fill='red')
-            
-            # Update the image on canvas
-            self.controller_image = ImageTk.PhotoImage(self.working_image)
-            self.canvas.itemconfig(self.image_on_canvas, image=self.controller_image)
-            
-            # Update input status text
-            self.update_input_status()
+            # Keep the trails and stick arrows on top and redraw them at the new scale
+            for trail in self.stick_trails.values():
+                trail.raise_items()
+            for line, head in self.stick_arrows.values():
+                self.canvas.tag_raise(line)
+                self.canvas.tag_raise(head)
+            self.invalidate_sticks()
+
+    def create_button_overlays(self, image_left, image_top, image_width, image_height):
+        # Only rebuild when the image geometry actually changed
+        geometry = (image_left, image_top, image_width, image_height)
+        if geometry == self.overlay_geometry:
+            return
+        self.overlay_geometry = geometry
+        
+        # Remove the indicators created for the previous size
+        for item in self.button_overlays.values():
+            self.canvas.delete(item)
+        self.button_overlays = {}
+        
+        # Scale the button positions according to current image size
+        scale_x = image_width / 1200
+        scale_y = image_height / 1200
+        circle_radius = int(10 * min(scale_x, scale_y))
+        
+        # One retained canvas item per button, keyed by its bit and shown or
+        # hidden per event
+        for bit, (btn, _) in enumerate(BUTTON_BINDINGS):
+            orig_x, orig_y = self.button_positions[btn]
+            x = image_left + int(orig_x * scale_x)
+            y = image_top + int(orig_y * scale_y)
+            self.button_overlays[bit] = self.canvas.create_oval(
+                x - circle_radius, y - circle_radius,
+                x + circle_radius, y + circle_radius,
+                fill='red', outline='',
+                state='normal' if self.buttons >> bit & 1 else 'hidden'
+            )
+
+    def update_buttons(self, buttons, changed):
+        # Show or hide the indicators of the changed bits only, the rest of
+        # the image is untouched
+        self.buttons = buttons
+        for bit in set_bits(changed):
+            overlay = self.button_overlays.get(bit)
+            if overlay is not None:
+                self.canvas.itemconfig(overlay, state='normal' if buttons >> bit & 1 else 'hidden')
+        
+        # Input status text is refreshed once at the end of the frame
+        self.input_status_dirty = True
+
+    def update_button_state(self, button, is_pressed):
+        bit = BUTTON_BITS[button]
+        buttons = self.buttons | bit if is_pressed else self.buttons & ~bit
+        self.update_buttons(buttons, self.buttons ^ buttons)
 
-    def check_controller(self):
-        if self.controller is None:
-            device_infos = DualSenseController.enumerate_devices()
-            if len(device_infos) > 0:
-                try:
-                    self.controller = DualSenseController()
-                    self.setup_controller_callbacks()
-                    self.controller.activate()
-                    self.queue_update('status', "DualSense Controller connected!", 'green')
-                    # Update connection type when controller connects
-                    self.queue_update('connection', self.controller.connection_type.value)
-                except Exception as e:
-                    self.queue_update('status', f"Error connecting to controller: {e}", 'red')
-                    self.controller = None
+    def start_device_monitor(self, min_interval, max_interval, max_controllers):
+        # Enumeration, open and unplug detection all happen off the Tk thread,
+        # and so does loading the controller library
+        self.device_monitor = DeviceMonitor(
+            self.open_controller,
+            self.queue_update,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            max_devices=max_controllers,
+            on_library_loaded=lambda began: startup_profile.mark('controller library', began)
+        )
+        self.device_monitor.start()
+
+    def open_controller(self, device_info):
+        # Runs on the device monitor thread, every controller gets its own
+        # session and its own reader thread
+        from dualsense_controller import DualSenseController
+        session = ControllerSession(device_info, self.dispatcher, self.latency)
+        if self.recorder is not None and self.recorder.is_recording:
+            session.recorder = self.recorder
+        session.controller = DualSenseController(device_info)
+        self.setup_controller_callbacks(session)
+        session.controller.activate()
+        return session
+
+    def start_replay(self, streams, speed=1.0, loop=False):
+        # Plays event streams through the same callbacks a real controller
+        # uses, one simulated controller per stream
+        for name, events in streams.items():
+            session = ControllerSession(ReplayDeviceInfo(name), self.dispatcher, self.latency)
+            if self.recorder is not None and self.recorder.is_recording:
+                session.recorder = self.recorder
+            session.controller = ReplayController(events, speed=speed, loop=loop, on_finished=self.on_replay_finished)
+            self.setup_controller_callbacks(session)
+            self.on_device_event('connected', session)
+            self.replay_sessions.append(session)
+            session.controller.activate()
+
+    def on_replay_finished(self, controller):
+        # Runs on the replay thread, the session stays up showing its last state
+        self.queue_update(
+            'status',
+            f"Replay finished: {controller.events_played} events, late by at most {controller.max_lateness_ms:.1f} ms",
+            'green'
+        )
+
+    def on_device_event(self, event, session):
+        if event == 'connected':
+            self.sessions.add(session)
+            self.session_panels[session.session_id] = SessionPanel(
+                self.sessions_frame, session, self.button_positions, self.stick_positions, self.select_session,
+                widgets=self.widgets
+            )
+            # Update connection type when controller connects
+            session.post('connection', session.controller.connection_type.value)
+            if self.session is None:
+                self.select_session(session)
             else:
-                self.queue_update('status', "No DualSense Controller available!", 'red')
-        
-        # Check again in 1 second
-        if self.is_running:
-            self.root.after(1000, self.check_controller)
+                self.update_session_strip()
+            if self.station_window is not None and self.station_window.is_open:
+                self.station_window.on_connected(session)
+        elif event == 'disconnected':
+            if self.station_window is not None and self.station_window.is_open:
+                self.station_window.on_disconnected(session)
+            self.sessions.remove(session)
+            panel = self.session_panels.pop(session.session_id, None)
+            if panel is not None:
+                panel.destroy()
+            if session.controller is not None:
+                self.output.discard(session.controller)
+            if session is self.session:
+                self.rumble_active = False
+                self.select_session(self.sessions.first())
+                if self.session is None:
+                    self.status_label.config(text="DualSense Controller disconnected!", fg='red')
+            else:
+                self.update_session_strip()
+
+    def select_session(self, session):
+        # Point the main view at another controller
+        self.session = session
+        self.controller = session.controller if session else None
+        
+        # Sync the retained overlays and force the arrows to redraw
+        self.update_buttons(session.buttons if session else 0, ALL_BUTTONS)
+        self.invalidate_sticks()
+        if session is None:
+            for stick in self.stick_arrows:
+                self.draw_stick_arrow(stick, 0, 0)
+            for trigger in self.trigger_bars:
+                self.draw_trigger_bar(trigger, 0.0)
+        else:
+            session.drawn_trigger_sequence = -1
+            if self.lightbar_animation != 'Static':
+                # Replay the animation to the newly selected controller
+                self.update_lightbar()
+        self.input_status_dirty = True
+        
+        # Refresh the indicators from what the session already knows
+        if session is None:
+            self.battery_value.config(text="--", fg=self.default_fg)
+            self.connection_value.config(text="--", fg=self.default_fg)
+        else:
+            if session.battery is not None:
+                self.update_battery_status(session.battery)
+            else:
+                self.battery_value.config(text="--", fg=self.default_fg)
+            if session.connection_type is not None:
+                self.update_connection_status(session.connection_type)
+            self.status_label.config(text="DualSense Controller connected!", fg='green')
+        self.update_session_strip()
+
+    def update_session_strip(self):
+        for session_id, panel in self.session_panels.items():
+            panel.set_selected(self.session is not None and session_id == self.session.session_id)
+        
+        # The strip is only worth the space with more than one controller
+        if len(self.sessions) > 1:
+            if not self.sessions_strip_visible:
+                self.sessions_frame.pack(before=self.input_status, pady=(0, 5))
+                self.sessions_strip_visible = True
+            self.status_label.config(
+                text=f"Controller #{self.session.session_id} selected ({len(self.sessions)} connected)",
+                fg='green'
+            )
+        elif self.sessions_strip_visible:
+            self.sessions_frame.pack_forget()
+            self.sessions_strip_visible = False
 
     def setup_controller(self):
         # Remove controller initialization from here
         # It will be handled by check_controller
         pass
 
-    def setup_controller_callbacks(self):
-        # Move callback setup from setup_controller to here
-        # Left side buttons
-        self.controller.btn_l2.on_down(lambda: self.queue_update('button', ('L2', True)))
-        self.controller.btn_l2.on_up(lambda: self.queue_update('button', ('L2', False)))
-        
-        self.controller.btn_l1.on_down(lambda: self.queue_update('button', ('L1', True)))
-        self.controller.btn_l1.on_up(lambda: self.queue_update('button', ('L1', False)))
-        
-        # D-Pad
-        self.controller.btn_up.on_down(lambda: self.queue_update('button', ('D-Pad Up', True)))
-        self.controller.btn_up.on_up(lambda: self.queue_update('button', ('D-Pad Up', False)))
-        
-        self.controller.btn_right.on_down(lambda: self.queue_update('button', ('D-Pad Right', True)))
-        self.controller.btn_right.on_up(lambda: self.queue_update('button', ('D-Pad Right', False)))
-        
-        self.controller.btn_down.on_down(lambda: self.queue_update('button', ('D-Pad Down', True)))
-        self.controller.btn_down.on_up(lambda: self.queue_update('button', ('D-Pad Down', False)))
-        
-        self.controller.btn_left.on_down(lambda: self.queue_update('button', ('D-Pad Left', True)))
-        self.controller.btn_left.on_up(lambda: self.queue_update('button', ('D-Pad Left', False)))
-        
-        # Center buttons
-        self.controller.btn_create.on_down(lambda: self.queue_update('button', ('Create', True)))
-        self.controller.btn_create.on_up(lambda: self.queue_update('button', ('Create', False)))
-        
-        self.controller.btn_touchpad.on_down(lambda: self.queue_update('button', ('Touchpad', True)))
-        self.controller.btn_touchpad.on_up(lambda: self.queue_update('button', ('Touchpad', False)))
-        
-        self.controller.btn_options.on_down(lambda: self.queue_update('button', ('Options', True)))
-        self.controller.btn_options.on_up(lambda: self.queue_update('button', ('Options', False)))
-        
-        # Right side buttons
-        self.controller.btn_r2.on_down(lambda: self.queue_update('button', ('R2', True)))
-        self.controller.btn_r2.on_up(lambda: self.queue_update('button', ('R2', False)))
-        
-        self.controller.btn_r1.on_down(lambda: self.queue_update('button', ('R1', True)))
-        self.controller.btn_r1.on_up(lambda: self.queue_update('button', ('R1', False)))
-        
-        # Face buttons
-        self.controller.btn_triangle.on_down(lambda: self.queue_update('button', ('Triangle', True)))
-        self.controller.btn_triangle.on_up(lambda: self.queue_update('button', ('Triangle', False)))
-        
-        self.controller.btn_circle.on_down(lambda: self.queue_update('button', ('Circle', True)))
-        self.controller.btn_circle.on_up(lambda: self.queue_update('button', ('Circle', False)))
-        
-        self.controller.btn_cross.on_down(lambda: self.queue_update('button', ('Cross', True)))
-        self.controller.btn_cross.on_up(lambda: self.queue_update('button', ('Cross', False)))
-        
-        self.controller.btn_square.on_down(lambda: self.queue_update('button', ('Square', True)))
-        self.controller.btn_square.on_up(lambda: self.queue_update('button', ('Square', False)))
-        
-        # PS button
-        self.controller.btn_ps.on_down(lambda: self.queue_update('button', ('PS', True)))
-        self.controller.btn_ps.on_up(lambda: self.queue_update('button', ('PS', False)))
+    def setup_controller_callbacks(self, session):
+        # The wiring is shared with the command line tester
+        connect_callbacks(session, lambda e: self.on_controller_error(session, e))
+        # Output changes go out from the controller's reader thread
+        self.output.attach(session.controller)
 
-        # L3 and R3
-        self.controller.btn_l3.on_down(lambda: self.queue_update('button', ('L3', True)))
-        self.controller.btn_l3.on_up(lambda: self.queue_update('button', ('L3', False)))
-        
-        self.controller.btn_r3.on_down(lambda: self.queue_update('button', ('R3', True)))
-        self.controller.btn_r3.on_up(lambda: self.queue_update('button', ('R3', False)))
-        
-        # Battery callbacks - fixed to handle parameters
-        self.controller.battery.on_change(lambda b: self.queue_update('battery', b))
-        self.controller.battery.on_lower_than(20, lambda _: self.queue_update('battery_warning', 'Low battery!'))  # Added _ parameter
-        self.controller.battery.on_charging(lambda _: self.queue_update('battery_status', 'charging'))
-        self.controller.battery.on_discharging(lambda _: self.queue_update('battery_status', 'discharging'))
-        
-        # Error callback
-        self.controller.on_error(lambda e: self.queue_update('error', e))
+    def on_controller_error(self, session, error):
+        # Runs on the controller thread, let the device monitor tear it down
+        session.post('error', error)
+        if self.device_monitor is not None:
+            self.device_monitor.notify_lost(session.device_path)
+
+    def render_sticks(self):
+        # Stick samples are written straight into each session by its reader
+        # thread. Only sessions with a new sample since the last frame are drawn.
+        for session in self.sessions:
+            sequence = session.stick_sequence
+            if sequence == session.drawn_stick_sequence:
+                # Nothing moved. The resting samples wait in the ring and feed
+                # the heatmap with the next movement, or once half the ring
+                # is waiting; the trail only fades.
+                if session.stick_samples_pending >= session.stick_samples.capacity // 2:
+                    session.take_stick_samples()
+                if self.show_trail and session is self.session:
+                    self.update_stick_trails(())
+                continue
+            session.drawn_stick_sequence = sequence
+            
+            # Every sample since the last fold feeds the heatmap, and the
+            # trail of the controller on show
+            samples = session.take_stick_samples()
+            if self.show_trail and session is self.session:
+                self.update_stick_trails(samples)
+            
+            # The stick slot has no queue, receipt and enqueue are the same moment
+            ticket = self.latency.start('stick', session.stick_time)
+            self.latency.stamp(ticket, 'enqueue', session.stick_time)
+            self.latency.stamp(ticket, 'dequeue')
+            self.frame_tickets.append(ticket)
+            
+            self.session_panels[session.session_id].set_sticks(session)
+            if session is self.session:
+                self.update_stick_indicator()
+                self.update_right_stick_indicator()
+
+    def render_triggers(self):
+        # Only the latest pressure is drawn, once per frame at most. Every
+        # report's value is kept in the session's trigger buffer.
+        session = self.session
+        if session is None:
+            return
+        sequence = session.trigger_sequence
+        if sequence == session.drawn_trigger_sequence:
+            return
+        session.drawn_trigger_sequence = sequence
+        self.draw_trigger_bar('L2', session.axes[LEFT_TRIGGER])
+        self.draw_trigger_bar('R2', session.axes[RIGHT_TRIGGER])
+
+    def create_trigger_bars(self):
+        # Outline, fill and percentage per trigger, moved with coords() after
+        self.trigger_bars = {}
+        for i, trigger in enumerate(('L2', 'R2')):
+            left = 10 + i * 200
+            self.trigger_canvas.create_text(left, 12, text=trigger, anchor='w', font=('Arial', 10, 'bold'))
+            self.trigger_canvas.create_rectangle(left + 25, 6, left + 155, 18, outline='gray')
+            fill = self.trigger_canvas.create_rectangle(left + 25, 6, left + 25, 18, fill='#3498db', outline='')
+            text = self.trigger_canvas.create_text(left + 160, 12, text="0%", anchor='w', font=('Arial', 9))
+            self.trigger_bars[trigger] = (fill, text, left + 25, 130, -1)
 
-        # Add analog stick callbacks
-        self.controller.left_stick_x.on_change(self.on_left_stick_x)
-        self.controller.left_stick_y.on_change(self.on_left_stick_y)
+    def draw_trigger_bar(self, trigger, value):
+        fill, text, left, width, drawn = self.trigger_bars[trigger]
+        pixels = round(min(max(value, 0.0), 1.0) * width)
+        if pixels == drawn:
+            return
+        self.trigger_bars[trigger] = (fill, text, left, width, pixels)
+        self.trigger_canvas.coords(fill, left, 6, left + pixels, 18)
+        self.trigger_canvas.itemconfig(text, text=f"{value * 100:.0f}%")
 
-        # Add right analog stick callbacks
-        self.controller.right_stick_x.on_change(self.on_right_stick_x)
-        self.controller.right_stick_y.on_change(self.on_right_stick_y)
+    def invalidate_sticks(self):
+        # Force a redraw on the next frame, e.g. after the image moved.
+        # NaN never compares as "close" to the previous value.
+        # The trail was drawn for the old geometry or controller.
+        for trail in self.stick_trails.values():
+            trail.clear()
+        self.prev_stick_x = self.prev_stick_y = float('nan')
+        self.prev_right_x = self.prev_right_y = float('nan')
+        if self.session is not None:
+            self.session.drawn_stick_sequence = -1
 
-    def on_left_stick_x(self, value):
-        self.left_stick_x = value
-        self.update_stick_indicator()
+    def create_stick_trails(self):
+        # One line item per frame of trail, so the pool covers trail_seconds
+        pool_size = int(self.trail_seconds * 1000 / self.frame_interval_ms) + 1
+        self.stick_trails = {stick: StickTrail(self.canvas, pool_size) for stick in self.stick_positions}
 
-    def on_left_stick_y(self, value):
-        # Invert the Y value
-        self.left_stick_y = -value  # Invert Y axis
-        self.update_stick_indicator()
+    def update_stick_trails(self, samples):
+        now = time.perf_counter()
+        for trail in self.stick_trails.values():
+            trail.expire(now - self.trail_seconds)
+        if not len(samples) or self.base_resized is None:
+            return
+        
+        # At most a few points per frame, a 1 kHz controller sends ~16
+        step = max(1, len(samples) // StickTrail.MAX_POINTS)
+        samples = samples[::-step][::-1]
+        for stick, x_column, y_column in (('L3', 1, 2), ('R3', 3, 4)):
+            center_x, center_y, length = self.stick_geometry(stick)
+            points = []
+            for value_x, value_y in zip(samples[:, x_column].tolist(), samples[:, y_column].tolist()):
+                points.append(center_x + value_x * length)
+                points.append(center_y + value_y * length)
+            self.stick_trails[stick].add(points, now)
 
-    def on_right_stick_x(self, value):
-        self.right_stick_x = value
-        self.update_right_stick_indicator()
+    def toggle_trail(self):
+        self.show_trail = self.trail_var.get()
+        if not self.show_trail:
+            for trail in self.stick_trails.values():
+                trail.clear()
 
-    def on_right_stick_y(self, value):
-        # Invert the Y value like we did for left stick
-        self.right_stick_y = -value
-        self.update_right_stick_indicator()
+    def create_stick_arrows(self):
+        # Arrow line and head for each stick, created once and moved with coords()
+        self.stick_arrows = {}
+        self.stick_arrow_visible = {}
+        for stick in self.stick_positions:
+            line = self.canvas.create_line(0, 0, 0, 0, fill='red', width=4, state='hidden')
+            head = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill='red', state='hidden')
+            self.stick_arrows[stick] = (line, head)
+            self.stick_arrow_visible[stick] = False
 
     def update_stick_indicator(self):
         # Check if we have a valid base image
         if self.base_resized is None:
             return
+        
+        # Take one snapshot of the sample the controller thread left us
+        axes = self.session.axes
+        x, y = axes[LEFT_X], axes[LEFT_Y]
             
         # Only update if stick position changed significantly
-        if (abs(self.left_stick_x - self.prev_stick_x) < 0.01 and 
-            abs(self.left_stick_y - self.prev_stick_y) < 0.01):
+        if abs(x - self.prev_stick_x) < 0.01 and abs(y - self.prev_stick_y) < 0.01:
             return
             
         # Update previous values
-        self.prev_stick_x = self.left_stick_x
-        self.prev_stick_y = self.left_stick_y
-        
-        # Get current image size and position
-        current_width = self.working_image.size[0]
-        current_height = self.working_image.size[1]
+        self.prev_stick_x = x
+        self.prev_stick_y = y
         
-        # Get the image position on canvas
-        image_x = self.canvas.coords(self.image_on_canvas)[0]  # Center X of image
-        image_y = self.canvas.coords(self.image_on_canvas)[1]  # Center Y of image
+        self.draw_stick_arrow('L3', x, y)
         
-        # Get stick center position and scale it
-        stick_x, stick_y = self.stick_positions['L3']
-        scale_x = current_width / 1200
-        scale_y = current_height / 1200
-        
-        # Calculate center position relative to the image position
-        center_x = image_x - (current_width/2) + int(stick_x * scale_x)
-        center_y = image_y - (current_height/2) + int(stick_y * scale_y)
-        
-        # Calculate arrow endpoint using stick values (-1 to 1)
-        arrow_length = 30 * min(scale_x, scale_y)
-        end_x = center_x + int(self.left_stick_x * arrow_length)
-        end_y = center_y + int(self.left_stick_y * arrow_length)
-        
-        # Draw on the canvas directly
-        if abs(self.left_stick_x) > 0.1 or abs(self.left_stick_y) > 0.1:
-            # Delete previous arrow if it exists
-            if hasattr(self, 'stick_arrow'):
-                self.canvas.delete(self.stick_arrow)
-                self.canvas.delete(self.stick_arrowhead)
-            
-            # Draw arrow line
-            self.stick_arrow = self.canvas.create_line(
-                center_x, center_y, end_x, end_y,
-                fill='red', width=4
-            )
-            
-            # Draw arrow head
-            arrow_head_length = 10 * min(scale_x, scale_y)
-            angle = math.atan2(end_y - center_y, end_x - center_x)
-            
-            # Calculate arrow head points
-            head_angle = math.pi / 6  # 30 degrees
-            point1_x = end_x - arrow_head_length * math.cos(angle + head_angle)
-            point1_y = end_y - arrow_head_length * math.sin(angle + head_angle)
-            point2_x = end_x - arrow_head_length * math.cos(angle - head_angle)
-            point2_y = end_y - arrow_head_length * math.sin(angle - head_angle)
-            
-            # Draw arrow head
-            self.stick_arrowhead = self.canvas.create_polygon(
-                end_x, end_y, point1_x, point1_y, point2_x, point2_y,
-                fill='red'
-            )
-        else:
-            # Remove the arrow when stick is centered
-            if hasattr(self, 'stick_arrow'):
-                self.canvas.delete(self.stick_arrow)
-                self.canvas.delete(self.stick_arrowhead)
-        
-        # Update input status text
-        self.update_input_status()
+        # Input status text is refreshed once at the end of the frame
+        self.input_status_dirty = True
 
     def update_right_stick_indicator(self):
         # Check if we have a valid base image
         if self.base_resized is None:
             return
+        
+        # Take one snapshot of the sample the controller thread left us
+        axes = self.session.axes
+        x, y = axes[RIGHT_X], axes[RIGHT_Y]
             
         # Only update if stick position changed significantly
-        if (abs(self.right_stick_x - self.prev_right_x) < 0.01 and 
-            abs(self.right_stick_y - self.prev_right_y) < 0.01):
+        if abs(x - self.prev_right_x) < 0.01 and abs(y - self.prev_right_y) < 0.01:
             return
             
         # Update previous values
-        self.prev_right_x = self.right_stick_x
-        self.prev_right_y = self.right_stick_y
+        self.prev_right_x = x
+        self.prev_right_y = y
         
-        # Get current image size and position
-        current_width = self.working_image.size[0]
-        current_height = self.working_image.size[1]
+        self.draw_stick_arrow('R3', x, y)
         
-        # Get the image position on canvas
-        image_x = self.canvas.coords(self.image_on_canvas)[0]  # Center X of image
-        image_y = self.canvas.coords(self.image_on_canvas)[1]  # Center Y of image
+        # Input status text is refreshed once at the end of the frame
+        self.input_status_dirty = True
+
+    def stick_geometry(self, stick):
+        # Get current image size and position
+        current_width = self.base_resized.size[0]
+        current_height = self.base_resized.size[1]
+        image_x, image_y = self.image_center
         
         # Get stick center position and scale it
-        stick_x, stick_y = self.stick_positions['R3']
+        stick_x, stick_y = self.stick_positions[stick]
         scale_x = current_width / 1200
         scale_y = current_height / 1200
         
-        # Calculate center position relative to the image position
+        # Calculate center position relative to the image position, and the
+        # length of a full deflection
         center_x = image_x - (current_width/2) + int(stick_x * scale_x)
         center_y = image_y - (current_height/2) + int(stick_y * scale_y)
+        return center_x, center_y, 30 * min(scale_x, scale_y)
+
+    def draw_stick_arrow(self, stick, value_x, value_y):
+        line, head = self.stick_arrows[stick]
+        
+        # Hide the arrow when stick is centered
+        if abs(value_x) <= 0.1 and abs(value_y) <= 0.1:
+            if self.stick_arrow_visible[stick]:
+                self.canvas.itemconfig(line, state='hidden')
+                self.canvas.itemconfig(head, state='hidden')
+                self.stick_arrow_visible[stick] = False
+            return
         
-        # Calculate arrow endpoint using stick values (-1 to 1)
-        arrow_length = 30 * min(scale_x, scale_y)
-        end_x = center_x + int(self.right_stick_x * arrow_length)
-        end_y = center_y + int(self.right_stick_y * arrow_length)
-        
-        # Draw on the canvas directly
-        if abs(self.right_stick_x) > 0.1 or abs(self.right_stick_y) > 0.1:
-            # Delete previous arrow if it exists
-            if hasattr(self, 'right_stick_arrow'):
-                self.canvas.delete(self.right_stick_arrow)
-                self.canvas.delete(self.right_stick_arrowhead)
-            
-            # Draw arrow line
-            self.right_stick_arrow = self.canvas.create_line(
-                center_x, center_y, end_x, end_y,
-                fill='red', width=4
-            )
-            
-            # Draw arrow head
-            arrow_head_length = 10 * min(scale_x, scale_y)
-            angle = math.atan2(end_y - center_y, end_x - center_x)
-            
-            # Calculate arrow head points
-            head_angle = math.pi / 6  # 30 degrees
-            point1_x = end_x - arrow_head_length * math.cos(angle + head_angle)
-            point1_y = end_y - arrow_head_length * math.sin(angle + head_angle)
-            point2_x = end_x - arrow_head_length * math.cos(angle - head_angle)
-            point2_y = end_y - arrow_head_length * math.sin(angle - head_angle)
-            
-            # Draw arrow head
-            self.right_stick_arrowhead = self.canvas.create_polygon(
-                end_x, end_y, point1_x, point1_y, point2_x, point2_y,
-                fill='red'
-            )
-        else:
-            # Remove the arrow when stick is centered
-            if hasattr(self, 'right_stick_arrow'):
-                self.canvas.delete(self.right_stick_arrow)
-                self.canvas.delete(self.right_stick_arrowhead)
+        center_x, center_y, arrow_length = self.stick_geometry(stick)
         
-        # Update input status text
-        self.update_input_status()
+        # Calculate arrow endpoint using stick values (-1 to 1)
+        end_x = center_x + int(value_x * arrow_length)
+        end_y = center_y + int(value_y * arrow_length)
+        
+        # Calculate arrow head points
+        arrow_head_length = arrow_length / 3
+        angle = math.atan2(end_y - center_y, end_x - center_x)
+        head_angle = math.pi / 6  # 30 degrees
+        point1_x = end_x - arrow_head_length * math.cos(angle + head_angle)
+        point1_y = end_y - arrow_head_length * math.sin(angle + head_angle)
+        point2_x = end_x - arrow_head_length * math.cos(angle - head_angle)
+        point2_y = end_y - arrow_head_length * math.sin(angle - head_angle)
+        
+        # Move the existing items instead of recreating them
+        self.canvas.coords(line, center_x, center_y, end_x, end_y)
+        self.canvas.coords(head, end_x, end_y, point1_x, point1_y, point2_x, point2_y)
+        if not self.stick_arrow_visible[stick]:
+            self.canvas.itemconfig(line, state='normal')
+            self.canvas.itemconfig(head, state='normal')
+            self.stick_arrow_visible[stick] = True
 
     def update_input_status(self):
-        # Collect active buttons
-        active_buttons = [btn for btn, state in self.button_states.items() if state]
-        
-        # Format stick positions if they're being moved
-        stick_info = []
-        if abs(self.left_stick_x) > 0.1 or abs(self.left_stick_y) > 0.1:
-            stick_info.append(f"Left Stick (x: {self.left_stick_x:.2f}, y: {self.left_stick_y:.2f})")
-        if abs(self.right_stick_x) > 0.1 or abs(self.right_stick_y) > 0.1:
-            stick_info.append(f"Right Stick (x: {self.right_stick_x:.2f}, y: {self.right_stick_y:.2f})")
-        
-        # Combine all active inputs
-        all_inputs = active_buttons + stick_info
-        
-        if all_inputs:
-            status_text = "Active Inputs: " + " | ".join(all_inputs)
-        else:
-            status_text = "No inputs active"
-        
-        # Update the label
-        self.input_status.config(text=status_text)
+        # The text is cached, the label is only touched when it changed
+        session = self.session
+        if self.status_text.update(self.buttons, session.axes if session is not None else None):
+            self.input_status.config(text=self.status_text.text)
 
     def queue_update(self, update_type, data, *args):
-        self.update_queue.put((update_type, data, args))
+        self.dispatcher.post(update_type, data, args)
 
     def process_updates(self):
+        frame_start = time.perf_counter()
         try:
-            while not self.update_queue.empty():
-                update_type, data, args = self.update_queue.get_nowait()
-                
-                if update_type == 'button':
-                    button, is_pressed = data
-                    self.update_button_state(button, is_pressed)
-                elif update_type == 'battery':
-                    self.update_battery_status(data)
-                elif update_type == 'battery_warning':
-                    # Flash the battery indicator red for low battery
-                    self.battery_value.config(fg='#e74c3c')
-                    self.root.bell()  # Optional: Make a sound for low battery
-                elif update_type == 'battery_status':
-                    # Update charging status
-                    if data == 'charging':
-                        self.battery_value.config(fg='#2ecc71')
-                    else:  # discharging
-                        # Revert to normal color based on level
-                        self.update_battery_status(self.controller.battery)
-                elif update_type == 'connection':
-                    self.update_connection_status(data)
-                elif update_type == 'error':
-                    self.status_label.config(text=f"Error: {data}", fg='red')
-                    self.is_running = False
-                elif update_type == 'status':
-                    self.status_label.config(text=data, fg=args[0])
-        except:
-            pass
+            self.render_frame()
+        except Exception as error:
+            # Counted like the dispatcher's handler errors and shown in the
+            # Stats window, the next frame still runs
+            self.render_errors += 1
+            self.last_render_error = f"{type(error).__name__}: {error}"
         finally:
-            # Schedule the next update
+            # Schedule the next frame, keeping a steady cadence
             if self.is_running:
-                self.root.after(10, self.process_updates)
+                elapsed_ms = int((time.perf_counter() - frame_start) * 1000)
+                self.root.after(max(1, self.frame_interval_ms - elapsed_ms), self.process_updates)
+
+    def render_frame(self):
+        # One shared render pass for every connected controller
+        self.dispatcher.drain(self.handle_update)
+        
+        # Pick up the latest stick samples and trigger pressure
+        self.render_sticks()
+        self.render_triggers()
+        
+        # Render the status line at most once per frame
+        if self.input_status_dirty:
+            self.input_status_dirty = False
+            self.update_input_status()
+        
+        # Tk repaints in idle callbacks queued by the changes above, so this
+        # one runs once the frame is actually on screen
+        if self.frame_tickets:
+            self.root.after_idle(self.latency.complete, self.frame_tickets)
+            self.frame_tickets = []
+
+    def handle_update(self, update_type, data, args):
+        if update_type == 'device':
+            event, session = data
+            self.on_device_event(event, session)
+        elif update_type == 'status':
+            self.status_label.config(text=data, fg=args[0])
+        else:
+            session, data = data
+            ticket = args[0]
+            if ticket is not None:
+                self.latency.stamp(ticket, 'dequeue')
+                self.frame_tickets.append(ticket)
+            # Drop late updates from a controller that was already unplugged
+            if session in self.sessions:
+                self.handle_session_update(session, update_type, data)
+
+    def handle_session_update(self, session, update_type, data):
+        panel = self.session_panels[session.session_id]
+        selected = session is self.session
+        
+        if update_type == 'button':
+            # Renderers only look at the bits that flipped
+            changed = session.apply_button(*data)
+            if changed:
+                panel.set_buttons(session.buttons, changed)
+                if selected:
+                    self.update_buttons(session.buttons, changed)
+        elif update_type == 'battery':
+            previous = session.battery
+            session.battery = data
+            panel.set_battery(data)
+            if selected:
+                self.update_battery_status(data)
+                if self.lightbar_animation == 'Battery Level' and (
+                        previous is None or previous.level_percentage != data.level_percentage):
+                    self.update_lightbar()
+        elif update_type == 'battery_warning':
+            if selected:
+                # Flash the battery indicator red for low battery
+                self.battery_value.config(fg='#e74c3c')
+                self.root.bell()  # Optional: Make a sound for low battery
+        elif update_type == 'battery_status':
+            if selected:
+                # Update charging status
+                if data == 'charging':
+                    self.battery_value.config(fg='#2ecc71')
+                else:  # discharging
+                    # Revert to normal color based on level
+                    self.update_battery_status(session.controller.battery.value)
+        elif update_type == 'connection':
+            session.connection_type = data
+            panel.set_connection(data)
+            if selected:
+                self.update_connection_status(data)
+        elif update_type == 'error':
+            if selected:
+                self.status_label.config(text=f"Error: {data}", fg='red')
+
+    def update_report_rates(self):
+        for session in self.sessions:
+            stats = session.report_meter.snapshot()
+            previous = session.report_stats
+            session.report_stats = stats
+            self.session_panels[session.session_id].set_report_rate(stats['rate_hz'])
+            if session is self.session:
+                # Flag the readout when reports stall or a gap showed up
+                flagged = stats['stalled'] or (previous is not None and stats['gaps'] > previous['gaps'])
+                self.rate_value.config(
+                    text=f"{stats['rate_hz']:.0f} Hz ±{stats['jitter_ms']:.2f} ms  gaps {stats['gaps']}",
+                    fg='#e74c3c' if flagged else '#2ecc71'
+                )
+        
+        if self.session is None:
+            self.rate_value.config(text="--", fg=self.default_fg)
+        
+        if self.is_running:
+            self.root.after(500, self.update_report_rates)
 
     def update_battery_status(self, battery_data):
         try:
@@ -819,54 +2774,137 @@ class DualSenseGUI:
                 fg='gray'
             )
 
+    def send_output(self, channel, apply, controller=None):
+        # Output changes go through the scheduler, never straight to the device
+        controller = controller or self.controller
+        if controller:
+            self.output.submit(controller, channel, apply)
+
     def start_rumble(self):
         if self.controller:
+            self.stop_waveform()
             self.rumble_active = True  # Set state to active
-            self.controller.left_rumble.set(255)
-            self.controller.right_rumble.set(255)
+            self.send_output('rumble', rumble(255, 255))
 
     def stop_rumble(self):
         if self.controller:
+            self.stop_waveform()
             self.rumble_active = False  # Set state to inactive
-            self.controller.left_rumble.set(0)
-            self.controller.right_rumble.set(0)
+            self.send_output('rumble', rumble(0, 0))
+
+    def stop_waveform(self):
+        # The waveform player and the rumble buttons drive the same motors
+        if self.rumble_window is not None and self.rumble_window.is_open:
+            self.rumble_window.stop()
+
+    def open_rumble(self):
+        if self.rumble_window is not None and self.rumble_window.is_open:
+            self.rumble_window.lift()
+        else:
+            self.rumble_window = RumbleWindow(
+                self.root, lambda: self.session,
+                lambda controller: self.send_output('rumble', rumble(0, 0), controller)
+            )
 
     def choose_color(self):
         # Open color picker
-        color = tk.colorchooser.askcolor(title="Choose Lightbar Color")
+        from tkinter import colorchooser
+        color = colorchooser.askcolor(title="Choose Lightbar Color")
         if color[0]:  # color[0] contains RGB values, color[1] contains hex
-            r, g, b = [int(x) for x in color[0]]
-            # Update controller lightbar
-            if self.controller:
-                self.controller.lightbar.set_color(r, g, b)
-            # Update preview color
+            self.lightbar_color = tuple(int(x) for x in color[0])
+            # Update preview color, then the controller or the animation using it
             self.color_preview.configure(bg=color[1])
+            self.update_lightbar()
+
+    def select_lightbar_animation(self):
+        self.lightbar_animation = self.lightbar_var.get()
+        self.update_lightbar()
+
+    def update_lightbar(self):
+        # Sends the static color, or builds the animation's color table and
+        # hands it to the animator thread
+        if self.lightbar_animation == 'Static':
+            if self.lightbar_animator is not None:
+                self.lightbar_animator.stop()
+            r, g, b = self.lightbar_color
+            self.send_output('lightbar', lambda c: c.lightbar.set_color(r, g, b))
+            return
+        
+        import lightbar
+        if self.lightbar_animation == 'Breathing':
+            table = lightbar.breathing_table(self.lightbar_color)
+        elif self.lightbar_animation == 'Rainbow':
+            table = lightbar.rainbow_table()
+        elif self.lightbar_animation == 'Gradient Sweep':
+            r, g, b = self.lightbar_color
+            table = lightbar.gradient_table(self.lightbar_color, (255 - r, 255 - g, 255 - b))
+        else:
+            battery = self.session.battery if self.session is not None else None
+            table = lightbar.battery_table(battery.level_percentage if battery is not None else 0)
+        
+        if self.lightbar_animator is None:
+            self.lightbar_animator = lightbar.LightbarAnimator(
+                lambda r, g, b: self.send_output('lightbar', lambda c: c.lightbar.set_color(r, g, b))
+            )
+        was_running = self.lightbar_animator.is_running
+        self.lightbar_animator.play(table)
+        if not was_running:
+            self.update_lightbar_drift()
+
+    def update_lightbar_drift(self):
+        # How late the animator's frames run, refreshed while it plays
+        animator = self.lightbar_animator
+        if not self.is_running or animator is None or not animator.is_running:
+            self.lightbar_drift.config(text="")
+            return
+        stats = animator.loop.stats()
+        self.lightbar_drift.config(
+            text=f"late p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.1f} ms, {stats['skipped']} skipped"
+        )
+        self.root.after(1000, self.update_lightbar_drift)
 
     def apply_left_trigger(self):
         if self.controller:
             # Ensure rumble is off
             if self.rumble_active:
                 self.stop_rumble()
+            self.stop_trigger_sweep()
             effect_func = self.trigger_effects[self.trigger_var.get()]
-            effect_func(self.controller.left_trigger)
+            self.send_output('left_trigger', lambda c: effect_func(c.left_trigger))
 
     def apply_right_trigger(self):
         if self.controller:
             # Ensure rumble is off
             if self.rumble_active:
                 self.stop_rumble()
+            self.stop_trigger_sweep()
             effect_func = self.trigger_effects[self.trigger_var.get()]
-            effect_func(self.controller.right_trigger)
+            self.send_output('right_trigger', lambda c: effect_func(c.right_trigger))
+
+    def set_trigger_effect(self, session, trigger, preset):
+        effect_func = self.trigger_effects[preset]
+        self.stop_trigger_sweep()
+        if trigger == 'L2':
+            self.send_output('left_trigger', lambda c: effect_func(c.left_trigger), session.controller)
+        else:
+            self.send_output('right_trigger', lambda c: effect_func(c.right_trigger), session.controller)
+
+    def stop_trigger_sweep(self):
+        # The sweep and the preset buttons set the same trigger effects
+        if self.trigger_sweep_window is not None and self.trigger_sweep_window.is_open:
+            self.trigger_sweep_window.stop()
+
+    def stop_trigger_effects(self, controller):
+        off = self.trigger_effects['Off']
+        self.send_output('left_trigger', lambda c: off(c.left_trigger), controller)
+        self.send_output('right_trigger', lambda c: off(c.right_trigger), controller)
 
     def apply_led_settings(self):
         if self.controller:
-            # Apply brightness first
-            brightness_func = self.brightness_patterns[self.brightness_var.get()]
-            brightness_func(self.controller)
-            
-            # Then apply LED pattern
-            pattern_func = self.led_patterns[self.led_var.get()]
-            pattern_func(self.controller)
+            # Brightness and pattern are queued together and go out in the
+            # same output report
+            self.send_output('led_brightness', self.brightness_patterns[self.brightness_var.get()])
+            self.send_output('player_leds', self.led_patterns[self.led_var.get()])
 
     def run(self):
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -875,22 +2913,183 @@ class DualSenseGUI:
 
     def on_closing(self):
         # Show message box
-        tk.messagebox.showinfo(
+        from tkinter import messagebox
+        messagebox.showinfo(
             "Controller Reset",
             "Disconnect your controller to reset the changes :)",
             parent=self.root
         )
-        
-        # Clean up and close
+        self.shutdown()
+
+    def shutdown(self):
+        # Clean up and close, the monitor deactivates the controllers it opened
         self.is_running = False
-        if self.controller:
-            self.controller.deactivate()
+        if self.recorder is not None and self.recorder.is_recording:
+            self.recorder.stop()
+        # Let the last output changes go out before the controllers close
+        if self.lightbar_animator is not None:
+            self.lightbar_animator.stop()
+        self.stop_waveform()
+        self.stop_trigger_sweep()
+        if self.station_window is not None and self.station_window.is_open:
+            self.station_window.close()
+        self.output.stop()
+        if self.device_monitor is not None:
+            self.device_monitor.stop()
+        for session in self.replay_sessions:
+            session.deactivate()
         self.root.destroy()
 
+    def on_first_expose(self, event):
+        if not self.first_painted:
+            self.first_painted = True
+            # The canvas redraws in the idle callback queued with the expose
+            self.root.after_idle(startup_profile.mark, 'first paint')
+
+    def check_startup_profile(self, waited_ms=0):
+        # Wait for the first paint and the controller library, then report
+        library_done = self.device_monitor is None or startup_profile.has('controller library')
+        if not (startup_profile.has('first paint') and library_done) and waited_ms < 10000:
+            self.root.after(50, self.check_startup_profile, waited_ms + 50)
+            return
+        
+        report = startup_profile.report()
+        if self.profile_startup == '-' and sys.stdout is not None:
+            print(report)
+        else:
+            # Windowed builds have no console to print to
+            path = 'startup-profile.txt' if self.profile_startup == '-' else self.profile_startup
+            with open(path, 'w') as f:
+                f.write(report + "\n")
+        self.shutdown()
+
+    def toggle_recording(self):
+        if self.recorder is not None and self.recorder.is_recording:
+            for session in self.sessions:
+                session.recorder = None
+            self.recorder.stop()
+            self.record_btn.config(text="Record")
+            self.record_label.config(
+                text=f"Saved {self.recorder.records} events to {len(self.recorder.files)} file(s)"
+            )
+            return
+        
+        self.recorder = InputRecorder(self.record_dir)
+        try:
+            self.recorder.start()
+        except OSError as error:
+            self.recorder = None
+            self.record_label.config(text=f"Can't record: {error}")
+            return
+        for session in self.sessions:
+            session.recorder = self.recorder
+        self.record_btn.config(text="Stop")
+        self.update_recording_status()
+
+    def update_recording_status(self):
+        recorder = self.recorder
+        if recorder is None:
+            return
+        if recorder.error is not None:
+            # The writer thread stopped on a disk error
+            for session in self.sessions:
+                session.recorder = None
+            self.record_btn.config(text="Record")
+            self.record_label.config(text=f"Recording stopped: {recorder.error}")
+            return
+        if not recorder.is_recording:
+            return
+        name = os.path.basename(recorder.current_path) if recorder.current_path else "..."
+        dropped = f", {recorder.dropped} dropped" if recorder.dropped else ""
+        self.record_label.config(
+            text=f"Recording {name}: {recorder.records} events, {recorder.bytes_written // 1024} KB{dropped}"
+        )
+        self.root.after(500, self.update_recording_status)
+
+    def open_stats(self):
+        if self.stats_window is not None and self.stats_window.is_open:
+            self.stats_window.lift()
+        else:
+            self.stats_window = StatsWindow(
+                self.root, self.latency, self.dispatcher, lambda: self.session, self.output,
+                lambda: (self.render_errors, self.last_render_error)
+            )
+
+    def open_stick_test(self):
+        if self.stick_test_window is not None and self.stick_test_window.is_open:
+            self.stick_test_window.lift()
+        else:
+            self.stick_test_window = StickTestWindow(self.root, lambda: self.session)
+
+    def open_motion(self):
+        if self.motion_window is not None and self.motion_window.is_open:
+            self.motion_window.lift()
+        else:
+            self.motion_window = MotionWindow(self.root, lambda: self.session)
+
+    def open_trigger_capture(self):
+        if self.trigger_capture_window is not None and self.trigger_capture_window.is_open:
+            self.trigger_capture_window.lift()
+        else:
+            self.trigger_capture_window = TriggerCaptureWindow(
+                self.root, lambda: self.session, list(self.trigger_effects), self.set_trigger_effect
+            )
+
+    def open_trigger_sweep(self):
+        if self.trigger_sweep_window is not None and self.trigger_sweep_window.is_open:
+            self.trigger_sweep_window.lift()
+        else:
+            self.trigger_sweep_window = TriggerSweepWindow(self.root, lambda: self.session, self.stop_trigger_effects)
+
+    def open_touchpad(self):
+        if self.touchpad_window is not None and self.touchpad_window.is_open:
+            self.touchpad_window.lift()
+        else:
+            self.touchpad_window = TouchpadWindow(self.root, lambda: self.session)
+
+    def open_button_health(self):
+        if self.button_health_window is not None and self.button_health_window.is_open:
+            self.button_health_window.lift()
+        else:
+            self.button_health_window = ButtonHealthWindow(self.root, lambda: self.session)
+
+    def open_station(self):
+        if self.station_window is not None and self.station_window.is_open:
+            self.station_window.lift()
+        else:
+            self.station_window = StationWindow(self.root, lambda: list(self.sessions), self.select_session,
+                                                self.station_db)
+
     def open_github(self):
         import webbrowser
         webbrowser.open('http://github.com/aneeskhan47')
 
+def parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="DualSense Controller Tester")
+    parser.add_argument('--replay', metavar='FILE', help="play back a .dsrec recording instead of real controllers")
+    parser.add_argument('--demo', action='store_true', help="play back a synthetic input stream")
+    parser.add_argument('--speed', default='1', help="playback speed multiplier, or 'max'")
+    parser.add_argument('--loop', action='store_true', help="repeat the playback until closed")
+    parser.add_argument('--station', nargs='?', const='station_results.db', metavar='DB',
+                        help="start in test station mode, storing results in DB")
+    parser.add_argument('--profile-startup', nargs='?', const='-', metavar='FILE',
+                        help="print startup phase timings (or write them to FILE) and exit")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    app = DualSenseGUI()
+    args = parse_args(sys.argv[1:])
+    replaying = args.replay or args.demo
+    app = DualSenseGUI(autoconnect=not replaying, profile_startup=args.profile_startup,
+                       station_db=args.station or 'station_results.db')
+    if args.station:
+        app.open_station()
+    if replaying:
+        speed = None if args.speed == 'max' else float(args.speed)
+        if args.replay:
+            streams = load_sessions(args.replay)
+        else:
+            streams = {'demo': button_mash(10) + stick_circles(10) + trigger_pulls(10) + battery_drain(10)}
+        app.start_replay(streams, speed=speed, loop=args.loop)
+        startup_profile.mark('replay setup')
     app.run()
\ No newline at end of file
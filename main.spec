@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('ps5_controller.png', '.'), ('hidapi.dll', '.'), ('icon.ico', '.')],
+    datas=[('ps5_controller.png', '.'), ('ps5_controller_prescaled.png', '.'), ('hidapi.dll', '.'), ('icon.ico', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,107 @@
+import threading
+import time
+
+
+def rumble(left, right):
+    # Both motors as one change, so they always go out together
+    def apply(controller):
+        controller.left_rumble.set(left)
+        controller.right_rumble.set(right)
+    return apply
+
+
+class OutputScheduler:
+    # Output changes (rumble, lightbar, player LEDs, trigger effects) are
+    # queued per controller and channel and applied from the controller's
+    # own reader thread, in the core's update event, at most max_rate_hz
+    # times a second. A change replaces the one still pending on its
+    # channel, so a burst costs one write. The library sends the changed
+    # write states right after that event returns, on the same thread, so
+    # everything applied in one pass goes out in one output report.
+    #
+    # submit() only takes a lock for a dict store, the Tk thread never
+    # waits on the controller.
+    def __init__(self, max_rate_hz=60):
+        self.interval = 1.0 / max_rate_hz
+        self._lock = threading.Lock()
+        self._pending = {}  # controller -> {channel: apply(controller)}
+        self._last_applied = {}
+        self._stopped = False
+
+        # Counters, read by the stats views
+        self.submitted = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.ticks = 0
+        self.errors = 0
+        self.max_apply_ms = 0.0
+
+    def attach(self, controller):
+        # Called once per controller, before it is activated
+        controller._core.on_updated(lambda: self.on_report(controller))
+
+    def submit(self, controller, channel, apply):
+        # Called from any thread
+        with self._lock:
+            if self._stopped:
+                return
+            self.submitted += 1
+            pending = self._pending.setdefault(controller, {})
+            if channel in pending:
+                self.coalesced += 1
+            pending[channel] = apply
+
+    def discard(self, controller):
+        # Drops what is still pending for a controller that went away
+        with self._lock:
+            self._pending.pop(controller, None)
+            self._last_applied.pop(controller, None)
+
+    def stop(self, flush=True):
+        # Takes no more changes. By default what is still pending is applied
+        # now, from the calling thread, for the controllers about to close.
+        with self._lock:
+            self._stopped = True
+            pending = self._pending
+            self._pending = {}
+        if flush:
+            for controller, changes in pending.items():
+                self.apply(controller, changes)
+
+    def on_report(self, controller):
+        # Runs on the controller's reader thread for every input report, so
+        # the common case is one dict lookup
+        if controller not in self._pending:
+            return
+        now = time.perf_counter()
+        if now - self._last_applied.get(controller, 0.0) < self.interval:
+            return
+        with self._lock:
+            changes = self._pending.pop(controller, None)
+        if changes:
+            self._last_applied[controller] = now
+            self.apply(controller, changes)
+
+    def apply(self, controller, changes):
+        # An exception here would end the library's reader thread
+        start = time.perf_counter()
+        for apply in changes.values():
+            try:
+                apply(controller)
+            except Exception:
+                self.errors += 1
+        elapsed = (time.perf_counter() - start) * 1000
+        self.applied += len(changes)
+        self.ticks += 1
+        if elapsed > self.max_apply_ms:
+            self.max_apply_ms = elapsed
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'coalesced': self.coalesced,
+            'applied': self.applied,
+            'ticks': self.ticks,
+            'errors': self.errors,
+            'max_apply_ms': self.max_apply_ms,
+        }
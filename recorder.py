@@ -0,0 +1,202 @@
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from input_state import BUTTON_BINDINGS
+
+# Recording file layout:
+#
+#   header  '<8sdQ'   magic, wall clock start (time.time()), perf_counter_ns at start
+#   records '<QBBHf'  16 bytes each:
+#                     perf_counter_ns, session id, kind, code, value
+#
+# perf_counter_ns is monotonic, the header pairs it with the wall clock so a
+# record can be placed in real time.
+MAGIC = b'DSREC1\x00\x00'
+HEADER = struct.Struct('<8sdQ')
+RECORD = struct.Struct('<QBBHf')
+
+KIND_BUTTON = 1    # code: index in BUTTON_NAMES, value: 1.0 pressed / 0.0 released
+KIND_AXIS = 2      # code: index in AXIS_NAMES, value: as reported by the controller
+KIND_BATTERY = 3   # code: BATTERY_* flags, value: level percentage
+KIND_ERROR = 4     # code and value unused
+
+# A button's code is its bit in the pressed mask. New buttons only ever go
+# on the end of BUTTON_BINDINGS, so older recordings keep their meaning.
+BUTTON_NAMES = tuple(name for name, _ in BUTTON_BINDINGS)
+BUTTON_CODES = {name: code for code, name in enumerate(BUTTON_NAMES)}
+
+AXIS_NAMES = ('left_stick_x', 'left_stick_y', 'right_stick_x', 'right_stick_y', 'left_trigger', 'right_trigger')
+AXIS_CODES = {name: code for code, name in enumerate(AXIS_NAMES)}
+
+BATTERY_CHARGING = 1
+BATTERY_FULL = 2
+
+
+class InputRecorder:
+    # Records input events to disk without ever blocking the caller. Reader
+    # threads pack records into a preallocated chunk; a background thread
+    # writes finished chunks out and rotates files by size and age.
+    def __init__(self, directory, prefix='recording', max_bytes=64 * 1024 * 1024, max_seconds=3600,
+                 chunk_records=4096, flush_interval=0.5, max_pending_chunks=64):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.chunk_size = chunk_records * RECORD.size
+        self.flush_interval = flush_interval
+        self.max_pending_chunks = max_pending_chunks
+
+        self._lock = threading.Lock()
+        self._chunk = bytearray(self.chunk_size)
+        self._offset = 0
+        self._pending = []
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+
+        self._file = None
+        self._file_bytes = 0
+        self._file_opened = 0.0
+
+        # Counters, read by the GUI
+        self.current_path = None
+        self.files = []
+        self.records = 0
+        self.bytes_written = 0
+        self.dropped = 0
+        # Why the writer thread gave up, recording stops with it
+        self.error = None
+
+    @property
+    def is_recording(self):
+        return self._running
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._write_loop, name="InputRecorder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ---- called from reader threads ----
+
+    def record(self, session_id, kind, code, value):
+        if not self._running:
+            return
+        timestamp = time.perf_counter_ns()
+        with self._lock:
+            RECORD.pack_into(self._chunk, self._offset, timestamp, session_id & 0xff, kind, code, value)
+            self._offset += RECORD.size
+            if self._offset == self.chunk_size:
+                if len(self._pending) < self.max_pending_chunks:
+                    self._pending.append(self._chunk)
+                else:
+                    # The disk can't keep up, lose a chunk rather than stall input
+                    self.dropped += self.chunk_size // RECORD.size
+                self._chunk = bytearray(self.chunk_size)
+                self._offset = 0
+                self._wake.set()
+            self.records += 1
+
+    def record_update(self, session_id, update_type, data):
+        if update_type == 'button':
+            # The button's bit is its recording code
+            code, is_pressed = data
+            self.record(session_id, KIND_BUTTON, code, 1.0 if is_pressed else 0.0)
+        elif update_type == 'battery':
+            flags = (BATTERY_CHARGING if data.charging else 0) | (BATTERY_FULL if data.full else 0)
+            self.record(session_id, KIND_BATTERY, flags, data.level_percentage)
+        elif update_type == 'error':
+            self.record(session_id, KIND_ERROR, 0, 0.0)
+
+    def record_axis(self, session_id, axis, value):
+        self.record(session_id, KIND_AXIS, AXIS_CODES[axis], value)
+
+    # ---- writer thread ----
+
+    def _write_loop(self):
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                running = self._running
+
+                with self._lock:
+                    pending = self._pending
+                    self._pending = []
+                    if self._offset:
+                        pending.append(self._chunk[:self._offset])
+                        self._offset = 0
+
+                try:
+                    for data in pending:
+                        self._write(memoryview(data))
+                    if self._file is not None:
+                        self._file.flush()
+                except OSError as error:
+                    # Disk full, directory gone or no permission: stop
+                    # taking records rather than queue ones that can't land
+                    self.error = str(error)
+                    self._running = False
+                    break
+
+                if not running:
+                    break
+        finally:
+            self._close_file()
+
+    def _write(self, data):
+        while data:
+            if self._file is None or time.monotonic() - self._file_opened >= self.max_seconds:
+                self._open_file()
+            room = self.max_bytes - self._file_bytes
+            if room < RECORD.size:
+                self._open_file()
+                room = self.max_bytes - self._file_bytes
+            # Only ever split between records
+            count = min(len(data), max(room - room % RECORD.size, RECORD.size))
+            self._file.write(data[:count])
+            self._file_bytes += count
+            self.bytes_written += count
+            data = data[count:]
+
+    def _open_file(self):
+        self._close_file()
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{len(self.files):03d}.dsrec")
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, time.time(), time.perf_counter_ns()))
+        self._file_bytes = HEADER.size
+        self._file_opened = time.monotonic()
+        self.current_path = path
+        self.files.append(path)
+
+    def _close_file(self):
+        if self._file is not None:
+            file, self._file = self._file, None
+            try:
+                file.close()
+            except OSError as error:
+                # Closing flushes, which fails the same way a write does
+                self.error = self.error or str(error)
+                self._running = False
+
+
+def read_recording(path):
+    # Returns (wall clock start, perf_counter_ns start, records) for a recording
+    # file, records being (timestamp_ns, session_id, kind, code, value) tuples
+    with open(path, 'rb') as f:
+        magic, wall_start, perf_start = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    return wall_start, perf_start, list(RECORD.iter_unpack(data[:usable]))
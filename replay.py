@@ -0,0 +1,288 @@
+import math
+import threading
+import time
+from collections import namedtuple
+from input_state import BUTTON_BINDINGS
+from recorder import (
+    read_recording, BUTTON_NAMES, BUTTON_CODES, AXIS_NAMES, AXIS_CODES,
+    KIND_BUTTON, KIND_AXIS, KIND_BATTERY, KIND_ERROR, BATTERY_CHARGING, BATTERY_FULL
+)
+
+# Controller property behind each button name the GUI uses
+BUTTON_PROPERTIES = dict(BUTTON_BINDINGS)
+
+# Same fields as the library's Battery value
+ReplayBattery = namedtuple('ReplayBattery', 'level_percentage full charging')
+
+
+class ReplayProperty:
+    # Stands in for a dualsense_controller property, with the callback
+    # registration methods setup_controller_callbacks uses
+    def __init__(self):
+        self.value = None
+        self.previous = None
+        self._down = []
+        self._up = []
+        self._change = []
+
+    def on_down(self, callback):
+        self._down.append(callback)
+
+    def on_up(self, callback):
+        self._up.append(callback)
+
+    def on_change(self, callback):
+        self._change.append(callback)
+
+    def on_lower_than(self, percentage, callback):
+        def check(battery):
+            previous = self.previous
+            if battery.level_percentage <= percentage and (
+                    previous is None or battery.level_percentage != previous.level_percentage):
+                callback(battery.level_percentage)
+        self._change.append(check)
+
+    def on_charging(self, callback):
+        self._change.append(self._charging_check(callback, True))
+
+    def on_discharging(self, callback):
+        self._change.append(self._charging_check(callback, False))
+
+    def _charging_check(self, callback, expected):
+        def check(battery):
+            previous = self.previous
+            if battery.charging == expected and (previous is None or battery.charging != previous.charging):
+                callback(battery.level_percentage)
+        return check
+
+    def emit(self, value):
+        self.previous = self.value
+        self.value = value
+        if isinstance(value, bool):
+            for callback in (self._down if value else self._up):
+                callback()
+        for callback in self._change:
+            callback(value)
+
+
+class ReplayTriggerProperty(ReplayProperty):
+    # Analog trigger, effects set on it go nowhere
+    def __init__(self):
+        super().__init__()
+        self.effect = OutputSink()
+        self.feedback = ReplayProperty()
+
+
+class OutputSink:
+    # Swallows output commands (rumble, lightbar, LEDs, trigger effects),
+    # there is no hardware to send them to
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return None
+
+
+class ReplayCore:
+    # Stands in for the controller's core, for its per-report update event
+    def __init__(self):
+        self._updated = []
+
+    def on_updated(self, callback):
+        self._updated.append(callback)
+
+    def emit(self):
+        for callback in self._updated:
+            callback()
+
+
+class ReplayConnectionType:
+    def __init__(self, name):
+        self.value = (name,)
+
+
+class ReplayDeviceInfo:
+    def __init__(self, name, serial_number='REPLAY'):
+        self.path = f"replay-{name}".encode()
+        self.serial_number = serial_number
+
+
+class ReplayController:
+    # Drop-in for DualSenseController that plays back an event stream instead
+    # of reading HID reports. Events are (timestamp_ns, session_id, kind, code,
+    # value) tuples, the format recorder.py writes.
+    #
+    # speed is a multiplier on the recorded timing; None plays as fast as the
+    # callbacks allow. Events recorded within report_window_ns of each other
+    # are delivered together as one input report.
+    def __init__(self, events, speed=1.0, loop=False, connection='USB', report_window_ns=500_000,
+                 on_finished=None):
+        self.events = sorted(events)
+        self.speed = speed
+        self.loop = loop
+        self.report_window_ns = report_window_ns
+        self.on_finished = on_finished
+        self.connection_type = ReplayConnectionType(connection)
+
+        self.properties = {name: ReplayProperty() for name in BUTTON_PROPERTIES.values()}
+        for name in AXIS_NAMES + ('battery',):
+            self.properties[name] = ReplayTriggerProperty() if name.endswith('_trigger') else ReplayProperty()
+        self.outputs = OutputSink()
+        self._core = ReplayCore()
+        self._error_callbacks = []
+
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        # Playback stats, read from other threads
+        self.reports_played = 0
+        self.events_played = 0
+        self.loops = 0
+        self.max_lateness_ms = 0.0
+        self.finished = threading.Event()
+
+    def __getattr__(self, name):
+        # Only reached for names that aren't regular attributes
+        properties = self.__dict__.get('properties')
+        if properties is not None and name in properties:
+            return properties[name]
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.__dict__['outputs']
+
+    def on_error(self, callback):
+        self._error_callbacks.append(callback)
+
+    def activate(self):
+        self._thread = threading.Thread(target=self._play, name="ReplayController", daemon=True)
+        self._thread.start()
+
+    def deactivate(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+
+    def _reports(self):
+        # Group the stream into input reports
+        report = []
+        report_start = None
+        for event in self.events:
+            if report and event[0] - report_start > self.report_window_ns:
+                yield report_start, report
+                report = []
+            if not report:
+                report_start = event[0]
+            report.append(event)
+        if report:
+            yield report_start, report
+
+    def _play(self):
+        reports = list(self._reports())
+        try:
+            while reports and not self._stop_event.is_set():
+                first = reports[0][0]
+                started = time.perf_counter_ns()
+                for timestamp, report in reports:
+                    if self._stop_event.is_set():
+                        return
+                    if self.speed:
+                        due = started + (timestamp - first) / self.speed
+                        wait = due - time.perf_counter_ns()
+                        if wait > 0:
+                            self._stop_event.wait(wait / 1e9)
+                        # How far behind schedule the report went out
+                        lateness = (time.perf_counter_ns() - due) / 1e6
+                        if lateness > self.max_lateness_ms:
+                            self.max_lateness_ms = lateness
+                    self.deliver(report)
+                self.loops += 1
+                if not self.loop:
+                    break
+        finally:
+            self.finished.set()
+            if self.on_finished is not None and not self._stop_event.is_set():
+                self.on_finished(self)
+
+    def deliver(self, report):
+        # One input report: the core's update event, then every change it
+        # carried, in the order the library fires them
+        self._core.emit()
+        for _, _, kind, code, value in report:
+            if kind == KIND_BUTTON:
+                self.properties[BUTTON_PROPERTIES[BUTTON_NAMES[code]]].emit(value >= 0.5)
+            elif kind == KIND_AXIS:
+                self.properties[AXIS_NAMES[code]].emit(value)
+            elif kind == KIND_BATTERY:
+                self.properties['battery'].emit(ReplayBattery(
+                    round(value), bool(code & BATTERY_FULL), bool(code & BATTERY_CHARGING)
+                ))
+            elif kind == KIND_ERROR:
+                for callback in self._error_callbacks:
+                    callback(Exception("Replayed controller error"))
+            self.events_played += 1
+        self.reports_played += 1
+
+
+def load_sessions(path):
+    # Splits a recording into one event list per recorded controller
+    _, _, records = read_recording(path)
+    sessions = {}
+    for record in records:
+        sessions.setdefault(record[1], []).append(record)
+    return sessions
+
+
+# ---- synthetic streams, all in the recording format ----
+
+def button_mash(duration=5.0, rate_hz=250, buttons=BUTTON_NAMES, session_id=1):
+    # Presses and releases the buttons in turn, one change per report
+    events = []
+    period_ns = int(1e9 / rate_hz)
+    pressed = dict.fromkeys(buttons, False)
+    for i in range(int(duration * rate_hz)):
+        button = buttons[(i // 2) % len(buttons)]
+        pressed[button] = not pressed[button]
+        events.append((i * period_ns, session_id, KIND_BUTTON, BUTTON_CODES[button], float(pressed[button])))
+    return events
+
+
+def stick_circles(duration=5.0, rate_hz=250, period=1.0, radius=1.0, session_id=1):
+    # Both sticks tracing full circles in opposite directions
+    events = []
+    period_ns = int(1e9 / rate_hz)
+    for i in range(int(duration * rate_hz)):
+        angle = 2 * math.pi * i / (rate_hz * period)
+        x = radius * math.cos(angle)
+        y = radius * math.sin(angle)
+        timestamp = i * period_ns
+        events.append((timestamp, session_id, KIND_AXIS, AXIS_CODES['left_stick_x'], x))
+        events.append((timestamp, session_id, KIND_AXIS, AXIS_CODES['left_stick_y'], y))
+        events.append((timestamp, session_id, KIND_AXIS, AXIS_CODES['right_stick_x'], -x))
+        events.append((timestamp, session_id, KIND_AXIS, AXIS_CODES['right_stick_y'], y))
+    return events
+
+
+def trigger_pulls(duration=5.0, rate_hz=250, period=1.0, session_id=1):
+    # Both triggers squeezed and released in turn, R2 half a period behind
+    events = []
+    period_ns = int(1e9 / rate_hz)
+    for i in range(int(duration * rate_hz)):
+        phase = i / (rate_hz * period)
+        timestamp = i * period_ns
+        for name, offset in (('left_trigger', 0.0), ('right_trigger', 0.5)):
+            pressure = 0.5 - 0.5 * math.cos(2 * math.pi * (phase + offset))
+            events.append((timestamp, session_id, KIND_AXIS, AXIS_CODES[name], pressure))
+    return events
+
+
+def battery_drain(duration=5.0, start=100, end=0, session_id=1):
+    # Level dropping 1% at a time, ending on the charger
+    steps = max(start - end, 1)
+    events = [
+        (int(duration * 1e9 * step / steps), session_id, KIND_BATTERY, 0, float(start - step))
+        for step in range(steps + 1)
+    ]
+    events.append((int(duration * 1e9) + 1, session_id, KIND_BATTERY, BATTERY_CHARGING, float(end)))
+    return events
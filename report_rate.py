@@ -0,0 +1,106 @@
+import math
+import time
+from array import array
+
+
+class ReportRateMeter:
+    # Counts input reports and the time between them. on_report runs on the
+    # controller's reader thread for every report, so it only bumps integer
+    # totals and one slot of a preallocated histogram. The Tk thread turns
+    # those totals into rates by diffing snapshots.
+    def __init__(self, bin_width_ms=0.5, bins=64, gap_ms=20.0, dropout_ms=100.0):
+        self.bin_width_ns = int(bin_width_ms * 1_000_000)
+        self.bins = bins
+        self.gap_ns = int(gap_ms * 1_000_000)
+        self.dropout_ns = int(dropout_ms * 1_000_000)
+
+        # The last slot collects everything past the histogram range
+        self.histogram = array('Q', [0]) * (bins + 1)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+        self.last_report_ns = 0
+        self.reports = 0
+        self.intervals = 0
+        self.interval_sum_ns = 0
+        self.interval_sq_sum = 0
+        self.gaps = 0
+        self.dropouts = 0
+        self.longest_gap_ns = 0
+
+        self._snapshot_time_ns = time.perf_counter_ns()
+        self._snapshot_totals = (0, 0, 0, 0)
+        self._snapshot_histogram = array('Q', self.histogram)
+
+    def on_report(self, _=None):
+        now = time.perf_counter_ns()
+        last = self.last_report_ns
+        self.last_report_ns = now
+        self.reports += 1
+        if not last:
+            return
+
+        interval = now - last
+        self.intervals += 1
+        self.interval_sum_ns += interval
+        self.interval_sq_sum += interval * interval
+
+        index = interval // self.bin_width_ns
+        self.histogram[index if index < self.bins else self.bins] += 1
+
+        if interval > self.gap_ns:
+            self.gaps += 1
+            if interval > self.dropout_ns:
+                self.dropouts += 1
+            if interval > self.longest_gap_ns:
+                self.longest_gap_ns = interval
+
+    def snapshot(self):
+        # Called on the Tk thread. Returns stats for the window since the last
+        # snapshot plus the running totals.
+        now = time.perf_counter_ns()
+        totals = (self.reports, self.intervals, self.interval_sum_ns, self.interval_sq_sum)
+        reports, intervals, interval_sum, interval_sq_sum = (
+            total - previous for total, previous in zip(totals, self._snapshot_totals)
+        )
+        elapsed = now - self._snapshot_time_ns
+
+        window_histogram = [
+            current - previous for current, previous in zip(self.histogram, self._snapshot_histogram)
+        ]
+        self._snapshot_time_ns = now
+        self._snapshot_totals = totals
+        self._snapshot_histogram = array('Q', self.histogram)
+
+        mean = interval_sum / intervals if intervals else 0.0
+        variance = interval_sq_sum / intervals - mean * mean if intervals else 0.0
+
+        # Nothing at all for a while counts as a dropout in progress
+        silence = now - self.last_report_ns if self.last_report_ns else 0
+        return {
+            'rate_hz': reports * 1e9 / elapsed if elapsed else 0.0,
+            'mean_interval_ms': mean / 1e6,
+            'jitter_ms': math.sqrt(max(variance, 0.0)) / 1e6,
+            'p99_interval_ms': self.histogram_percentile(window_histogram, 99),
+            'window_histogram': window_histogram,
+            'reports': self.reports,
+            'gaps': self.gaps,
+            'dropouts': self.dropouts,
+            'longest_gap_ms': self.longest_gap_ns / 1e6,
+            'stalled': silence > self.dropout_ns,
+        }
+
+    def histogram_percentile(self, histogram, pct):
+        total = sum(histogram)
+        if not total:
+            return 0.0
+        threshold = total * pct / 100
+        running = 0
+        for index, count in enumerate(histogram):
+            running += count
+            if running >= threshold:
+                # Upper edge of the bin, in milliseconds
+                return (index + 1) * self.bin_width_ns / 1e6
+        return (len(histogram)) * self.bin_width_ns / 1e6
@@ -0,0 +1,117 @@
+import time
+import numpy as np
+from timing import FixedRateLoop
+
+# Rumble waveforms: an envelope is one (left, right) motor strength pair,
+# 0 to 255, per frame at the player's update rate, worked out up front.
+SHAPES = ('Sine', 'Pulse', 'Ramp')
+
+UPDATE_RATE = 100
+
+
+def frame_times(seconds, rate=UPDATE_RATE):
+    return np.arange(max(int(round(seconds * rate)), 1)) / rate
+
+
+def stereo(levels, left_gain=1.0, right_gain=1.0):
+    # Same shape on both motors, scaled per motor to check their balance
+    levels = np.clip(levels, 0.0, 1.0)
+    return np.round(np.column_stack((levels * left_gain, levels * right_gain)) * 255).astype(np.uint8)
+
+
+def sine_envelope(frequency, seconds, left_gain=1.0, right_gain=1.0, rate=UPDATE_RATE):
+    # Strength swinging between 0 and full, frequency times a second
+    times = frame_times(seconds, rate)
+    return stereo(0.5 - 0.5 * np.cos(2 * np.pi * frequency * times), left_gain, right_gain)
+
+
+def pulse_envelope(frequency, seconds, duty=0.5, left_gain=1.0, right_gain=1.0, rate=UPDATE_RATE):
+    # Full strength for duty of each period, off for the rest
+    times = frame_times(seconds, rate)
+    return stereo(((times * frequency) % 1.0 < duty).astype(float), left_gain, right_gain)
+
+
+def ramp_envelope(seconds, left_gain=1.0, right_gain=1.0, rate=UPDATE_RATE):
+    # From off to full strength over the whole duration
+    times = frame_times(seconds, rate)
+    return stereo(times / max(times[-1], 1e-9), left_gain, right_gain)
+
+
+def load_envelope(path, rate=UPDATE_RATE):
+    # CSV with left,right per frame at the update rate, or time,left,right
+    # rows at any timing, which are resampled. Strengths run 0 to 255, or 0
+    # to 1 when no value is above 1. Lines that aren't numbers (a header)
+    # are skipped.
+    rows = []
+    with open(path) as f:
+        for line in f:
+            try:
+                rows.append([float(value) for value in line.replace(';', ',').split(',')])
+            except ValueError:
+                continue
+    if not rows or len({len(row) for row in rows}) != 1 or len(rows[0]) not in (2, 3):
+        raise ValueError(f"{path}: expected rows of left,right or time,left,right")
+    data = np.array(rows)
+    if data.shape[1] == 3:
+        grid = frame_times(data[-1, 0] - data[0, 0], rate) + data[0, 0]
+        data = np.column_stack([np.interp(grid, data[:, 0], data[:, column]) for column in (1, 2)])
+    if data.max() <= 1.0:
+        data = data * 255
+    return np.clip(np.round(data), 0, 255).astype(np.uint8)
+
+
+class RumblePlayer:
+    # Plays an envelope to both motors on a FixedRateLoop. write(left, right)
+    # runs on the loop's thread; the time it returns is compared with the
+    # frame's scheduled time, giving how far the writes drift.
+    def __init__(self, envelope, write, rate_hz=UPDATE_RATE, loop=False, on_finished=None):
+        self.envelope = envelope.tolist()
+        self.write = write
+        self.rate_hz = rate_hz
+        self.repeat = loop
+        self.on_finished = on_finished
+
+        # Write time minus scheduled time per frame, NaN for skipped frames
+        self.errors = np.full(len(self.envelope), np.nan)
+        self.position = 0
+        self.finished = False
+        self.timer = FixedRateLoop(rate_hz, self.tick, name="RumblePlayer")
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    @property
+    def is_running(self):
+        return self.timer.is_running
+
+    def tick(self, frame, lateness):
+        index = frame % len(self.envelope) if self.repeat else frame
+        if index >= len(self.envelope):
+            self.finished = True
+            self.timer.stop()
+            if self.on_finished is not None:
+                self.on_finished(self)
+            return
+        left, right = self.envelope[index]
+        self.write(left, right)
+        due = self.timer.started_at + frame * self.timer.period
+        self.errors[index] = time.perf_counter() - due
+        self.position = index
+
+    def stats(self):
+        # Write timing against the schedule, in milliseconds
+        errors = self.errors[~np.isnan(self.errors)] * 1000
+        if not len(errors):
+            return {'writes': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0,
+                    'skipped': self.timer.skipped}
+        return {
+            'writes': int(len(errors)),
+            'mean_ms': float(errors.mean()),
+            'p50_ms': float(np.percentile(errors, 50)),
+            'p99_ms': float(np.percentile(errors, 99)),
+            'max_ms': float(errors.max()),
+            'skipped': self.timer.skipped,
+        }
@@ -0,0 +1,46 @@
+import time
+import numpy as np
+
+
+class SampleRing:
+    # Preallocated ring of timestamped samples, one row of time plus values
+    # per sample. A single reader thread appends; the Tk thread copies out
+    # the rows it needs in one go, so analysis and plotting run vectorized.
+    def __init__(self, columns, capacity):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, columns + 1))
+        self.count = 0
+
+    def append(self, *values):
+        self.data[self.count % self.capacity] = (time.perf_counter(),) + values
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+    def snapshot(self):
+        # Filled rows, oldest first
+        count = self.count
+        if count <= self.capacity:
+            return self.data[:count].copy()
+        start = count % self.capacity
+        return np.concatenate((self.data[start:], self.data[:start]))
+
+    def since(self, index):
+        # Rows appended after the given count, and the count to pass next
+        # time. Rows already overwritten by the ring are skipped.
+        count = self.count
+        if index > count:
+            index = 0  # reset since the last call
+        index = max(index, count - self.capacity, 0)
+        if index == count:
+            return self.data[:0], count
+        start = index % self.capacity
+        end = count % self.capacity
+        if start < end:
+            return self.data[start:end].copy(), count
+        return np.concatenate((self.data[start:], self.data[:end])), count
+
+    def recent(self, rows):
+        # The last few rows, oldest first
+        return self.since(self.count - rows)[0]
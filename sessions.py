@@ -0,0 +1,245 @@
+import itertools
+import time
+from report_rate import ReportRateMeter
+from input_state import BUTTON_BINDINGS, AXIS_BINDINGS, STICK_AXES, LEFT_X, LEFT_Y, RIGHT_X, RIGHT_Y, LEFT_TRIGGER, RIGHT_TRIGGER
+
+
+def finger_values(finger):
+    # Active, id, x and y of a touch contact, zeros before the first report
+    if finger is None:
+        return (0, 0, 0, 0)
+    return (finger.active, finger.id, finger.x, finger.y)
+
+
+class ControllerSession:
+    # Everything the GUI knows about one connected controller. The controller's
+    # reader thread writes into it through the callbacks wired up by
+    # connect_callbacks; the Tk thread renders from it.
+    _ids = itertools.count(1)
+
+    def __init__(self, device_info, dispatcher, latency=None):
+        self.session_id = next(ControllerSession._ids)
+        self.device_path = device_info.path
+        self.serial_number = device_info.serial_number
+        self.dispatcher = dispatcher
+        self.latency = latency
+        self.recorder = None
+        self.controller = None
+
+        # Pressed buttons as shown, one bit per entry in BUTTON_BINDINGS.
+        # Only the Tk thread changes it, from the ordered button edges.
+        self.buttons = 0
+        self.battery = None
+        self.connection_type = None
+        
+        # Input report timing, fed by the reader thread on every report
+        self.report_meter = ReportRateMeter()
+        self.report_stats = None
+        
+        # Every stick sample for the drift and circularity test. Imported
+        # here so NumPy loads on the device monitor thread, not at startup.
+        from stick_analysis import StickSampleBuffer, StickHeatmap
+        self.stick_samples = StickSampleBuffer()
+        self.stick_heatmap = StickHeatmap()
+        self.samples_consumed = 0
+        
+        # Motion sensor readings, sampled once per report like the sticks
+        from imu import ImuSampleBuffer
+        self.gyroscope = None
+        self.accelerometer = None
+        self.imu_samples = ImuSampleBuffer()
+        
+        # Touchpad contacts, a row is only added when a finger changed
+        from touchpad import TouchSampleBuffer
+        self.touch_finger_1 = None
+        self.touch_finger_2 = None
+        self.touch_sequence = 0
+        self.touch_sampled = 0
+        self.touch_samples = TouchSampleBuffer()
+        
+        # Analog trigger pressure, every report goes into the buffer and the
+        # frame loop draws the latest value
+        from triggers import TriggerSampleBuffer
+        self.trigger_samples = TriggerSampleBuffer()
+        self.trigger_sequence = 0
+        self.drawn_trigger_sequence = 0
+        
+        # Every button edge with the time it was parsed, for the bounce and
+        # chatter check
+        from button_health import ButtonEdgeLog
+        self.button_edges = ButtonEdgeLog()
+
+        # Latest value of every axis in AXIS_BINDINGS, plain slot stores from
+        # the reader thread. The sequence numbers tell the frame loop
+        # something new arrived.
+        self.axes = [0.0] * len(AXIS_BINDINGS)
+        self.stick_sequence = 0
+        self.drawn_stick_sequence = 0
+        self.stick_time = 0.0
+        
+        # When the report being parsed arrived, set by on_report before the
+        # report's change callbacks run. Latency receipts use it.
+        self.report_time = None
+
+    def post(self, update_type, data, *args, receipt=None):
+        # receipt is when the input behind the update arrived, None for
+        # updates that don't come from an input report
+        ticket = None
+        if self.latency is not None:
+            ticket = self.latency.start(update_type, receipt)
+        if self.recorder is not None:
+            self.recorder.record_update(self.session_id, update_type, data)
+        # The latency ticket rides along as the first argument
+        if ticket is not None:
+            self.latency.stamp(ticket, 'enqueue')
+        # Coalesce per session so one busy controller can't hide another's update
+        self.dispatcher.post(update_type, (self, data), (ticket,) + args, key=(self.session_id, update_type))
+
+    @property
+    def stick_samples_pending(self):
+        # Samples not yet taken, negative right after a reset
+        return self.stick_samples.count - self.samples_consumed
+
+    def take_stick_samples(self):
+        # Called on the Tk thread when a stick moved. Returns the samples
+        # that arrived since the last call, after adding them to the heatmap.
+        rows, self.samples_consumed = self.stick_samples.since(self.samples_consumed)
+        self.stick_heatmap.add(rows)
+        return rows
+
+    def on_report(self):
+        # Fires once per input report. The library emits it before the
+        # report's change callbacks, so the samples hold the values as of
+        # the report before, one report behind but never skipped.
+        self.report_time = time.perf_counter()
+        self.report_meter.on_report()
+        axes = self.axes
+        self.stick_samples.append(axes[LEFT_X], axes[LEFT_Y], axes[RIGHT_X], axes[RIGHT_Y])
+        self.trigger_samples.append(axes[LEFT_TRIGGER], axes[RIGHT_TRIGGER])
+        gyroscope, accelerometer = self.gyroscope, self.accelerometer
+        if gyroscope is not None and accelerometer is not None:
+            self.imu_samples.append(
+                gyroscope.x, gyroscope.y, gyroscope.z, accelerometer.x, accelerometer.y, accelerometer.z
+            )
+        sequence = self.touch_sequence
+        if sequence != self.touch_sampled:
+            self.touch_sampled = sequence
+            first, second = self.touch_finger_1, self.touch_finger_2
+            self.touch_samples.append(*finger_values(first), *finger_values(second))
+
+    def on_gyroscope(self, value):
+        self.gyroscope = value
+
+    def on_accelerometer(self, value):
+        self.accelerometer = value
+
+    def on_touch_finger_1(self, value):
+        self.touch_finger_1 = value
+        self.touch_sequence += 1
+
+    def on_touch_finger_2(self, value):
+        self.touch_finger_2 = value
+        self.touch_sequence += 1
+
+    def button_callback(self, bit):
+        # on_change callback for the button behind bit. Edges go through the
+        # dispatcher in order, the Tk thread folds them into the mask.
+        edges = self.button_edges
+        def on_change(pressed):
+            edges.append(bit, pressed)
+            self.post('button', (bit, bool(pressed)), receipt=self.report_time)
+        return on_change
+
+    def apply_button(self, bit, pressed):
+        # Folds one posted edge into the mask on the consuming thread,
+        # returns the bits that flipped
+        buttons = self.buttons | 1 << bit if pressed else self.buttons & ~(1 << bit)
+        changed = self.buttons ^ buttons
+        self.buttons = buttons
+        return changed
+
+    def axis_callback(self, index):
+        # on_change callback that stores one axis into its slot
+        name, sign = AXIS_BINDINGS[index]
+        axes = self.axes
+        if index in STICK_AXES:
+            def on_change(value):
+                axes[index] = value * sign
+                self.stick_time = time.perf_counter()
+                if self.recorder is not None:
+                    self.recorder.record_axis(self.session_id, name, value)
+                self.stick_sequence += 1
+        else:
+            def on_change(value):
+                axes[index] = value * sign
+                if self.recorder is not None:
+                    self.recorder.record_axis(self.session_id, name, value)
+                self.trigger_sequence += 1
+        return on_change
+
+    def deactivate(self):
+        if self.controller is not None:
+            self.controller.deactivate()
+
+
+def connect_callbacks(session, on_error):
+    # Wires every controller property the testers read into the session.
+    # on_error(error) runs on the controller thread, usually on unplug.
+    controller = session.controller
+
+    # Every button and axis from the binding tables, one callback each
+    for bit, (_, name) in enumerate(BUTTON_BINDINGS):
+        getattr(controller, name).on_change(session.button_callback(bit))
+    for index, (name, _) in enumerate(AXIS_BINDINGS):
+        getattr(controller, name).on_change(session.axis_callback(index))
+
+    # Battery callbacks - fixed to handle parameters
+    controller.battery.on_change(lambda b: session.post('battery', b, receipt=session.report_time))
+    controller.battery.on_lower_than(
+        20, lambda _: session.post('battery_warning', 'Low battery!', receipt=session.report_time)
+    )
+    controller.battery.on_charging(
+        lambda _: session.post('battery_status', 'charging', receipt=session.report_time)
+    )
+    controller.battery.on_discharging(
+        lambda _: session.post('battery_status', 'discharging', receipt=session.report_time)
+    )
+
+    # The core's update event fires for every input report. The benchmark
+    # property skips reports that repeat its value and can divide by zero
+    # when two reports share a clock tick, which ends the reader thread.
+    controller._core.on_updated(session.on_report)
+
+    controller.on_error(on_error)
+
+    # Motion sensors, only stored here and sampled once per report
+    controller.gyroscope.on_change(session.on_gyroscope)
+    controller.accelerometer.on_change(session.on_accelerometer)
+
+    # Touchpad contacts, also sampled once per report
+    controller.touch_finger_1.on_change(session.on_touch_finger_1)
+    controller.touch_finger_2.on_change(session.on_touch_finger_2)
+
+
+class SessionManager:
+    # Connected sessions in connect order. Only touched on the Tk thread.
+    def __init__(self):
+        self._sessions = {}
+
+    def add(self, session):
+        self._sessions[session.session_id] = session
+
+    def remove(self, session):
+        self._sessions.pop(session.session_id, None)
+
+    def first(self):
+        return next(iter(self._sessions.values()), None)
+
+    def __contains__(self, session):
+        return self._sessions.get(session.session_id) is session
+
+    def __iter__(self):
+        return iter(self._sessions.values())
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,37 @@
+import threading
+import time
+
+
+class StartupProfile:
+    # Timestamps for the phases of a cold start. mark() can be called from
+    # any thread, the controller library is loaded off the Tk thread.
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []
+        self._lock = threading.Lock()
+
+    def mark(self, phase, began=None):
+        # A phase ends now. Without began it started at the previous mark on
+        # the Tk thread, background phases pass their own start time.
+        timestamp = time.perf_counter()
+        with self._lock:
+            if began is None:
+                foreground = [mark for mark in self.marks if mark[3]]
+                began = foreground[-1][2] if foreground else self.start
+                self.marks.append((phase, began, timestamp, True))
+            else:
+                self.marks.append((phase, began, timestamp, False))
+
+    def has(self, phase):
+        with self._lock:
+            return any(mark[0] == phase for mark in self.marks)
+
+    def report(self):
+        # One line per phase: how long it took and when it finished
+        with self._lock:
+            marks = sorted(self.marks, key=lambda mark: mark[2])
+        lines = [f"{'phase':<28} {'took ms':>9} {'done at ms':>11}"]
+        for phase, began, ended, foreground in marks:
+            name = phase if foreground else f"{phase} (background)"
+            lines.append(f"{name:<28} {(ended - began) * 1000:>9.1f} {(ended - self.start) * 1000:>11.1f}")
+        return "\n".join(lines)
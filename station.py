@@ -0,0 +1,258 @@
+import json
+import sqlite3
+import threading
+import time
+from input_state import BUTTON_BINDINGS, ALL_BUTTONS, pressed_names
+
+# Production test station: every controller that connects runs the same
+# checklist, and the outcome is stored by serial number.
+CHECKS = ('buttons', 'left_stick', 'right_stick', 'triggers', 'battery')
+
+# How far every stick axis and both triggers have to go, 0 to 1
+STICK_REACH = 0.95
+TRIGGER_REACH = 0.95
+
+# Lowest battery level a unit can leave the bench with
+MIN_BATTERY = 10
+
+# A unit that hasn't finished its checklist by then fails
+UNIT_TIMEOUT = 60.0
+
+
+class StationRun:
+    # The checklist for one session. update() is called by the Tk thread a
+    # few times a second and reads what the session already collects: the
+    # button edge rings, the stick and trigger sample buffers and the last
+    # battery report. Nothing is added to the per-report path.
+    def __init__(self, session, timeout=UNIT_TIMEOUT):
+        self.session = session
+        self.serial_number = session.serial_number or session.device_path
+        self.timeout = timeout
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.finished_at = None
+        self.aborted = None
+
+        # Only input from after the run started counts
+        edges = session.button_edges
+        self.edge_counts = [edges.count(bit) for bit in range(len(BUTTON_BINDINGS))]
+        self.seen_buttons = 0
+        self.stick_index = session.stick_samples.count
+        self.trigger_index = session.trigger_samples.count
+        self.stick_low = [0.0] * 4
+        self.stick_high = [0.0] * 4
+        self.trigger_peak = [0.0, 0.0]
+        self.battery_level = None
+
+    @property
+    def is_finished(self):
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started
+
+    def update(self):
+        # Folds in what arrived since the last call, returns True once the
+        # run is over
+        if self.is_finished:
+            return True
+        session = self.session
+        edges = session.button_edges
+        for bit in range(len(BUTTON_BINDINGS)):
+            if self.seen_buttons & (1 << bit):
+                continue
+            count = edges.count(bit)
+            if count != self.edge_counts[bit]:
+                rows, self.edge_counts[bit] = edges.rings[bit].since(self.edge_counts[bit])
+                if (rows[:, 1] > 0.5).any():
+                    self.seen_buttons |= 1 << bit
+
+        rows, self.stick_index = session.stick_samples.since(self.stick_index)
+        if len(rows):
+            low, high = rows[:, 1:5].min(axis=0).tolist(), rows[:, 1:5].max(axis=0).tolist()
+            self.stick_low = [min(a, b) for a, b in zip(self.stick_low, low)]
+            self.stick_high = [max(a, b) for a, b in zip(self.stick_high, high)]
+        rows, self.trigger_index = session.trigger_samples.since(self.trigger_index)
+        if len(rows):
+            self.trigger_peak = [max(a, b) for a, b in zip(self.trigger_peak, rows[:, 1:3].max(axis=0).tolist())]
+        if session.battery is not None:
+            self.battery_level = session.battery.level_percentage
+
+        if all(passed for passed, _ in self.checks().values()) or self.elapsed >= self.timeout:
+            self.finished_at = time.perf_counter()
+        return self.is_finished
+
+    def finish(self):
+        # No more input is coming, the checks stand as they are
+        if not self.is_finished:
+            self.update()
+            self.finished_at = time.perf_counter()
+
+    def abort(self, reason):
+        # The unit went away or the operator failed it
+        if not self.is_finished:
+            self.aborted = reason
+            self.finished_at = time.perf_counter()
+
+    def missing_buttons(self):
+        return pressed_names(ALL_BUTTONS & ~self.seen_buttons)
+
+    def checks(self):
+        # name -> (passed, measurement)
+        def stick(first):
+            low, high = self.stick_low[first:first + 2], self.stick_high[first:first + 2]
+            passed = all(value <= -STICK_REACH for value in low) and all(value >= STICK_REACH for value in high)
+            return passed, {'x': [round(low[0], 3), round(high[0], 3)], 'y': [round(low[1], 3), round(high[1], 3)]}
+
+        return {
+            'buttons': (self.seen_buttons == ALL_BUTTONS, {'missing': list(self.missing_buttons())}),
+            'left_stick': stick(0),
+            'right_stick': stick(2),
+            'triggers': (
+                min(self.trigger_peak) >= TRIGGER_REACH,
+                {'L2': round(self.trigger_peak[0], 3), 'R2': round(self.trigger_peak[1], 3)}
+            ),
+            'battery': (
+                self.battery_level is not None and self.battery_level >= MIN_BATTERY,
+                {'level': self.battery_level}
+            ),
+        }
+
+    @property
+    def passed(self):
+        return self.aborted is None and all(passed for passed, _ in self.checks().values())
+
+    def result(self):
+        return {
+            'serial_number': self.serial_number,
+            'started_at': self.started_at,
+            'duration_s': round(self.elapsed, 3),
+            'passed': self.passed,
+            'aborted': self.aborted,
+            'checks': self.checks(),
+        }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    serial_number TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_s REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    aborted TEXT,
+    PRIMARY KEY (serial_number, started_at)
+);
+CREATE TABLE IF NOT EXISTS checks (
+    serial_number TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    name TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    measurement TEXT NOT NULL,
+    PRIMARY KEY (serial_number, started_at, name)
+);
+"""
+
+
+class ResultStore:
+    # Station results in SQLite. add() only queues the result; a background
+    # thread writes everything queued in one transaction every
+    # flush_interval, so the Tk thread never waits on the disk.
+    def __init__(self, path, flush_interval=2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+        # Counters, read by the GUI
+        self.written = 0
+        self.transactions = 0
+        self.errors = 0
+        self.last_error = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._write_loop, name="ResultStore", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        # Writes what is still queued before returning. Runs on the Tk
+        # thread, so a stuck disk only holds it up for timeout seconds.
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def add(self, result):
+        with self._lock:
+            self._pending.append(result)
+
+    def _write_loop(self):
+        connection = None
+        try:
+            while self._running:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                connection = self.flush(connection)
+            connection = self.flush(connection)
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def flush(self, connection):
+        # Writes the queue, opening the database first when it isn't open.
+        # A database that can't be opened is counted like a failed write
+        # and tried again on the next flush, the results stay queued.
+        if connection is None:
+            try:
+                connection = self.connect()
+            except sqlite3.Error as error:
+                self.errors += 1
+                self.last_error = str(error)
+                return None
+        self.write(connection)
+        return connection
+
+    def write(self, connection):
+        with self._lock:
+            results = self._pending
+            self._pending = []
+        if not results:
+            return
+        runs = []
+        checks = []
+        for result in results:
+            key = (result['serial_number'], result['started_at'])
+            runs.append(key + (result['duration_s'], int(result['passed']), result['aborted']))
+            for name, (passed, measurement) in result['checks'].items():
+                checks.append(key + (name, int(passed), json.dumps(measurement)))
+        try:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)", runs)
+                connection.executemany("INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?)", checks)
+        except sqlite3.Error as error:
+            # Keep the results for the next try rather than lose them
+            self.errors += 1
+            self.last_error = str(error)
+            with self._lock:
+                self._pending[:0] = results
+            return
+        self.written += len(results)
+        self.transactions += 1
+
@@ -0,0 +1,182 @@
+import numpy as np
+from sample_ring import SampleRing
+
+# Limits a healthy stick stays within, stick values run from -1 to 1
+DEFAULT_LIMITS = {
+    'max_drift': 0.05,             # distance of the resting mean from center
+    'max_rest_noise': 0.02,        # standard deviation while resting
+    'max_deadzone': 0.15,          # radius below which the stick reads 0
+    'max_circularity_error': 0.10, # mean |1 - outer radius| over the angle bins
+    'min_coverage': 0.90,          # share of angle bins that reached full range
+}
+
+REST_RADIUS = 0.25     # resting samples stay closer to center than this,
+REST_SPEED = 0.5       # move slower than this, in stick units per second,
+REST_SECONDS = 0.3     # and last this long without a break
+REST_SMOOTHING = 0.05  # seconds of samples averaged before measuring speed
+REST_GAP = 0.1         # a longer gap between samples breaks a run
+OUTER_RADIUS = 0.70    # samples further out than this trace the outer circle
+FULL_RANGE = 0.90      # an angle bin is covered once it reached this radius
+ANGLE_BINS = 36
+
+# DualSenseController's default stick deadzone. The library reports a stick
+# within this radius of center as exactly centered, so drift smaller than it
+# reads as 0 and the deadzone measured is at least this big.
+LIBRARY_DEADZONE = 0.05
+
+STICKS = (('Left Stick', 1, 2), ('Right Stick', 3, 4))
+
+
+class StickSampleBuffer(SampleRing):
+    # Every stick sample of a session: time, left x/y, right x/y. One row per
+    # input report, written by the controller's reader thread.
+    def __init__(self, capacity=65536):
+        super().__init__(4, capacity)
+
+
+def heat_colors():
+    # White through yellow to red, indexed by scaled sample count
+    steps = np.linspace(0.0, 1.0, 256)
+    colors = np.empty((256, 3), dtype=np.uint8)
+    colors[:, 0] = 255
+    colors[:, 1] = np.clip(255 * (1.5 - steps * 1.5), 0, 255)
+    colors[:, 2] = np.clip(255 * (1.0 - steps * 3.0), 0, 255)
+    return colors
+
+
+class StickHeatmap:
+    # Where each stick has been, accumulated for the whole session. Counts
+    # live in a fixed grid per stick and only the cells new samples land in
+    # are recolored, so the cost per frame follows the new samples and the
+    # memory stays the same however long the session runs.
+    COLORS = heat_colors()
+
+    def __init__(self, bins=64):
+        self.bins = bins
+        self.counts = np.zeros((len(STICKS), bins, bins), dtype=np.int64)
+        self.pixels = np.full((len(STICKS), bins, bins, 3), 255, dtype=np.uint8)
+        self.version = 0
+
+    def add(self, rows):
+        if not len(rows):
+            return
+        for stick, (_, x_column, y_column) in enumerate(STICKS):
+            cells = self.cells(rows[:, x_column], rows[:, y_column])
+            np.add.at(self.counts[stick].reshape(-1), cells, 1)
+            touched = np.unique(cells)
+            # Log scale fixed up front, so a busy cell never rescales the rest
+            level = np.minimum(np.log2(self.counts[stick].reshape(-1)[touched] + 1) * 24, 255).astype(int)
+            self.pixels[stick].reshape(-1, 3)[touched] = self.COLORS[level]
+        self.version += 1
+
+    def cells(self, x, y):
+        # Flat grid index for each sample, -1..1 mapped across the grid
+        column = np.clip(((x + 1) / 2 * self.bins).astype(int), 0, self.bins - 1)
+        row = np.clip(((y + 1) / 2 * self.bins).astype(int), 0, self.bins - 1)
+        return row * self.bins + column
+
+    def reset(self):
+        self.counts[:] = 0
+        self.pixels[:] = 255
+        self.version += 1
+
+
+def resting_mask(t, x, y):
+    # Samples from runs where the stick sat still near center for at least
+    # REST_SECONDS. Speed comes from positions averaged over REST_SMOOTHING,
+    # so sensor noise at rest doesn't read as movement, while a stick on its
+    # way back to center or moved slowly across it does.
+    count = t.size
+    resting = np.zeros(count, dtype=bool)
+    if count < 2:
+        return resting
+    interval = max(float(np.median(np.diff(t))), 1e-9)
+    window = max(1, min(count // 2, int(round(REST_SMOOTHING / interval))))
+
+    # Mean position over the window ending at each sample, and how fast it
+    # moved since the window before
+    kernel = np.ones(window) / window
+    mean_x = np.convolve(x, kernel, mode='valid')
+    mean_y = np.convolve(y, kernel, mode='valid')
+    moved = np.hypot(mean_x[window:] - mean_x[:-window], mean_y[window:] - mean_y[:-window])
+    elapsed = t[2 * window - 1:] - t[window - 1:-window]
+    speed = np.full(count, np.inf)
+    speed[2 * window - 1:] = np.divide(moved, elapsed, out=np.full(moved.size, np.inf), where=elapsed > 0)
+    speed[:2 * window - 1] = speed[2 * window - 1]
+    still = (np.hypot(x, y) < REST_RADIUS) & (speed < REST_SPEED)
+
+    # Runs of still samples, a gap in time ends a run too
+    breaks = np.flatnonzero((still[1:] != still[:-1]) | (np.diff(t) > REST_GAP)) + 1
+    for start, end in zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [count]))):
+        if still[start] and t[end - 1] - t[start] >= REST_SECONDS:
+            resting[start:end] = True
+    return resting
+
+
+def analyse_stick(t, x, y, limits=DEFAULT_LIMITS):
+    # Drift, deadzone, circularity and range coverage for one stick's samples
+    radius = np.hypot(x, y)
+    angle = np.arctan2(y, x)
+
+    # Resting drift: where the stick settles when it is let go
+    resting = resting_mask(t, x, y)
+    if resting.any():
+        rest_x, rest_y = x[resting], y[resting]
+        drift = float(np.hypot(rest_x.mean(), rest_y.mean()))
+        rest_noise = float(np.sqrt(rest_x.var() + rest_y.var()))
+    else:
+        drift = rest_noise = float('nan')
+
+    # Deadzone: the smallest non-zero radius reported on the way out. With
+    # no exact zeros there is no deadzone; with zeros but no samples inside
+    # the outer circle (only flicks so far) it can't be measured yet.
+    inner = radius[(radius > 0) & (radius < OUTER_RADIUS)]
+    if not (radius == 0).any():
+        deadzone = 0.0
+    elif inner.size:
+        deadzone = float(inner.min())
+    else:
+        deadzone = float('nan')
+
+    # Outer circle: the furthest the stick reached in each angle bin
+    bins = ((angle + np.pi) / (2 * np.pi) * ANGLE_BINS).astype(int) % ANGLE_BINS
+    outer = radius > OUTER_RADIUS
+    max_radius = np.zeros(ANGLE_BINS)
+    np.maximum.at(max_radius, bins[outer], radius[outer])
+    reached = max_radius > 0
+    circularity_error = np.where(reached, np.abs(1.0 - max_radius), np.nan)
+    mean_circularity_error = float(np.nanmean(circularity_error)) if reached.any() else float('nan')
+    coverage = float((max_radius >= FULL_RANGE).mean())
+
+    checks = {
+        'drift': drift <= limits['max_drift'],
+        'rest_noise': rest_noise <= limits['max_rest_noise'],
+        'deadzone': deadzone <= limits['max_deadzone'] or deadzone != deadzone,
+        'circularity': mean_circularity_error <= limits['max_circularity_error'],
+        'coverage': coverage >= limits['min_coverage'],
+    }
+    return {
+        'samples': int(x.size),
+        'resting_samples': int(resting.sum()),
+        'drift': drift,
+        'drift_x': float(x[resting].mean()) if resting.any() else float('nan'),
+        'drift_y': float(y[resting].mean()) if resting.any() else float('nan'),
+        'rest_noise': rest_noise,
+        'deadzone': deadzone,
+        'max_radius': max_radius,
+        'circularity_error': circularity_error,
+        'mean_circularity_error': mean_circularity_error,
+        'coverage': coverage,
+        'checks': checks,
+        # NaN compares False, so a check without data fails, apart from a
+        # deadzone that couldn't be measured
+        'passed': all(checks.values()),
+    }
+
+
+def analyse_samples(samples, limits=DEFAULT_LIMITS):
+    # Report for both sticks from a StickSampleBuffer snapshot
+    return {
+        name: analyse_stick(samples[:, 0], samples[:, x_column], samples[:, y_column], limits)
+        for name, x_column, y_column in STICKS
+    }
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import deque
+from latency import percentile
+
+
+class FixedRateLoop:
+    # Calls tick(frame, lateness) on its own thread at a fixed rate. Frames
+    # are scheduled from the start time, not from the previous wake, so a
+    # late wake doesn't push every later frame back. A wake more than a
+    # whole period late skips the frames it missed instead of bursting
+    # through them.
+    #
+    # lateness is how far behind schedule the frame ran, in seconds. The
+    # last history values are kept for the drift stats.
+    def __init__(self, rate_hz, tick, name="FixedRateLoop", history=1024):
+        self.period = 1.0 / rate_hz
+        self.tick = tick
+        self.name = name
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Read from other threads
+        self.frames = 0
+        self.skipped = 0
+        self.errors = 0
+        self.started_at = 0.0
+        self.lateness = deque(maxlen=history)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self.stop()
+        self._stop_event = threading.Event()
+        self.frames = 0
+        self.skipped = 0
+        self.errors = 0
+        self.lateness.clear()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+        self._thread = None
+
+    def _run(self, stop_event):
+        self.started_at = time.perf_counter()
+        frame = 0
+        while True:
+            due = self.started_at + frame * self.period
+            wait = due - time.perf_counter()
+            if wait > 0 and stop_event.wait(wait):
+                return
+            if stop_event.is_set():
+                return
+            late = time.perf_counter() - due
+            self.lateness.append(late)
+            try:
+                self.tick(frame, late)
+            except Exception:
+                self.errors += 1
+            self.frames += 1
+
+            frame += 1
+            behind = int((time.perf_counter() - self.started_at) / self.period) - frame
+            if behind > 0:
+                self.skipped += behind
+                frame += behind
+
+    def stats(self):
+        # Lateness percentiles in milliseconds
+        lateness = sorted(self.lateness)
+        if not lateness:
+            return {'frames': self.frames, 'skipped': self.skipped, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'p50_ms': percentile(lateness, 50) * 1000,
+            'p99_ms': percentile(lateness, 99) * 1000,
+            'max_ms': lateness[-1] * 1000,
+        }
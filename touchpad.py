@@ -0,0 +1,82 @@
+import numpy as np
+from sample_ring import SampleRing
+
+# Touchpad coordinates as the controller reports them
+TOUCHPAD_WIDTH = 1920
+TOUCHPAD_HEIGHT = 1080
+
+# Coverage grid cell size in touchpad units
+COVERAGE_CELL = 32
+
+FINGERS = 2
+
+
+class TouchSampleBuffer(SampleRing):
+    # Both finger contacts, one row per input report that changed either:
+    # time, then active, id, x, y for finger 1 and finger 2
+    def __init__(self, capacity=16384):
+        super().__init__(4 * FINGERS, capacity)
+
+
+def finger_columns(finger):
+    # Columns of the active, id, x and y values for finger 0 or 1
+    first = 1 + 4 * finger
+    return first, first + 1, first + 2, first + 3
+
+
+class TouchCoverage:
+    # Which cells of the touchpad have reported a contact, one bit per cell.
+    # A full sweep leaves any dead area as a hole in the grid. The whole
+    # surface fits in a few hundred bytes and adding samples only touches
+    # the bytes of the cells they land in.
+    def __init__(self, cell=COVERAGE_CELL):
+        self.cell = cell
+        self.columns = -(-TOUCHPAD_WIDTH // cell)
+        self.rows = -(-TOUCHPAD_HEIGHT // cell)
+        self.cells = self.columns * self.rows
+        self.bits = np.zeros(-(-self.cells // 8), dtype=np.uint8)
+        self.covered = 0
+
+    def add(self, x, y):
+        # Marks the cells under the contacts, returns the newly covered ones
+        # as flat cell indices
+        if not len(x):
+            return np.empty(0, dtype=np.int64)
+        column = np.clip(x.astype(np.int64) // self.cell, 0, self.columns - 1)
+        row = np.clip(y.astype(np.int64) // self.cell, 0, self.rows - 1)
+        cells = np.unique(row * self.columns + column)
+        masks = (1 << (cells & 7)).astype(np.uint8)
+        new = cells[(self.bits[cells >> 3] & masks) == 0]
+        np.bitwise_or.at(self.bits, new >> 3, (1 << (new & 7)).astype(np.uint8))
+        self.covered += len(new)
+        return new
+
+    def grid(self):
+        # Covered cells as a rows x columns bool array
+        unpacked = np.unpackbits(self.bits, bitorder='little')[:self.cells]
+        return unpacked.reshape(self.rows, self.columns).astype(bool)
+
+    def fraction(self):
+        return self.covered / self.cells
+
+    def reset(self):
+        self.bits[:] = 0
+        self.covered = 0
+
+
+def contact_strokes(rows, finger):
+    # Splits one finger's samples into strokes: runs of reports where it
+    # stayed down with the same contact id. Returns (id, x, y, ends) tuples,
+    # ends is True when the finger lifted or changed after the stroke.
+    active, ids, xs, ys = (rows[:, column] for column in finger_columns(finger))
+    strokes = []
+    start = None
+    for i in range(len(rows)):
+        if start is not None and (not active[i] or ids[i] != ids[start]):
+            strokes.append((int(ids[start]), xs[start:i], ys[start:i], True))
+            start = None
+        if start is None and active[i]:
+            start = i
+    if start is not None:
+        strokes.append((int(ids[start]), xs[start:], ys[start:], False))
+    return strokes
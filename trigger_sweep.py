@@ -0,0 +1,167 @@
+import csv
+import time
+import numpy as np
+from timing import FixedRateLoop
+
+# Adaptive trigger sweep: every effect stepped through a grid of its
+# parameters, on L2 then R2. Each step is encoded to the raw effect (mode
+# and ten parameter bytes) before the sweep starts, playback only sets it.
+SWEEP_TRIGGERS = (('L2', 'left_trigger'), ('R2', 'right_trigger'))
+
+# Seconds each step holds, the default grid runs about a minute
+STEP_SECONDS = 0.25
+
+
+def pairs(positions, last):
+    # (start, end) position pairs with end after start, up to last
+    return [(start, end) for start in positions for end in sorted({start + 2, last}) if start < end <= last]
+
+
+def effect_grid():
+    # (effect method, parameters) per step for one trigger, within the
+    # ranges the library accepts
+    grid = [('no_resistance', {})]
+    for start in (0, 64, 128, 192):
+        for force in (64, 128, 192, 255):
+            grid.append(('continuous_resistance', {'start_position': start, 'force': force}))
+    for start, end in ((0, 100), (70, 160), (140, 220)):
+        for force in (128, 255):
+            grid.append(('section_resistance', {'start_position': start, 'end_position': end, 'force': force}))
+    for start in (0, 3, 6, 9):
+        for strength in (2, 4, 6, 8):
+            grid.append(('feedback', {'start_position': start, 'strength': strength}))
+    for start, end in pairs((2, 4, 6), 8):
+        for strength in (4, 8):
+            grid.append(('weapon', {'start_position': start, 'end_position': end, 'strength': strength}))
+    for start in (0, 5):
+        for amplitude in (2, 4, 6, 8):
+            for frequency in (5, 20, 40):
+                grid.append(('vibration', {'start_position': start, 'amplitude': amplitude, 'frequency': frequency}))
+    for start, end in pairs((1, 4), 8):
+        for strength in (1, 4, 8):
+            for snap_force in (4, 8):
+                grid.append(('bow', {
+                    'start_position': start, 'end_position': end, 'strength': strength, 'snap_force': snap_force
+                }))
+    for frequency in (1, 2, 4):
+        grid.append(('galloping', {'start_position': 0, 'end_position': 9, 'first_foot': 4, 'second_foot': 7,
+                                   'frequency': frequency}))
+    for start, end in ((1, 9), (3, 7)):
+        for amplitude_a, amplitude_b in ((2, 7), (7, 2)):
+            for frequency in (5, 20):
+                grid.append(('machine', {
+                    'start_position': start, 'end_position': end, 'amplitude_a': amplitude_a,
+                    'amplitude_b': amplitude_b, 'frequency': frequency, 'period': 3
+                }))
+    grid.append(('no_resistance', {}))
+    return grid
+
+
+class EffectEncoder:
+    # Stands in for a trigger's effect property. The library's effect
+    # methods work out the parameter bytes and end in set(), which is kept
+    # here instead of going to a controller.
+    def __init__(self):
+        self.encoded = None
+
+    def set(self, mode, param1=0, param2=0, param3=0, param4=0, param5=0,
+            param6=0, param7=0, param8=0, param9=0, param10=0):
+        self.encoded = (mode, param1, param2, param3, param4, param5, param6, param7, param8, param9, param10)
+
+
+def encode(effect, params):
+    # The raw effect a method call would set, None when it sets nothing
+    # (some effects skip a zero amplitude or frequency)
+    from dualsense_controller.api.property.TriggerEffectProperty import TriggerEffectProperty
+    encoder = EffectEncoder()
+    getattr(TriggerEffectProperty, effect)(encoder, **params)
+    return encoder.encoded
+
+
+def sweep_steps(grid=None):
+    # (trigger, property, effect, params, encoded) for every step, both
+    # triggers
+    grid = effect_grid() if grid is None else grid
+    steps = []
+    for trigger, prop in SWEEP_TRIGGERS:
+        for effect, params in grid:
+            encoded = encode(effect, params)
+            if encoded is not None:
+                steps.append((trigger, prop, effect, params, encoded))
+    return steps
+
+
+def describe(params):
+    return " ".join(f"{name}={value}" for name, value in params.items())
+
+
+class TriggerSweep:
+    # Sends the steps one per step_seconds on a FixedRateLoop, straight to
+    # the controller from the loop's thread. The time each step went out is
+    # logged against its scheduled time.
+    def __init__(self, controller, steps, step_seconds=STEP_SECONDS, on_finished=None):
+        self.controller = controller
+        self.steps = steps
+        self.step_seconds = step_seconds
+        self.on_finished = on_finished
+
+        # Seconds from the sweep's start each step was sent at, NaN until it is
+        self.sent = np.full(len(steps), np.nan)
+        self.position = -1
+        self.finished = False
+        self.timer = FixedRateLoop(1.0 / step_seconds, self.tick, name="TriggerSweep")
+
+    @property
+    def duration(self):
+        return len(self.steps) * self.step_seconds
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    @property
+    def is_running(self):
+        return self.timer.is_running
+
+    def tick(self, frame, lateness):
+        if frame >= len(self.steps):
+            self.finished = True
+            self.timer.stop()
+            if self.on_finished is not None:
+                self.on_finished(self)
+            return
+        trigger, prop, effect, params, encoded = self.steps[frame]
+        getattr(self.controller, prop).effect.set(*encoded)
+        self.sent[frame] = time.perf_counter() - self.timer.started_at
+        self.position = frame
+
+    def stats(self):
+        # How late the steps went out, in milliseconds
+        done = ~np.isnan(self.sent)
+        late = (self.sent[done] - np.arange(len(self.steps))[done] * self.step_seconds) * 1000
+        if not len(late):
+            return {'steps': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0, 'skipped': self.timer.skipped}
+        return {
+            'steps': int(len(late)),
+            'p50_ms': float(np.percentile(late, 50)),
+            'p99_ms': float(np.percentile(late, 99)),
+            'max_ms': float(late.max()),
+            'skipped': self.timer.skipped,
+        }
+
+    def save_log(self, path):
+        # One row per step: when it was due and sent, and what it was
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['step', 'trigger', 'effect', 'params', 'due_s', 'sent_s', 'late_ms', 'mode', 'bytes'])
+            for index, (trigger, prop, effect, params, encoded) in enumerate(self.steps):
+                due = index * self.step_seconds
+                sent = self.sent[index]
+                writer.writerow([
+                    index, trigger, effect, describe(params), f"{due:.3f}",
+                    '' if np.isnan(sent) else f"{sent:.6f}",
+                    '' if np.isnan(sent) else f"{(sent - due) * 1000:.3f}",
+                    int(encoded[0]), " ".join(f"{value:02x}" for value in encoded[1:]),
+                ])
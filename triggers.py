@@ -0,0 +1,76 @@
+import json
+import time
+import numpy as np
+from sample_ring import SampleRing
+
+TRIGGERS = ('L2', 'R2')
+
+# Pressure a trigger has to pass before a pull counts as started
+PULL_THRESHOLD = 0.05
+
+# Points every captured curve is resampled to, so units can be compared
+CURVE_POINTS = 200
+
+
+class TriggerSampleBuffer(SampleRing):
+    # Analog L2 and R2 pressure, 0 to 1, one row per input report
+    def __init__(self, capacity=16384):
+        super().__init__(len(TRIGGERS), capacity)
+
+
+def capture_curve(rows, trigger, start, end):
+    # Pressure against time since start for one trigger, from the rows that
+    # arrived between start and end
+    column = 1 + TRIGGERS.index(trigger)
+    window = rows[(rows[:, 0] >= start) & (rows[:, 0] <= end)]
+    return window[:, 0] - start, window[:, column]
+
+
+def resample_curve(times, pressure, seconds, points=CURVE_POINTS):
+    # The curve on a fixed time grid. Pressure holds between reports, the
+    # controller only changes it when the trigger moved.
+    grid = np.linspace(0.0, seconds, points)
+    if not len(times):
+        return np.zeros(points)
+    index = np.searchsorted(times, grid, side='right') - 1
+    return np.where(index >= 0, pressure[np.maximum(index, 0)], 0.0)
+
+
+def curve_summary(curve, seconds):
+    # Peak pressure, how long the pull took to reach 90% of it and the mean
+    # pressure over the capture
+    step = seconds / (len(curve) - 1)
+    peak = float(curve.max())
+    pulled = np.flatnonzero(curve > PULL_THRESHOLD)
+    if peak <= PULL_THRESHOLD or not len(pulled):
+        return {'peak': peak, 'rise_s': float('nan'), 'mean': float(curve.mean())}
+    reached = np.flatnonzero(curve >= 0.9 * peak)
+    return {
+        'peak': peak,
+        'rise_s': float((reached[0] - pulled[0]) * step),
+        'mean': float(curve.mean()),
+    }
+
+
+def curve_difference(curve, reference):
+    # Root mean square difference between two resampled curves
+    return float(np.sqrt(np.mean((np.asarray(curve) - np.asarray(reference)) ** 2)))
+
+
+def save_profiles(path, serial_number, trigger, seconds, curves):
+    # One unit's curves, keyed by trigger effect preset
+    with open(path, 'w') as f:
+        json.dump({
+            'serial_number': serial_number,
+            'trigger': trigger,
+            'seconds': seconds,
+            'captured_at': time.time(),
+            'curves': {preset: [round(value, 4) for value in curve.tolist()] for preset, curve in curves.items()},
+        }, f, indent=2)
+
+
+def load_profiles(path):
+    with open(path) as f:
+        profiles = json.load(f)
+    profiles['curves'] = {preset: np.array(curve) for preset, curve in profiles['curves'].items()}
+    return profiles